@@ -2,11 +2,13 @@
 
 import os
 from flask_app import create_app, socketio
+from flask_app.config import Config
 
 #--------------------------------------------------
 # APPLICATION ENTRY POINT
 #--------------------------------------------------
-app = create_app(debug=True)
+# Development: `python app.py`. Production: `gunicorn -c gunicorn.conf.py app:app` with FLASK_DEBUG=false
+app = create_app(debug=Config.FLASK_DEBUG)
 
 if __name__ == "__main__":
     # Get port and host from environment variables with fallbacks
@@ -16,5 +18,5 @@ if __name__ == "__main__":
     
     host = os.environ.get("FLASK_HOST", "0.0.0.0")
     
-    # Start the application with SocketIO support and auto-reloader enabled
-    socketio.run(app, host=host, port=int(port), debug=True, use_reloader=True)
\ No newline at end of file
+    # Start the application with SocketIO support; the auto-reloader follows FLASK_DEBUG
+    socketio.run(app, host=host, port=int(port), debug=app.debug, use_reloader=app.debug)
\ No newline at end of file
@@ -0,0 +1,7 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+#
+# Performance benchmarks for the web application.
+#
+# Run `python -m benchmarks.run --help` from the homework directory. The suite
+# starts a throwaway PostgreSQL cluster and a fake OpenAI-compatible server, so
+# it needs neither Docker nor an API key.
@@ -0,0 +1,83 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import csv
+import datetime
+import random
+from io import StringIO
+
+# Named dataset sizes: institutions, positions, experiences, skills
+SCALES = {
+    'small':  {'institutions': 5,    'positions': 20,     'experiences': 100,     'skills': 300},
+    'medium': {'institutions': 50,   'positions': 1000,   'experiences': 10000,   'skills': 30000},
+    'large':  {'institutions': 500,  'positions': 10000,  'experiences': 100000,  'skills': 300000},
+}
+
+INSTITUTION_TYPES = ['Academia', 'Industry', 'Government', 'Nonprofit']
+SKILL_NAMES       = ['Python', 'SQL', 'JavaScript', 'Statistics', 'Machine Learning', 'Writing', 'Leadership', 'Docker']
+
+def _csv(columns, rows):
+    """A CSV file object with a header line, as database.copyRows expects."""
+    out    = StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(['NULL' if value is None else value for value in row])
+    out.seek(0)
+    return out
+
+def _date(rng, start_year=1990, end_year=2025):
+    return datetime.date(rng.randint(start_year, end_year), rng.randint(1, 12), 1)
+
+def generate(db, institutions=5, positions=20, experiences=100, skills=300, seed=0):
+    """
+    Replace the resume tables' contents with a synthetic resume of the given size.
+
+    Rows are spread uniformly over their parents and generated from `seed`,
+    so the same arguments always produce the same data. Users are left alone.
+
+    Args:
+        db (database): Database to load into
+        institutions (int): Number of institutions
+        positions (int): Number of positions, spread over the institutions
+        experiences (int): Number of experiences, spread over the positions
+        skills (int): Number of skills, spread over the experiences
+        seed (int): Random seed
+
+    Returns:
+        dict: Row counts loaded per table
+    """
+    rng = random.Random(seed)
+    db.execute("TRUNCATE skills, experiences, positions, institutions RESTART IDENTITY")
+
+    counts = {}
+    counts['institutions'] = db.copyRows('institutions', _csv(
+        ['inst_id', 'type', 'name', 'department', 'address', 'city', 'state', 'zip'],
+        ((i, rng.choice(INSTITUTION_TYPES), f"Institution {i}", f"Department {i % 7}", None, 'East Lansing', 'Michigan', None)
+         for i in range(1, institutions + 1))))
+
+    def position(i):
+        start = _date(rng)
+        end   = None if rng.random() < 0.2 else start + datetime.timedelta(days=rng.randint(180, 3000))
+        return (i, rng.randint(1, institutions), f"Position {i}", 'Research, teaching and service.', start, end)
+    counts['positions'] = db.copyRows('positions', _csv(
+        ['position_id', 'inst_id', 'title', 'responsibilities', 'start_date', 'end_date'],
+        (position(i) for i in range(1, positions + 1))))
+
+    def experience(i):
+        start = None if rng.random() < 0.3 else _date(rng)
+        end   = start + datetime.timedelta(days=rng.randint(30, 720)) if start and rng.random() < 0.7 else None
+        return (i, rng.randint(1, positions), f"Experience {i}", 'Built and shipped a project.', 'https://example.com', start, end)
+    counts['experiences'] = db.copyRows('experiences', _csv(
+        ['experience_id', 'position_id', 'name', 'description', 'hyperlink', 'start_date', 'end_date'],
+        (experience(i) for i in range(1, experiences + 1))))
+
+    counts['skills'] = db.copyRows('skills', _csv(
+        ['skill_id', 'experience_id', 'name', 'skill_level'],
+        ((i, rng.randint(1, experiences), rng.choice(SKILL_NAMES), rng.randint(1, 10)) for i in range(1, skills + 1))))
+
+    # Explicit ids were loaded, so move the SERIAL sequences past them
+    for table, key in (('institutions', 'inst_id'), ('positions', 'position_id'),
+                       ('experiences', 'experience_id'), ('skills', 'skill_id')):
+        db.fetch_one(f"SELECT setval(pg_get_serial_sequence('{table}', '{key}'), GREATEST(MAX({key}), 1)) FROM {table}")
+    db.execute("ANALYZE institutions, positions, experiences, skills")
+    return counts
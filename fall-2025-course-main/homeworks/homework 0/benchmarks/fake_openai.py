@@ -0,0 +1,92 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/chat/completions like the OpenAI API, streamed (SSE) or not."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get('Content-Length', 0))
+        body   = json.loads(self.rfile.read(length) or b'{}')
+        with self.server.lock:
+            self.server.requests += 1
+            failure = config['failures'].pop(0) if config['failures'] else None
+
+        if failure is not None:
+            self._error(failure, config.get('retry_after'))
+            return
+
+        words = [f"{'' if i == 0 else ' '}token{i}" for i in range(config['tokens'])]
+        usage = {'prompt_tokens': 10, 'completion_tokens': len(words), 'total_tokens': 10 + len(words)}
+        time.sleep(config['latency'])
+
+        if body.get('stream') and config['streaming']:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for word in words:
+                time.sleep(config['token_latency'])
+                self._chunk('data: ' + json.dumps({'choices': [{'delta': {'content': word}}]}) + '\n\n')
+            self._chunk('data: ' + json.dumps({'choices': [], 'usage': usage}) + '\n\n')
+            self._chunk('data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            time.sleep(config['token_latency'] * len(words))
+            payload = json.dumps({'model': body.get('model'), 'choices': [{'message': {'role': 'assistant', 'content': ''.join(words)}}],
+                                  'usage': usage}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    def _error(self, status, retry_after=None):
+        payload = json.dumps({'error': {'message': f'fake error {status}', 'code': status}}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _chunk(self, text):
+        data = text.encode()
+        self.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+        self.wfile.flush()
+
+def start_fake_openai(port=0, latency=0.2, token_latency=0.01, tokens=20, streaming=True):
+    """
+    Serve a fake OpenAI-compatible API on a background thread.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one
+        latency (float): Seconds before the first token (time to first byte)
+        token_latency (float): Seconds between streamed tokens
+        tokens (int): Tokens in every completion
+        streaming (bool): Honor `stream`; False answers every request with one JSON body, like servers that do not stream
+
+    Returns:
+        ThreadingHTTPServer: The running server; its `base_url` points at /v1 and `requests` counts calls.
+        Put status codes in `config['failures']` to fail that many requests first (with
+        `config['retry_after']` as their Retry-After header, if set).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.config   = {'latency': latency, 'token_latency': token_latency, 'tokens': tokens, 'streaming': streaming,
+                       'failures': [], 'retry_after': None}
+    server.lock     = threading.Lock()
+    server.requests = 0
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,103 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import glob
+import os
+import pwd
+import shutil
+import socket
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+def find_postgres_bin():
+    """
+    Locate a directory holding initdb and pg_ctl.
+
+    Looks at $PG_BIN, then PATH, then `pg_config --bindir`, then the usual
+    Debian/Ubuntu install locations.
+
+    Returns:
+        str: Directory containing the PostgreSQL server binaries, or None
+    """
+    candidates = [os.environ.get('PG_BIN')]
+    if shutil.which('initdb'):
+        candidates.append(os.path.dirname(shutil.which('initdb')))
+    if shutil.which('pg_config'):
+        candidates.append(subprocess.run(['pg_config', '--bindir'], capture_output=True, text=True).stdout.strip())
+    candidates.extend(sorted(glob.glob('/usr/lib/postgresql/*/bin'), reverse=True))
+
+    for directory in candidates:
+        if directory and os.path.exists(os.path.join(directory, 'initdb')) and os.path.exists(os.path.join(directory, 'pg_ctl')):
+            return directory
+    return None
+
+def free_port():
+    """An unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@contextmanager
+def disposable_postgres():
+    """
+    Run a throwaway PostgreSQL cluster for the duration of the block.
+
+    Uses the PostgreSQL server binaries when they are installed, otherwise
+    the ones bundled with the `pgserver` pip package. The cluster lives in a
+    temporary directory, trusts local connections, and is stopped and
+    deleted on exit.
+
+    Yields:
+        dict: DATABASE_* settings for the app
+
+    Raises:
+        RuntimeError: If neither PostgreSQL nor pgserver is available
+    """
+    bindir = find_postgres_bin()
+    if bindir is not None:
+        with _initdb_cluster(bindir) as settings:
+            yield settings
+        return
+
+    try:
+        import pgserver
+    except ImportError:
+        raise RuntimeError("PostgreSQL server binaries not found; install PostgreSQL, `pip install pgserver`, or set PG_BIN")
+
+    datadir = tempfile.mkdtemp(prefix='bench-pg-')
+    server  = pgserver.get_server(datadir, cleanup_mode='delete')
+    try:
+        yield {'DATABASE_HOST': datadir, 'DATABASE_PORT': '5432', 'DATABASE_USER': 'postgres',
+               'DATABASE_NAME': 'postgres', 'DATABASE_PASSWORD': ''}
+    finally:
+        server.cleanup()
+        shutil.rmtree(datadir, ignore_errors=True)
+
+@contextmanager
+def _initdb_cluster(bindir):
+    """Cluster created with initdb and run with pg_ctl on a free localhost port."""
+    datadir = tempfile.mkdtemp(prefix='bench-pg-')
+    pgdata  = os.path.join(datadir, 'data')
+    port    = free_port()
+
+    # PostgreSQL refuses to run as root; use the postgres system account instead
+    preexec = None
+    if os.geteuid() == 0:
+        account = pwd.getpwnam(os.environ.get('PG_SYSTEM_USER', 'postgres'))
+        os.chown(datadir, account.pw_uid, account.pw_gid)
+        def preexec():
+            os.setgid(account.pw_gid)
+            os.setuid(account.pw_uid)
+
+    pg_ctl = [os.path.join(bindir, 'pg_ctl'), '-D', pgdata]
+    try:
+        subprocess.run([os.path.join(bindir, 'initdb'), '-D', pgdata, '-U', 'postgres', '-A', 'trust', '-E', 'UTF8', '--no-sync'],
+                       check=True, capture_output=True, preexec_fn=preexec)
+        subprocess.run(pg_ctl + ['-l', os.path.join(datadir, 'server.log'), '-w',
+                                 '-o', f"-p {port} -k {datadir} -c listen_addresses=127.0.0.1 -c fsync=off -c max_connections=200",
+                                 'start'], check=True, capture_output=True, preexec_fn=preexec)
+        yield {'DATABASE_HOST': '127.0.0.1', 'DATABASE_PORT': str(port), 'DATABASE_USER': 'postgres',
+               'DATABASE_NAME': 'postgres', 'DATABASE_PASSWORD': ''}
+    finally:
+        subprocess.run(pg_ctl + ['-m', 'immediate', 'stop'], capture_output=True, preexec_fn=preexec)
+        shutil.rmtree(datadir, ignore_errors=True)
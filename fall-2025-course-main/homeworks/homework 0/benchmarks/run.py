@@ -0,0 +1,366 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+from .datagen import SCALES, generate
+from .fake_openai import start_fake_openai
+from .local_postgres import disposable_postgres, free_port
+
+SCENARIOS = ['resume', 'resume_page', 'login', 'chat', 'fanout', 'login_burst']
+
+#--------------------------------------------------
+# STATISTICS
+#--------------------------------------------------
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+def summarize(latencies, errors, elapsed):
+    """
+    Summarize one scenario.
+
+    Args:
+        latencies (list): Seconds taken by each successful operation
+        errors (int): Number of failed operations
+        elapsed (float): Wall-clock seconds for the whole scenario
+
+    Returns:
+        dict: Counts, throughput (operations per second) and latency percentiles in milliseconds
+    """
+    ordered = sorted(latencies)
+    ms      = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        'operations': len(ordered) + errors,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(len(ordered) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': ms(percentile(ordered, 50)),
+            'p95': ms(percentile(ordered, 95)),
+            'p99': ms(percentile(ordered, 99)),
+            'mean': ms(sum(ordered) / len(ordered)) if ordered else None,
+            'max': ms(ordered[-1]) if ordered else None,
+        },
+    }
+
+#--------------------------------------------------
+# HTTP LOAD
+#--------------------------------------------------
+def run_http(operation, requests_total, concurrency, warmup=10):
+    """
+    Call `operation(session, i)` `requests_total` times from `concurrency` threads.
+
+    Each thread keeps its own keep-alive session. `operation` returns True on
+    success; exceptions count as errors.
+
+    Returns:
+        dict: summarize() of the measured calls
+    """
+    local = threading.local()
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            ok = operation(session(), i)
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(-warmup, 0)))
+        started = time.perf_counter()
+        results = list(pool.map(timed, range(requests_total)))
+        elapsed = time.perf_counter() - started
+
+    return summarize([latency for ok, latency in results if ok], sum(1 for ok, _ in results if not ok), elapsed)
+
+def scenario_operations(base_url):
+    """The HTTP scenarios, as operation(session, i) -> bool."""
+    def resume(s, i):
+        return s.get(f"{base_url}/api/resume", timeout=60).status_code == 200
+
+    def resume_page(s, i):
+        return s.get(f"{base_url}/api/resume", params={'limit': 20, 'experiences': 10}, timeout=60).status_code == 200
+
+    def login(s, i):
+        r = s.post(f"{base_url}/processlogin", json={'email': 'owner@email.com', 'password': 'password'}, timeout=60)
+        return r.status_code == 200 and r.json().get('success') == 1
+
+    def chat(s, i):
+        r = s.post(f"{base_url}/chat/ai", json={'message': f"benchmark question {i}", 'pageContent': {}, 'cache': False}, timeout=120)
+        return r.status_code == 200 and r.json().get('success') is not False
+
+    return {'resume': resume, 'resume_page': resume_page, 'login': login, 'chat': chat}
+
+#--------------------------------------------------
+# SOCKET.IO FAN-OUT
+#--------------------------------------------------
+def run_fanout(base_url, clients, messages, interval=0.01, timeout=60):
+    """
+    Measure delivery latency of chat `text` events to `clients` listeners.
+
+    One extra client sends `messages` texts to a dedicated room; every
+    listener records how long each took to arrive. Throughput counts
+    deliveries (messages x listeners) per second.
+
+    Returns:
+        dict: summarize() of every delivery, plus the client and message counts
+    """
+    import socketio
+
+    room       = f"bench-{os.getpid()}"
+    latencies  = []
+    lock       = threading.Lock()
+    expected   = clients * messages
+    done       = threading.Event()
+
+    def record(payload):
+        text = payload.get('msg', '')
+        if text.startswith('bench '):
+            latency = time.perf_counter() - float(text.split()[1])
+            with lock:
+                latencies.append(latency)
+                if len(latencies) >= expected:
+                    done.set()
+
+    listeners = []
+    for _ in range(clients):
+        client = socketio.Client(reconnection=False)
+        client.on('message', record, namespace='/chat')
+        client.on('messages', lambda batch: [record(payload) for payload in batch.get('messages', [])], namespace='/chat')
+        client.connect(base_url, namespaces=['/chat'], wait_timeout=30)
+        client.emit('joined', {'room': room}, namespace='/chat')
+        listeners.append(client)
+
+    # The sender stays out of the room so only listeners' deliveries are counted
+    sender = socketio.Client(reconnection=False)
+    sender.connect(base_url, namespaces=['/chat'], wait_timeout=30)
+    time.sleep(0.5)     # let every join land before the first message
+
+    started = time.perf_counter()
+    for _ in range(messages):
+        sender.emit('text', {'msg': f"bench {time.perf_counter()}", 'room': room}, namespace='/chat')
+        time.sleep(interval)
+    done.wait(timeout)
+    elapsed = time.perf_counter() - started
+
+    for client in listeners + [sender]:
+        client.disconnect()
+
+    result = summarize(list(latencies), max(0, expected - len(latencies)), elapsed)
+    result.update({'clients': clients, 'messages': messages})
+    return result
+
+def run_login_burst(base_url, login, concurrency, messages, interval=0.01):
+    """
+    Measure chat delivery latency while `concurrency` clients log in back to back.
+
+    Logins hash passwords with scrypt, the most CPU-heavy work the server does.
+    The fan-out is measured with one listener for as long as the burst runs;
+    compare it with the `fanout` scenario to see how much the burst delays chat.
+
+    Returns:
+        dict: run_fanout() result for the chat messages, with summarize() of the logins under 'logins'
+    """
+    stop      = threading.Event()
+    lock      = threading.Lock()
+    latencies = []
+    errors    = [0]
+
+    def log_in_until_stopped():
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                ok = login(session, 0)
+            except Exception:
+                ok = False
+            with lock:
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=log_in_until_stopped, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        result = run_fanout(base_url, 1, messages, interval=interval)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(60)
+    result['logins'] = summarize(latencies, errors[0], time.perf_counter() - started)
+    return result
+
+#--------------------------------------------------
+# ENVIRONMENT
+#--------------------------------------------------
+def git_revision():
+    """Current commit and whether the tree has uncommitted changes, if run inside git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty  = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip())
+        return {'commit': commit, 'dirty': dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+def load_data(scale):
+    """Migrate and seed the database, then load the synthetic resume, outside the server process."""
+    from flask import Flask
+    from flask_app.config import Config
+    from flask_app.utils.database import database
+
+    app = Flask('benchmarks')
+    app.config.from_object(Config)
+    with app.app_context():
+        db = database()
+        db.migrate(seed=True)
+        return generate(db, **scale)
+
+def start_server(port, env, no_eventlet):
+    """Start benchmarks.server in its own process group and wait until it reports ready."""
+    command = [sys.executable, '-m', 'benchmarks.server', '--port', str(port)] + (['--no-eventlet'] if no_eventlet else [])
+    process = subprocess.Popen(command, env=env, start_new_session=True)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Benchmark server exited with status {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/readyz", timeout=2).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    stop_server(process)
+    raise RuntimeError("Benchmark server did not start within 120s")
+
+def stop_server(process):
+    """Stop the server along with the worker processes it forked (e.g. for password hashing)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+def compare(current, baseline):
+    """Print throughput and latency changes against an earlier result file."""
+    print(f"\n{'scenario':<12} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        rows = [('throughput/s', before['throughput_per_s'], result['throughput_per_s'])]
+        rows += [(f"{q} ms", before['latency_ms'][q], result['latency_ms'][q]) for q in ('p50', 'p95', 'p99')]
+        for metric, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else 'n/a'
+            print(f"{name:<12} {metric:<16} {old if old is not None else '-':>10} {new if new is not None else '-':>10} {change:>8}")
+
+#--------------------------------------------------
+# ENTRY POINT
+#--------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app against a throwaway PostgreSQL and a fake OpenAI API.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument('--scale', default='small', choices=sorted(SCALES), help="Synthetic resume size")
+    for table in ('institutions', 'positions', 'experiences', 'skills'):
+        parser.add_argument(f'--{table}', type=int, help=f"Override the number of {table}")
+    parser.add_argument('--seed', type=int, default=0, help="Data generator seed")
+    parser.add_argument('--requests', type=int, default=500, help="Measured requests per HTTP scenario")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent HTTP clients (logging in, for login_burst)")
+    parser.add_argument('--login-requests', type=int, default=50, help="Measured requests for the login scenario (scrypt is slow)")
+    parser.add_argument('--chat-requests', type=int, default=100, help="Measured requests for the chat scenario")
+    parser.add_argument('--clients', type=int, default=20, help="Socket.IO listeners for the fan-out scenario")
+    parser.add_argument('--messages', type=int, default=100, help="Messages sent in the fan-out and login_burst scenarios")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Fake OpenAI seconds to first token")
+    parser.add_argument('--llm-token-latency', type=float, default=0.01, help="Fake OpenAI seconds between tokens")
+    parser.add_argument('--llm-tokens', type=int, default=20, help="Fake OpenAI tokens per completion")
+    parser.add_argument('--no-stream', action='store_true', help="Ask the app for non-streamed completions")
+    parser.add_argument('--no-eventlet', action='store_true', help="Serve Socket.IO in threading mode")
+    parser.add_argument('--output', default='benchmark-results.json', help="Where to write the JSON results")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown   = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    scale = dict(SCALES[args.scale])
+    scale.update({table: getattr(args, table) for table in scale if getattr(args, table) is not None})
+
+    llm = start_fake_openai(latency=args.llm_latency, token_latency=args.llm_token_latency, tokens=args.llm_tokens)
+    with disposable_postgres() as pg:
+        # Config reads the environment when flask_app.config is first imported, so set it before
+        os.environ.update(pg)
+        os.environ.update({
+            'OPENAI_API_KEY': 'benchmark', 'OPENAI_BASE_URL': llm.base_url,
+            'OPENAI_STREAM': 'false' if args.no_stream else 'true', 'OPENAI_CACHE_ENABLED': 'false',
+            'CHAT_ASYNC': 'false', 'FLASK_DEBUG': 'false', 'LOG_LEVEL': 'WARNING', 'METRICS_ENABLED': 'true',
+        })
+        print(f"Loading {scale} ...", file=sys.stderr)
+        loaded = load_data({**scale, 'seed': args.seed})
+
+        port     = free_port()
+        server   = start_server(port, dict(os.environ), args.no_eventlet)
+        base_url = f"http://127.0.0.1:{port}"
+        results  = {}
+        try:
+            operations = scenario_operations(base_url)
+            counts     = {'login': args.login_requests, 'chat': args.chat_requests}
+            for name in scenarios:
+                print(f"Running {name} ...", file=sys.stderr)
+                if name == 'fanout':
+                    results[name] = run_fanout(base_url, args.clients, args.messages)
+                elif name == 'login_burst':
+                    results[name] = run_login_burst(base_url, operations['login'], args.concurrency, args.messages)
+                else:
+                    results[name] = run_http(operations[name], counts.get(name, args.requests), args.concurrency)
+                results[name]['concurrency'] = args.concurrency if name != 'fanout' else None
+        finally:
+            stop_server(server)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'data': loaded,
+            'fake_llm': llm.config,
+            'llm_requests': llm.requests,
+            'arguments': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
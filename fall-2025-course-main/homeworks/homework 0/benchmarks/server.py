@@ -0,0 +1,28 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import argparse
+import logging
+import sys
+
+#--------------------------------------------------
+# BENCHMARK SERVER ENTRY POINT
+#--------------------------------------------------
+# Started by benchmarks.run in its own process, configured entirely through the environment.
+def main():
+    parser = argparse.ArgumentParser(description="Serve the app for a benchmark run.")
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--no-eventlet', action='store_true',
+                        help="Serve Socket.IO in threading mode (e.g. where eventlet does not import)")
+    args = parser.parse_args()
+
+    if args.no_eventlet:
+        sys.modules['eventlet'] = None
+
+    from flask_app import create_app, socketio
+    app = create_app(debug=False)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)     # no per-request access log
+    socketio.run(app, host='127.0.0.1', port=args.port, debug=False, use_reloader=False,
+                 log_output=False, allow_unsafe_werkzeug=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import requests
+
+from .local_postgres import disposable_postgres, free_port
+
+# Startup budget in seconds, checked against the median of the measured runs
+BUDGET = {
+    'import_s': 0.4,          # `from flask_app import create_app`
+    'create_app_s': 0.2,      # create_app(), which does not wait for the database
+    'ready_s': 0.5,           # create_app() returning -> schema checked and /readyz able to pass
+    'healthz_s': 1.5,         # process spawn -> first /healthz 200 (interpreter, imports, bind)
+    'readyz_s': 2.0,          # process spawn -> first /readyz 200
+}
+
+# Slow imports that startup must not pull in; they load on first use
+LAZY_MODULES = ['bs4', 'cryptography.fernet']
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+if {no_eventlet}:
+    sys.modules['eventlet'] = None
+from flask_app import create_app
+imported = time.perf_counter()
+app = create_app(debug=False)
+created = time.perf_counter()
+app.extensions['readiness'].wait(60)
+ready = time.perf_counter()
+print(json.dumps({{'import_s': imported - started, 'create_app_s': created - imported, 'ready_s': ready - created,
+                  'eager': [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+def probe(env, no_eventlet):
+    """Import and create the app in a fresh interpreter; returns its phase timings."""
+    code   = PROBE.format(no_eventlet=no_eventlet, lazy=LAZY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def time_to_serve(env, no_eventlet, timeout=60):
+    """Seconds from spawning benchmarks.server until /healthz, then /readyz, first answer 200."""
+    port    = free_port()
+    command = [sys.executable, '-m', 'benchmarks.server', '--port', str(port)] + (['--no-eventlet'] if no_eventlet else [])
+    started = time.monotonic()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)      # keep the server banner out of the report
+    timings = {}
+    try:
+        for name, path in (('healthz_s', '/healthz'), ('readyz_s', '/readyz')):
+            while name not in timings:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Benchmark server exited with status {process.returncode}")
+                if time.monotonic() - started > timeout:
+                    raise RuntimeError(f"{path} did not answer 200 within {timeout}s")
+                try:
+                    if requests.get(f"http://127.0.0.1:{port}{path}", timeout=1).status_code == 200:
+                        timings[name] = time.monotonic() - started
+                        continue
+                except requests.RequestException:
+                    pass
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(30)
+    return timings
+
+def measure(env, runs, no_eventlet):
+    """
+    Measure every startup phase `runs` times.
+
+    Returns:
+        dict: Median seconds per phase, the budget, whether each phase is within it,
+              and any lazy module that was imported at startup
+    """
+    samples = []
+    for _ in range(runs):
+        sample = probe(env, no_eventlet)
+        sample.update(time_to_serve(env, no_eventlet))
+        samples.append(sample)
+
+    medians = {phase: round(statistics.median(sample[phase] for sample in samples), 3) for phase in BUDGET}
+    eager   = sorted({name for sample in samples for name in sample['eager']})
+    return {
+        'runs': runs,
+        'median_s': medians,
+        'budget_s': BUDGET,
+        'within_budget': {phase: medians[phase] <= BUDGET[phase] for phase in BUDGET},
+        'eager_lazy_modules': eager,
+        'passed': all(medians[phase] <= BUDGET[phase] for phase in BUDGET) and not eager,
+    }
+
+#--------------------------------------------------
+# ENTRY POINT
+#--------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the app's import and startup time against its budget.")
+    parser.add_argument('--runs', type=int, default=5, help="Cold starts to measure; the median is compared")
+    parser.add_argument('--no-eventlet', action='store_true', help="Serve Socket.IO in threading mode")
+    parser.add_argument('--output', help="Also write the JSON results here")
+    args = parser.parse_args(argv)
+
+    with disposable_postgres() as pg:
+        env = dict(os.environ, **pg, OPENAI_API_KEY='benchmark', FLASK_DEBUG='false', LOG_LEVEL='WARNING')
+
+        # Migrate and seed once up front, so each measured start only checks the schema version
+        probe(env, args.no_eventlet)
+        report = measure(env, args.runs, args.no_eventlet)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['passed'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
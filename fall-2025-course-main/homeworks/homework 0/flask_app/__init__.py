@@ -5,7 +5,9 @@
 #--------------------------------------------------
 import os
 import time
-from flask import Flask
+import click
+import logging
+from flask import Flask, g, current_app, request
 from flask_socketio import SocketIO
 from flask_failsafe import failsafe
 
@@ -15,42 +17,120 @@ from flask_failsafe import failsafe
 DB_MAX_RETRIES = 30
 DB_RETRY_DELAY = 2
 
+# Seconds a CLI command waits for the startup bootstrap (which retries for DB_MAX_RETRIES * DB_RETRY_DELAY)
+CLI_BOOTSTRAP_TIMEOUT = 120
+
+# Endpoints served while the database bootstrap is still running
+READINESS_EXEMPT = {'healthz', 'readyz', 'metrics', 'static'}
+
 #--------------------------------------------------
 # GLOBAL INSTANCES
 #--------------------------------------------------
 socketio = SocketIO()
+logger   = logging.getLogger(__name__)
 
 #--------------------------------------------------
 # DATABASE INITIALIZATION
 #--------------------------------------------------
-def initialize_database():
+def initialize_database(app, db, readiness):
     """
-    Initialize database with retry logic and proper error handling.
-    
+    Bring the database schema up to date, retrying while the server is unreachable.
+
+    Runs as a background task so the server binds its port immediately;
+    /readyz answers 503 until this marks the process ready.
+
+    Args:
+        app: Flask application instance
+        db: The app's database instance
+        readiness: Startup state to mark ready, or failed after the last retry
+    """
+    with app.app_context():
+        for attempt in range(DB_MAX_RETRIES):
+            readiness.attempts = attempt + 1
+            try:
+                logger.info(f"Database connection attempt {attempt + 1}/{DB_MAX_RETRIES}")
+                applied = db.migrate(seed=current_app.config.get('DATABASE_SEED_ON_INSTALL', True))
+                if applied:
+                    logger.info(f"Database schema updated ({applied} migration(s))")
+                else:
+                    logger.info("Database schema is up to date")
+                readiness.mark_ready()
+                return
+            except Exception as e:
+                logger.warning(f"Database connection failed (attempt {attempt + 1}/{DB_MAX_RETRIES}): {e}")
+                if attempt < DB_MAX_RETRIES - 1:
+                    logger.info(f"Retrying in {DB_RETRY_DELAY} seconds...")
+                    socketio.sleep(DB_RETRY_DELAY)
+                else:
+                    logger.error("Failed to connect to database after all retries")
+                    readiness.mark_failed(str(e))
+
+#--------------------------------------------------
+# SOCKET.IO TRANSPORTS
+#--------------------------------------------------
+def socketio_transports(config):
+    """
+    Socket.IO transports the server accepts and the chat client asks for.
+
+    Long-polling sends every request of a session separately, and gunicorn's
+    workers are not sticky, so a poll can land on a worker that does not know
+    the session. A message queue means several workers, so by default it
+    limits clients to websocket, which keeps a session on one connection.
+    Set SOCKETIO_TRANSPORTS to allow polling behind a sticky load balancer.
+
+    Args:
+        config: Application config
+
     Returns:
-        database: Initialized database instance
-        
-    Raises:
-        Exception: If database connection fails after all retry attempts
+        list: Transport names, in the order the client should try them
     """
-    from .utils.database import database
-    
-    for attempt in range(DB_MAX_RETRIES):
-        try:
-            db = database()
-            print(f"Database connection attempt {attempt + 1}/{DB_MAX_RETRIES}")
-            db.createTables(purge=True)
-            print("Database tables created successfully")
-            print("Database tables and initial data imported successfully")
-            return db
-        except Exception as e:
-            print(f"Database connection failed (attempt {attempt + 1}/{DB_MAX_RETRIES}): {e}")
-            if attempt < DB_MAX_RETRIES - 1:
-                print(f"Retrying in {DB_RETRY_DELAY} seconds...")
-                time.sleep(DB_RETRY_DELAY)
-            else:
-                print("Failed to connect to database after all retries")
-                raise
+    configured = config.get('SOCKETIO_TRANSPORTS')
+    if configured:
+        return [transport.strip() for transport in configured.split(',') if transport.strip()]
+    return ['websocket'] if config.get('SOCKETIO_MESSAGE_QUEUE') else ['websocket', 'polling']
+
+#--------------------------------------------------
+# CLI COMMANDS
+#--------------------------------------------------
+def register_commands(app):
+    """
+    Register database maintenance commands, e.g. `flask --app app db-reset`.
+
+    Each command first waits for the startup bootstrap, so it never races it.
+    The wait goes through the async model's event, so under eventlet it lets
+    the bootstrap green thread run instead of blocking the hub.
+
+    Args:
+        app: Flask application instance
+    """
+    from .utils.database import get_database
+    from .utils.readiness import get_readiness
+
+    def wait_for_bootstrap():
+        readiness = get_readiness()
+        if not readiness.wait(CLI_BOOTSTRAP_TIMEOUT):
+            raise click.ClickException(f"Database bootstrap did not succeed: {readiness.error or 'timed out'}")
+
+    @app.cli.command('db-migrate')
+    def db_migrate():
+        """Apply pending schema migrations."""
+        wait_for_bootstrap()
+        applied = get_database().migrate()
+        click.echo(f"Applied {applied} migration(s)")
+
+    @app.cli.command('db-seed')
+    def db_seed():
+        """Load /database/initial_data into the existing tables."""
+        wait_for_bootstrap()
+        get_database().seedTables()
+
+    @app.cli.command('db-reset')
+    @click.option('--no-seed', is_flag=True, help='Recreate the schema without loading initial data.')
+    def db_reset(no_seed):
+        """Drop every table and rebuild the schema from scratch."""
+        wait_for_bootstrap()
+        get_database().resetDatabase(seed=not no_seed)
+        click.echo("Database reset")
 
 #--------------------------------------------------
 # CONFIGURATION MANAGEMENT
@@ -69,7 +149,7 @@ def load_configuration(app, debug=False):
         Config.init_app(app)
     except ImportError:
         # Fallback configuration if config.py doesn't exist
-        print("Config.py not found, using fallback configuration")
+        logger.warning("Config.py not found, using fallback configuration")
         app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
         app.debug = debug
         app.secret_key = 'dev-fallback-key-change-in-production'
@@ -82,8 +162,6 @@ def apply_app_settings(app, debug=False):
         app: Flask application instance
         debug: Debug mode flag
     """
-    # Prevent issues with cached static files
-    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
     app.debug = debug
     
     # Secret key is already set by config.py or fallback
@@ -103,7 +181,8 @@ def create_app(debug=False):
     Returns:
         Flask: Configured Flask application instance
     """
-    app = Flask(__name__)
+    # /static is served by routes.static_file, which fingerprints and precompresses assets
+    app = Flask(__name__, static_folder=None)
 
     # Load configuration
     load_configuration(app, debug)
@@ -111,28 +190,71 @@ def create_app(debug=False):
     # Apply application settings
     apply_app_settings(app, debug)
 
-    # Initialize SocketIO
-    socketio.init_app(app)
+    # Leveled, sampled JSON logs for every flask_app.* module
+    from .utils.logs import configure_logging
+    configure_logging(level=app.config.get('LOG_LEVEL', 'INFO'),
+                      sample_rate=app.config.get('LOG_SAMPLE_RATE', 1.0),
+                      json_format=app.config.get('LOG_JSON', True))
+
+    # Initialize SocketIO; with a message queue, emits from any worker reach clients connected to every worker
+    app.config['SOCKETIO_TRANSPORTS'] = socketio_transports(app.config)
+    socketio.init_app(app, message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'), transports=app.config['SOCKETIO_TRANSPORTS'],
+                      async_mode=app.config.get('SOCKETIO_ASYNC_MODE'))
+
+    # Under eventlet, let other requests and socket clients run while a query waits on PostgreSQL
+    if socketio.async_mode == 'eventlet':
+        from .utils.pool import make_cooperative
+        make_cooperative()
+
+    # Register CLI commands
+    register_commands(app)
 
-    # Import routes and initialize database within app context
+    # Return pooled database connections at the end of every request/event
+    from .utils.database import database, get_database
+    app.teardown_appcontext(database.release_connection)
+
+    # Startup state reported by /healthz and /readyz
+    from .utils.readiness import Readiness
+    readiness = app.extensions['readiness'] = Readiness(event_factory=socketio.server.eio.create_event)
+
+    # Import routes and register socket events with the app's one database instance
     with app.app_context():
+        db = get_database()
         from . import routes
-        
-        # Initialize database (now has access to current_app.config)
-        try:
-            db = initialize_database()
-        except Exception as e:
-            print(f"Failed to initialize database: {e}")
-            raise
-
-        # Register socket events
+
         from .utils.socket_events import register_socket_events
         register_socket_events(socketio, db)
 
+    # Connect and migrate in the background so the server binds its port immediately
+    socketio.start_background_task(initialize_database, app, db, readiness)
+
     # Add request/response middleware
+    from .utils.metrics import http_request_seconds
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.before_request
+    def require_ready():
+        """Answer 503 until the database bootstrap finishes, except for probes, metrics and static files."""
+        if not readiness.ready and request.endpoint not in READINESS_EXEMPT:
+            return "The application is starting; please retry shortly.", 503, {'Retry-After': '1'}
+
+    @app.after_request
+    def record_latency(r):
+        """Observe request latency by route template, so /static/<path:filename> is one series."""
+        if 'request_started' in g:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            http_request_seconds.observe(time.perf_counter() - g.request_started,
+                                         method=request.method, route=route, status=r.status_code)
+        return r
+
     @app.after_request
     def add_header(r):
         """Add headers to prevent caching issues."""
+        if g.get('cache_managed'):
+            return r
         r.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, public, max-age=0"
         r.headers["Pragma"] = "no-cache"
         r.headers["Expires"] = "0"
@@ -22,6 +22,18 @@ class Config:
     FLASK_PORT = int(os.environ.get('FLASK_PORT', 8080))
     FLASK_HOST = os.environ.get('FLASK_HOST', '0.0.0.0')
     SEND_FILE_MAX_AGE_DEFAULT = int(os.environ.get('SEND_FILE_MAX_AGE_DEFAULT', 0))
+    STATIC_FINGERPRINT = os.environ.get('STATIC_FINGERPRINT', 'true').lower() == 'true'  # content-hashed /static URLs
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 31536000))                       # seconds fingerprinted assets are cached
+    
+    #--------------------------------------------------
+    # PRODUCTION SERVER CONFIGURATION (gunicorn.conf.py)
+    #--------------------------------------------------
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 2))
+    WEB_WORKER_CONNECTIONS = int(os.environ.get('WEB_WORKER_CONNECTIONS', 1000))
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')  # e.g. redis://redis:6379/0; required for WEB_WORKERS > 1
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE')  # eventlet or threading; default picks eventlet when it imports
+    SOCKETIO_TRANSPORTS = os.environ.get('SOCKETIO_TRANSPORTS')  # e.g. websocket,polling; default drops polling when there is a message queue
     
     #--------------------------------------------------
     # DATABASE CONFIGURATION
@@ -31,6 +43,12 @@ class Config:
     DATABASE_USER = os.environ.get('DATABASE_USER', 'postgres')
     DATABASE_PASSWORD = os.environ.get('DATABASE_PASSWORD', 'iamsosecure')
     DATABASE_PORT = int(os.environ.get('DATABASE_PORT', 5432))
+    DATABASE_POOL_MIN = int(os.environ.get('DATABASE_POOL_MIN', 1))
+    DATABASE_POOL_MAX = int(os.environ.get('DATABASE_POOL_MAX', 10))
+    DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', 10))
+    DATABASE_POOL_PING_AFTER = float(os.environ.get('DATABASE_POOL_PING_AFTER', 30))
+    DATABASE_STATEMENT_TIMEOUT = float(os.environ.get('DATABASE_STATEMENT_TIMEOUT', 30))  # seconds; 0 disables
+    DATABASE_SEED_ON_INSTALL = os.environ.get('DATABASE_SEED_ON_INSTALL', 'true').lower() == 'true'
     
     #--------------------------------------------------
     # POSTGRESQL CONFIGURATION
@@ -43,11 +61,49 @@ class Config:
     #--------------------------------------------------
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+    OPENAI_STREAM = os.environ.get('OPENAI_STREAM', 'true').lower() == 'true'
+    OPENAI_POOL_SIZE = int(os.environ.get('OPENAI_POOL_SIZE', 10))
+    OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 5))
+    OPENAI_READ_TIMEOUT = float(os.environ.get('OPENAI_READ_TIMEOUT', 30))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 2))
+    OPENAI_RETRY_BACKOFF = float(os.environ.get('OPENAI_RETRY_BACKOFF', 0.5))
     OPENAI_MAX_TOKENS = int(os.environ.get('OPENAI_MAX_TOKENS', 4000))
-    OPENAI_MAX_CONVERSATION_HISTORY = int(os.environ.get('OPENAI_MAX_CONVERSATION_HISTORY', 1))
+    OPENAI_MAX_CONVERSATION_HISTORY = int(os.environ.get('OPENAI_MAX_CONVERSATION_HISTORY', 10))
     OPENAI_TEMPERATURE = float(os.environ.get('OPENAI_TEMPERATURE', 0.7))
+    OPENAI_CONTEXT_BUDGET = int(os.environ.get('OPENAI_CONTEXT_BUDGET', 2000))
+    OPENAI_CONTEXT_CHUNK_TOKENS = int(os.environ.get('OPENAI_CONTEXT_CHUNK_TOKENS', 200))
+    OPENAI_CACHE_ENABLED = os.environ.get('OPENAI_CACHE_ENABLED', 'true').lower() == 'true'
+    OPENAI_CACHE_ALL_TEMPERATURES = os.environ.get('OPENAI_CACHE_ALL_TEMPERATURES', 'false').lower() == 'true'
+    OPENAI_CACHE_DATABASE = os.environ.get('OPENAI_CACHE_DATABASE', 'false').lower() == 'true'
+    OPENAI_CACHE_TTL = float(os.environ.get('OPENAI_CACHE_TTL', 3600))
+    OPENAI_CACHE_MAX_ENTRIES = int(os.environ.get('OPENAI_CACHE_MAX_ENTRIES', 1024))
+    OPENAI_CACHE_MAX_BYTES = int(os.environ.get('OPENAI_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    OPENAI_SINGLE_FLIGHT = os.environ.get('OPENAI_SINGLE_FLIGHT', 'true').lower() == 'true'
     OPENAI_SYSTEM_PROMPT = os.environ.get('OPENAI_SYSTEM_PROMPT', 'You are a helpful AI assistant. Provide clear, concise, and accurate responses.')
     
+    #--------------------------------------------------
+    # PAGE CONTENT CONFIGURATION
+    #--------------------------------------------------
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 256))
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    PAGE_CLEAN_WORKERS = int(os.environ.get('PAGE_CLEAN_WORKERS', 2))
+    PAGE_CLEAN_OFFLOAD_BYTES = int(os.environ.get('PAGE_CLEAN_OFFLOAD_BYTES', 65536))
+    
+    #--------------------------------------------------
+    # CHAT JOB CONFIGURATION
+    #--------------------------------------------------
+    CHAT_ASYNC = os.environ.get('CHAT_ASYNC', 'true').lower() == 'true'
+    CHAT_JOB_WORKERS = int(os.environ.get('CHAT_JOB_WORKERS', 4))
+    CHAT_JOB_QUEUE_DEPTH = int(os.environ.get('CHAT_JOB_QUEUE_DEPTH', 32))
+    CHAT_JOB_TIMEOUT = float(os.environ.get('CHAT_JOB_TIMEOUT', 60))
+    CHAT_JOB_RESULT_TTL = float(os.environ.get('CHAT_JOB_RESULT_TTL', 300))
+    CONVERSATION_CACHE_MAX_ENTRIES = int(os.environ.get('CONVERSATION_CACHE_MAX_ENTRIES', 1024))
+    CONVERSATION_CACHE_TTL = float(os.environ.get('CONVERSATION_CACHE_TTL', 30))
+    CHAT_HISTORY_SIZE = int(os.environ.get('CHAT_HISTORY_SIZE', 50))  # messages replayed to clients joining a room
+    CHAT_MAX_ROOMS = int(os.environ.get('CHAT_MAX_ROOMS', 100))  # rooms whose history is kept; the least recently used is dropped
+    CHAT_FLUSH_INTERVAL = float(os.environ.get('CHAT_FLUSH_INTERVAL', 0))  # seconds to coalesce room emits; 0 disables
+    
     #--------------------------------------------------
     # ENCRYPTION CONFIGURATION
     #--------------------------------------------------
@@ -55,6 +111,11 @@ class Config:
     ENCRYPTION_ONEWAY_N = int(os.environ.get('ENCRYPTION_ONEWAY_N', 32))  # pow(2,5) = 32
     ENCRYPTION_ONEWAY_R = int(os.environ.get('ENCRYPTION_ONEWAY_R', 9))
     ENCRYPTION_ONEWAY_P = int(os.environ.get('ENCRYPTION_ONEWAY_P', 1))
+    ENCRYPTION_ONEWAY_LEGACY_N = int(os.environ.get('ENCRYPTION_ONEWAY_LEGACY_N', ENCRYPTION_ONEWAY_N))  # cost of pre-salt hashes
+    ENCRYPTION_ONEWAY_LEGACY_R = int(os.environ.get('ENCRYPTION_ONEWAY_LEGACY_R', ENCRYPTION_ONEWAY_R))
+    ENCRYPTION_ONEWAY_LEGACY_P = int(os.environ.get('ENCRYPTION_ONEWAY_LEGACY_P', ENCRYPTION_ONEWAY_P))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
     ENCRYPTION_REVERSIBLE_KEY = os.environ.get('ENCRYPTION_REVERSIBLE_KEY', '7pK_fnSKIjZKuv_Gwc--sZEMKn2zc8VvD6zS96XcNHE=')
     
     #--------------------------------------------------
@@ -64,6 +125,14 @@ class Config:
     FLASK_CONTAINER = os.environ.get('FLASK_CONTAINER', 'homework-flask-app')
     DB_INIT_CONTAINER = os.environ.get('DB_INIT_CONTAINER', 'homework-db-init')
     
+    #--------------------------------------------------
+    # OBSERVABILITY CONFIGURATION
+    #--------------------------------------------------
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.1))  # share of per-request/per-message log lines kept
+    LOG_JSON = os.environ.get('LOG_JSON', 'true').lower() == 'true'
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    
     #--------------------------------------------------
     # SYSTEM CONFIGURATION
     #--------------------------------------------------
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS conversation_messages (
+message_id      SERIAL        PRIMARY KEY,
+conversation_id char(32)      NOT NULL,
+role            varchar(20)   NOT NULL,
+content         text          NOT NULL,
+created_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+FOREIGN KEY (conversation_id) REFERENCES conversations(conversation_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS conversation_messages_conversation_idx ON conversation_messages (conversation_id, message_id);
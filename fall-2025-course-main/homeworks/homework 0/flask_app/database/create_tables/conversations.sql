@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS conversations (
+conversation_id char(32)      PRIMARY KEY,
+email           varchar(100)  DEFAULT NULL,
+created_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+updated_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS conversations_email_idx ON conversations (email, updated_at);
@@ -7,4 +7,5 @@ hyperlink       varchar(500) DEFAULT NULL,
 start_date      date DEFAULT NULL,
 end_date        date DEFAULT NULL,
 FOREIGN KEY (position_id) REFERENCES positions(position_id)
-);
\ No newline at end of file
+);
+CREATE INDEX IF NOT EXISTS experiences_position_idx ON experiences (position_id, (COALESCE(start_date, '-infinity'::date)) DESC, experience_id DESC);
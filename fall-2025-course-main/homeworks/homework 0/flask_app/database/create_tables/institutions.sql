@@ -7,4 +7,5 @@ address        varchar(100)  DEFAULT NULL,
 city           varchar(100)  DEFAULT NULL,
 state          varchar(100)  DEFAULT NULL,
 zip            varchar(10)   DEFAULT NULL
-);
\ No newline at end of file
+);
+CREATE INDEX IF NOT EXISTS institutions_type_idx ON institutions (type);
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS llm_cache (
+fingerprint     char(64)      PRIMARY KEY,
+model           varchar(100)  NOT NULL,
+response        text          NOT NULL,
+usage           text          DEFAULT NULL,
+latency_ms      integer       NOT NULL DEFAULT 0,
+created_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
\ No newline at end of file
@@ -6,4 +6,6 @@ responsibilities   varchar(500)  NOT NULL,
 start_date         date          NOT NULL,
 end_date           date          DEFAULT NULL,
 FOREIGN KEY (inst_id) REFERENCES institutions(inst_id)
-);
\ No newline at end of file
+);
+CREATE INDEX IF NOT EXISTS positions_start_idx ON positions (start_date DESC, position_id DESC);
+CREATE INDEX IF NOT EXISTS positions_inst_idx ON positions (inst_id, start_date DESC, position_id DESC);
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS schema_version (
+version         integer PRIMARY KEY,
+name            varchar(200) NOT NULL,
+applied_at      timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
\ No newline at end of file
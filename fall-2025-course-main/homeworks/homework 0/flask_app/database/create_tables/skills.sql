@@ -4,4 +4,5 @@ experience_id  integer DEFAULT NULL,
 name           varchar(200) NOT NULL,
 skill_level    integer NOT NULL,
 FOREIGN KEY (experience_id) REFERENCES experiences(experience_id)
-);
\ No newline at end of file
+);
+CREATE INDEX IF NOT EXISTS skills_experience_idx ON skills (experience_id, skill_level);
@@ -0,0 +1,48 @@
+-- Baseline schema: the original five tables.
+
+CREATE TABLE IF NOT EXISTS institutions (
+inst_id        SERIAL PRIMARY KEY,
+type           varchar(100)  NOT NULL,
+name           varchar(100)  NOT NULL,
+department     varchar(100)  DEFAULT NULL,
+address        varchar(100)  DEFAULT NULL,
+city           varchar(100)  DEFAULT NULL,
+state          varchar(100)  DEFAULT NULL,
+zip            varchar(10)   DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS positions (
+position_id        SERIAL PRIMARY KEY,
+inst_id            integer       NOT NULL,
+title              varchar(100)  NOT NULL,
+responsibilities   varchar(500)  NOT NULL,
+start_date         date          NOT NULL,
+end_date           date          DEFAULT NULL,
+FOREIGN KEY (inst_id) REFERENCES institutions(inst_id)
+);
+
+CREATE TABLE IF NOT EXISTS experiences (
+experience_id   SERIAL PRIMARY KEY,
+position_id     integer NOT NULL,
+name            varchar(500) NOT NULL,
+description     varchar(500) NOT NULL,
+hyperlink       varchar(500) DEFAULT NULL,
+start_date      date DEFAULT NULL,
+end_date        date DEFAULT NULL,
+FOREIGN KEY (position_id) REFERENCES positions(position_id)
+);
+
+CREATE TABLE IF NOT EXISTS skills (
+skill_id       SERIAL PRIMARY KEY,
+experience_id  integer DEFAULT NULL,
+name           varchar(200) NOT NULL,
+skill_level    integer NOT NULL,
+FOREIGN KEY (experience_id) REFERENCES experiences(experience_id)
+);
+
+CREATE TABLE IF NOT EXISTS users (
+user_id         SERIAL PRIMARY KEY,
+role            varchar(10)  NOT NULL,
+email           varchar(100) NOT NULL UNIQUE,
+password        varchar(256) NOT NULL
+);
@@ -0,0 +1,18 @@
+-- Server-side chat history: one row per conversation, one per message.
+CREATE TABLE IF NOT EXISTS conversations (
+conversation_id char(32)      PRIMARY KEY,
+email           varchar(100)  DEFAULT NULL,
+created_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+updated_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS conversations_email_idx ON conversations (email, updated_at);
+
+CREATE TABLE IF NOT EXISTS conversation_messages (
+message_id      SERIAL        PRIMARY KEY,
+conversation_id char(32)      NOT NULL,
+role            varchar(20)   NOT NULL,
+content         text          NOT NULL,
+created_at      timestamp     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+FOREIGN KEY (conversation_id) REFERENCES conversations(conversation_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS conversation_messages_conversation_idx ON conversation_messages (conversation_id, message_id);
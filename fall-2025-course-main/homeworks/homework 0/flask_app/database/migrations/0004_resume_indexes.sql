@@ -0,0 +1,6 @@
+-- Indexes for the resume foreign keys and the /api/resume filters and cursors.
+CREATE INDEX IF NOT EXISTS institutions_type_idx ON institutions (type);
+CREATE INDEX IF NOT EXISTS positions_start_idx ON positions (start_date DESC, position_id DESC);
+CREATE INDEX IF NOT EXISTS positions_inst_idx ON positions (inst_id, start_date DESC, position_id DESC);
+CREATE INDEX IF NOT EXISTS experiences_position_idx ON experiences (position_id, (COALESCE(start_date, '-infinity'::date)) DESC, experience_id DESC);
+CREATE INDEX IF NOT EXISTS skills_experience_idx ON skills (experience_id, skill_level);
@@ -1,17 +1,49 @@
 # Author: Prof. MM Ghassemi <ghassem3@msu.edu>
 
 from flask import current_app as app
-from flask import render_template, redirect, request, session, url_for, jsonify, send_from_directory
-from .utils.database import database
-from .utils.llm import ChatGPTClient
-from .utils.llm import handle_ai_chat_request
-from bs4 import BeautifulSoup
+from flask import render_template, redirect, request, session, url_for, jsonify, g
+from .utils.database import get_database
+from .utils.readiness import get_readiness
+from .utils.cache import resume_cache, identity_cache
+from .utils.llm import get_chat_client
+from .utils.llm import handle_ai_chat_request, enqueue_ai_chat_request
+from .utils.jobs import get_job_queue
+from .utils.rooms import get_room_broadcaster
+from .utils.singleflight import get_llm_flights
+from .utils.conversations import get_conversation_store, session_conversation
+from .utils.passwords import HasherBusy
+from .utils.page_content import get_page_snapshots
+from .utils.context_builder import build_context, count_tokens
+from .utils.metrics import registry
+from .utils.assets import get_asset_manifest, send_asset
+from .utils.logs import get_logger, log
+import base64
+import calendar
+import datetime
+import hashlib
 import json
+import logging
+import time
 
 #--------------------------------------------------
 # GLOBAL INSTANCES
 #--------------------------------------------------
-db = database()
+db     = get_database()
+logger = get_logger(__name__)
+
+# Point-in-time gauges read on each /metrics scrape
+registry.gauge('db_pool_connections', 'Pooled database connections by state',
+               lambda: {(state,): db.pool_stats()[state] for state in ('in_use', 'idle', 'waiting')}, ('state',))
+registry.gauge('chat_jobs', 'Background chat jobs by state',
+               lambda: {(state,): get_job_queue().stats()[state] for state in ('queued', 'running')}, ('state',))
+registry.gauge('cache_hit_ratio', 'Hit ratio of the in-process caches',
+               lambda: {(stats['name'],): stats['hit_ratio'] for stats in (resume_cache.stats(), identity_cache.stats())}, ('cache',))
+registry.gauge('chat_rooms', 'Chat rooms with replay history',
+               lambda: len(get_room_broadcaster().stats()['rooms']))
+registry.gauge('chat_room_buffered_messages', 'Messages held for replay across all chat rooms',
+               lambda: sum(get_room_broadcaster().stats()['rooms'].values()))
+registry.gauge('llm_calls_in_flight', 'Upstream LLM calls currently in flight',
+               lambda: get_llm_flights() and get_llm_flights().stats()['in_flight'])
 
 #--------------------------------------------------
 # MAIN APPLICATION ROUTES
@@ -27,13 +59,115 @@ def agents():
 
 @app.route('/agents/resume')
 def resume():
-    return render_template('dynamic-page.html', user=db.get_user_email(), page_type='resume')
+    # Inline the resume so the page renders without a follow-up /api/resume request
+    snapshot = resume_cache.get_or_build('resume_snapshot', build_resume_snapshot)
+    return render_template('dynamic-page.html', user=db.get_user_email(), page_type='resume', snapshot=snapshot)
+
+# Query parameters that make /api/resume return a filtered page rather than the whole tree
+RESUME_PAGE_PARAMS = {'institution', 'type', 'from', 'to', 'min_skill', 'cursor', 'limit', 'position', 'experiences'}
 
 @app.route('/api/resume')
 def api_resume():
-    """API endpoint to serve resume data as JSON for Vue.js frontend."""
-    resume_data = db.getResumeData()
-    return jsonify({ "success": True, "data": resume_data})
+    """
+    API endpoint to serve resume data as JSON for Vue.js frontend.
+
+    Without paging parameters the whole (cached) tree is returned. Any of
+    institution, type, from, to, min_skill, limit, experiences or cursor
+    returns one filtered page instead; with position, pages through that
+    position's experiences. Other query parameters, such as a cache-busting
+    ?v=, are ignored.
+    """
+    if RESUME_PAGE_PARAMS.intersection(request.args):
+        return api_resume_page()
+
+    body, etag = resume_cache.get_or_build('api_resume', build_resume_payload)
+
+    # Let browsers keep the payload and revalidate it with If-None-Match
+    g.cache_managed = True
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def api_resume_page():
+    """Filtered, cursor-paginated slice of the resume for /api/resume?..."""
+    try:
+        filters = {
+            'start':     parse_month(request.args.get('from')),
+            'end':       parse_month(request.args.get('to'), end_of_month=True),
+            'min_skill': request.args.get('min_skill', type=int),
+        }
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        after = decode_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    position_id = request.args.get('position', type=int)
+    if position_id is not None:
+        data, cursor = db.getExperiencePage(position_id, limit=limit, after=after, **filters)
+    else:
+        data, cursor = db.getResumePage(institutions=request.args.getlist('institution', type=int),
+                                        inst_type=request.args.get('type'),
+                                        limit=limit, after=after,
+                                        experience_limit=min(max(request.args.get('experiences', 20, type=int), 1), 100),
+                                        **filters)
+        for institution in data.values():
+            for position in institution['positions'].values():
+                position['experiences_next'] = encode_cursor(position['experiences_next'])
+    return jsonify({"success": True, "data": data, "next": encode_cursor(cursor)})
+
+def parse_month(value, end_of_month=False):
+    """Parse a YYYY-MM or YYYY-MM-DD query parameter; a bare month means its first (or last) day."""
+    if not value:
+        return None
+    try:
+        if len(value) == 7:
+            year, month = map(int, value.split('-'))
+            day = calendar.monthrange(year, month)[1] if end_of_month else 1
+            return datetime.date(year, month, day)
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM or YYYY-MM-DD")
+
+def encode_cursor(cursor):
+    """Opaque, URL-safe form of a page cursor."""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises ValueError for a malformed token."""
+    if not token:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if cursor[0] != '-infinity':
+            datetime.date.fromisoformat(cursor[0])
+        return [cursor[0], int(cursor[1])]
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise ValueError("Invalid cursor")
+
+def build_resume_payload():
+    """
+    Serialize the resume for /api/resume.
+
+    Returns:
+        tuple: (JSON body, strong ETag derived from the body)
+    """
+    body = app.json.dumps({ "success": True, "data": db.getResumeData()})
+    etag = hashlib.sha256(body.encode('utf-8')).hexdigest()
+    return body, etag
+
+def build_resume_snapshot():
+    """
+    The /api/resume body made safe to embed in a <script> element.
+
+    Returns:
+        str: JSON with <, >, & and ' escaped, so the data cannot close the element
+    """
+    body, _ = resume_cache.get_or_build('api_resume', build_resume_payload)
+    return (body.replace('<', '\\u003c').replace('>', '\\u003e')
+                .replace('&', '\\u0026').replace("'", '\\u0027'))
 
 #--------------------------------------------------
 # CHAT ROUTES
@@ -43,20 +177,29 @@ def chat_with_ai():
     # Get message, page content, and system prompt from request data
     data          = request.get_json()
     message       = data.get('message', '').strip()
-    page_content  = data.get('pageContent', {})
+    page_content  = data.get('pageContent') or {}
     
-    # Log the received data for debugging
-    print(f"Received message: {message}")
-    print(f"Received page content: {page_content}")
+    # Resolve the page text: full HTML is cleaned once per distinct page, later messages may send only its hash
+    snapshots = get_page_snapshots()
+    clean_content, page_hash = snapshots.resolve(page_content)
+    if clean_content is None and page_hash:
+        return jsonify({"success": False, "pageContentRequired": True,
+                        "response": "Page snapshot not found; resend the page content."}), 409
+
+    # Log the received data for debugging (sizes only: messages and pages may be personal)
+    log(logger, logging.DEBUG, "Chat request", sampled=True, chars=len(message), url=page_content.get('url', 'N/A'),
+        page_hash=page_hash, page_chars=len(clean_content or ''))
     
-    # Create LLM client and pass it to the handler
-    chatGPT = ChatGPTClient()
+    # Reuse the shared LLM client (and its pooled connections) for this request
+    chatGPT = get_chat_client()
     
     # Create a dynamic system prompt that leverages page content when relevant
-    if page_content and page_content.get('content'):
-        
-        # Clean HTML content to get clean text
-        clean_content = clean_html_content(page_content.get('content', ''))
+    context_stats = None
+    if clean_content is not None:
+
+        # Keep only the page chunks most relevant to the message that fit the token budget
+        page_context, context_stats = build_context(snapshots.index(page_hash, clean_content), message,
+                                                    app.config.get('OPENAI_CONTEXT_BUDGET'))
         
         #Specify prompt to use when responding to the user's message.
         system_prompt = f""" 
@@ -70,7 +213,7 @@ def chat_with_ai():
             CURRENT PAGE CONTENT:
             Title:   {page_content.get('title', 'Unknown page')}
             URL:     {page_content.get('url', 'N/A')}
-            Content: {clean_content}
+            Content: {page_context}
 
             Use this content to provide contextually relevant responses when appropriate.
         """
@@ -78,9 +221,36 @@ def chat_with_ai():
     else:
         # Fallback system prompt when no page content is available
         system_prompt = "You are a helpful AI assistant."
-        print("Using fallback system prompt (no page content available)")
+        log(logger, logging.DEBUG, "Using fallback system prompt (no page content available)", sampled=True)
 
-    return handle_ai_chat_request(llm_client=chatGPT, message=message, system_prompt=system_prompt, room='main', page_content=page_content)
+    # Log the prompt size and how much of the page was left out
+    log(logger, logging.INFO, "Prompt built", sampled=True,
+        prompt_tokens=count_tokens(system_prompt) + count_tokens(message), **(context_stats or {}))
+
+    # Clients may send `"cache": false` to force a fresh completion
+    use_cache = data.get('cache', True) is not False
+
+    # Answer in the background and deliver over SocketIO, or hold the request for the full round trip
+    if app.config.get('CHAT_ASYNC'):
+        return enqueue_ai_chat_request(llm_client=chatGPT, message=message, system_prompt=system_prompt, room='main',
+                                       owner=data.get('socketId'), use_cache=use_cache)
+    return handle_ai_chat_request(llm_client=chatGPT, message=message, system_prompt=system_prompt, room='main', page_content=page_content, use_cache=use_cache)
+
+@app.route('/chat/history')
+def chat_history():
+    # Page backwards through this session's conversation: pass the returned `before` cursor to get older messages
+    store = get_conversation_store()
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    page  = store.page(session_conversation(store), before=request.args.get('before', type=int), limit=max(limit, 1))
+    return jsonify({"success": True, **page})
+
+@app.route('/chat/jobs/<job_id>')
+def chat_job(job_id):
+    # Poll a queued AI request, for clients without a socket connection
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "response": "Unknown or expired job."}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
 
 #--------------------------------------------------
 # AUTHENTICATION ROUTES
@@ -100,16 +270,24 @@ def processlogin():
         return json.dumps({"success": 0,"error": "Email and password are required"})
     
     # Check if the username and password match
-    status = db.authenticate(email=email, password=password)
+    try:
+        status = db.authenticate(email=email, password=password)
+    except HasherBusy:
+        return json.dumps({"success": 0, "error": "Too many logins in progress, please try again"}), 503
 
     # Encrypt email and store it in the session
     session['email'] = db.reversibleEncrypt('encrypt', email) 
 
+    # Resolve the role now so later pages and chat messages find it cached
+    if status.get('success'):
+        db.get_identity()
+
     return json.dumps(status)
 
 @app.route('/logout')
 def logout():
     # Clear the entire session
+    db.forget_identity()
     session.clear()
     return redirect('/')
 
@@ -118,51 +296,64 @@ def logout():
 # UTILITY ROUTES
 #--------------------------------------------------
 
-@app.route("/static/<path:path>")
-def static_dir(path):
-    return send_from_directory("static", path)
+@app.route('/metrics')
+def metrics():
+    # Prometheus scrape endpoint
+    if not app.config.get('METRICS_ENABLED'):
+        return jsonify({"success": False}), 404
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process is serving; fails only once the database bootstrap has given up, so it gets restarted
+    readiness = get_readiness()
+    return jsonify(readiness.stats()), 503 if readiness.failed else 200
+
+@app.route('/readyz')
+def readyz():
+    # Readiness: the schema is migrated and the database answers right now
+    readiness = get_readiness()
+    status    = readiness.stats()
+    if not readiness.ready:
+        return jsonify(status), 503
+    try:
+        started = time.perf_counter()
+        db.fetch_one("SELECT 1")
+        status['database_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    except Exception as e:
+        log(logger, logging.WARNING, "Readiness check failed", error=str(e))
+        return jsonify(dict(status, status='unavailable', error=str(e))), 503
+    return jsonify(status), 200
+
+@app.route('/static/<path:filename>', endpoint='static')
+def static_file(filename):
+    # Fingerprinted assets are immutable; anything else revalidates
+    return send_asset(get_asset_manifest(), filename, app.config.get('STATIC_MAX_AGE', 31536000))
+
+@app.url_defaults
+def fingerprint_static(endpoint, values):
+    # url_for('static', filename='js/chat-vue.js') -> /static/js/chat-vue.<hash>.js
+    if endpoint == 'static' and 'filename' in values and app.config.get('STATIC_FINGERPRINT', True):
+        values['filename'] = get_asset_manifest().hashed(values['filename'])
+
+@app.context_processor
+def socketio_settings():
+    # Transports the server accepts, so the chat client never falls back to one it would reject
+    return {'socketio_transports': app.config.get('SOCKETIO_TRANSPORTS') or ['websocket', 'polling']}
+
+@app.context_processor
+def static_urls():
+    # Image URLs for the Vue templates, which cannot call url_for
+    if not app.config.get('STATIC_FINGERPRINT', True):
+        return {'static_urls': {}}
+    return {'static_urls': {path: url_for('static', filename=path) for path in get_asset_manifest().paths('images/')}}
 
 @app.after_request
 def add_header(r):
+    # Views that negotiate their own caching (ETag revalidation) opt out
+    if g.get('cache_managed'):
+        return r
     r.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, public, max-age=0"
     r.headers["Pragma"] = "no-cache"
     r.headers["Expires"] = "0"
     return r
-
-def clean_html_content(html_content):
-    """
-    Clean HTML content by removing tags and extracting clean text.
-    
-    Args:
-        html_content (str): Raw HTML content
-        
-    Returns:
-        str: Clean text content without HTML tags
-    """
-    if not html_content:
-        return ""
-    
-    try:
-        # Parse HTML with Beautiful Soup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script, style, and other non-content elements
-        for element in soup(["script", "style", "nav", "footer", "header", "aside"]):
-            element.decompose()
-        
-        # Get text and clean it up
-        text = soup.get_text()
-        
-        # Clean up whitespace and normalize
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
-        return text
-    except Exception as e:
-        print(f"Error cleaning HTML content: {e}")
-        # Fallback: return original content if cleaning fails
-        return html_content
@@ -10,7 +10,7 @@ const AgentsComponent = {
         <div class="bg-white rounded-lg shadow-lg overflow-hidden">
           <div class="flex">
             <div class="w-1/3 p-8 flex items-center justify-center bg-gray-200">
-              <img src="/static/images/resume-project-icon.png" alt="Resume Chat Agent" class="w-48 h-48 rounded-full object-cover shadow-lg">
+              <img :src="staticUrl('images/resume-project-icon.png')" alt="Resume Chat Agent" class="w-48 h-48 rounded-full object-cover shadow-lg">
             </div>
             <div class="w-2/3 p-8">
               <h2 class="text-2xl font-bold text-gray-900 mb-4">Resume Chat Agent</h2>
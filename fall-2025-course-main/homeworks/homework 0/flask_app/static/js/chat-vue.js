@@ -76,6 +76,9 @@ const ChatComponent = {
     const messagesContainer = Vue.ref(null);       // References the DOM elements that contain the chat messages.
     const aiMessageCount = Vue.ref(ChatStore.aiMessageCount); // Count of messages sent to AI - now from global store
 
+    const streamingMessages = {};                  // Streamed AI responses still being generated, keyed by message id
+    const joinedSeqs = new Set();                  // Room messages received live since the last join
+
     // Configuration
     const CHAT_CONFIG = {ROOM_NAME: 'main',  TYPING_DELAY: 100, SOCKET_NAMESPACE: '/chat'};
 
@@ -90,12 +93,12 @@ const ChatComponent = {
       // Send user message to the chat history window via SocketIO (this is so that other users can see the message, in case you want mulit-user chat)
       if (socket.value && isConnected.value) {socket.value.emit('text', {msg:  message,room: CHAT_CONFIG.ROOM_NAME});}
 
-      // Capture the current page content
+      // Capture the current page content (the main content area, not the chat panel, so it stays stable between messages)
+      const pageElement = document.getElementById('page-content') || document.body;
       const pageContent = {                   // Capture the current page content
         title: document.title,                // The title of the page
         url: window.location.href,            // The URL of the page
-        content: document.body.innerHTML || '', // Send HTML content for backend cleaning
-        html: document.body.innerHTML || ''    // The HTML content of the page
+        content: pageElement.innerHTML || ''  // Send HTML content for backend cleaning
       };
       
       // Log the captured page content for debugging
@@ -110,12 +113,23 @@ const ChatComponent = {
       }, CHAT_CONFIG.TYPING_DELAY);           // The delay before showing the typing indicator
     };
 
+    // Live room message: note its sequence number so a later replay does not repeat it
+    const receiveMessage = (data) => {
+      joinedSeqs.add(data.seq);
+      ChatStore.markSeen(data.epoch, data.seq);
+      handleAIResponse(data);
+    };
+
     const handleAIResponse = (data) => {
       console.log('Handling AI response:', data);
       // Then render the chat message
       removeTypingIndicator();
       const role = data.role || 'user';
-      addMessage(role, data.msg, false, data.style);  // Add the AI response to the chat history window
+      if (data.id && streamingMessages[data.id]) {
+        completeStreamingMessage(data);                // Replace the streamed draft with the final response
+      } else {
+        addMessage(role, data.msg, false, data.style);  // Add the AI response to the chat history window
+      }
       
       // ============================================================================
       // ADD YOUR POST-RESPONSE ACTIONS HERE
@@ -132,10 +146,28 @@ const ChatComponent = {
     // ============================================================================
     // Helper functions follow (you probably don't need to modify these)
     // ============================================================================
-    const sendMessageToAI = (message, pageContent) => {
+    // Page snapshots: once the server has cleaned a page, later messages send only its SHA-256 hash
+    const hashPageContent = async (content) => {
+      if (!window.crypto || !window.crypto.subtle) return null;  // Not available outside secure contexts
+      const digest = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(content));
+      return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    };
+
+    const knownPageHashes = () => JSON.parse(sessionStorage.getItem('page-hashes') || '[]');
+
+    const rememberPageHash = (hash, known) => {
+      const hashes = knownPageHashes().filter(h => h !== hash);
+      if (known) hashes.push(hash);
+      sessionStorage.setItem('page-hashes', JSON.stringify(hashes.slice(-20)));
+    };
+
+    const sendMessageToAI = async (message, pageContent, forceContent = false) => {
+      const hash = pageContent.content ? await hashPageContent(pageContent.content).catch(() => null) : null;
+      const sendHashOnly = hash && !forceContent && knownPageHashes().includes(hash);
       const requestBody = { 
         message: message,
-        pageContent: pageContent
+        socketId: socket.value ? socket.value.id : null,
+        pageContent: sendHashOnly ? { title: pageContent.title, url: pageContent.url, hash: hash } : { ...pageContent, hash: hash }
       };
 
       fetch('/chat/ai', {
@@ -147,11 +179,20 @@ const ChatComponent = {
       })
       .then(response => response.json())
       .then(data => {
+        if (data.pageContentRequired) {
+          // The server no longer has this page (evicted or restarted): resend it in full
+          rememberPageHash(hash, false);
+          sendMessageToAI(message, pageContent, true);
+          return;
+        }
+        if (hash) rememberPageHash(hash, true);
         if (!data.success) {
           removeTypingIndicator();
-          addMessage('assistant', 'AI service error. Please try again.');
+          discardStreamingMessage(data.message_id);
+          addMessage('assistant', data.busy ? data.response : 'AI service error. Please try again.');
           return;
         }
+        // A queued request (data.queued) is answered over the socket: 'message' on success, 'chat_error' on failure
         // Note: UI highlighting functionality has been removed
       })
       .catch(error => {
@@ -164,7 +205,8 @@ const ChatComponent = {
 
     const initializeSocketIO = () => {
       try {
-        socket.value = io(CHAT_CONFIG.SOCKET_NAMESPACE);
+        // Websocket first; with several server workers the server offers only websocket, since polls are not routed stickily
+        socket.value = io(CHAT_CONFIG.SOCKET_NAMESPACE, { transports: window.SOCKETIO_TRANSPORTS || ['websocket', 'polling'] });
         setupSocketEventHandlers();
         console.log('SocketIO connection initialized');
       } catch (error) {
@@ -181,14 +223,45 @@ const ChatComponent = {
         isConnected.value = true;
         console.log('Connected to chat room:', CHAT_CONFIG.ROOM_NAME);
         
+        joinedSeqs.clear();
         socket.value.emit('joined', { 
-          room: CHAT_CONFIG.ROOM_NAME 
+          room: CHAT_CONFIG.ROOM_NAME,
+          since: ChatStore.lastSeen
         });
       });
 
       socket.value.on('message', (data) => {
         removeTypingIndicator();
-        handleAIResponse(data);
+        receiveMessage(data);
+      });
+
+      // Several room messages coalesced into one frame
+      socket.value.on('messages', (data) => {
+        removeTypingIndicator();
+        data.messages.forEach(receiveMessage);
+      });
+
+      // Messages sent to the room before this client (re)joined
+      socket.value.on('history', (data) => {
+        const since = ChatStore.lastSeen.epoch === data.epoch ? ChatStore.lastSeen.seq : 0;
+        data.messages
+          .filter(message => message.seq > since && !joinedSeqs.has(message.seq))
+          .forEach(message => {
+            addMessage(message.role || 'user', message.msg, false, message.style);
+            ChatStore.markSeen(message.epoch, message.seq);
+          });
+        ChatStore.saveToStorage();
+      });
+
+      socket.value.on('message_delta', (data) => {
+        handleMessageDelta(data);
+      });
+
+      socket.value.on('chat_error', (data) => {
+        removeTypingIndicator();
+        discardStreamingMessage(data.id);
+        addMessage('assistant', 'AI service error. Please try again.');
+        console.error('AI job failed:', data.error);
       });
 
       socket.value.on('connect_error', (error) => {
@@ -213,7 +286,11 @@ const ChatComponent = {
       // Update local reactive state by creating a new array reference
       messages.value = [...ChatStore.messages];
       
-      // Scroll to bottom
+      scrollToBottom();
+      return message;
+    };
+
+    const scrollToBottom = () => {
       Vue.nextTick(() => {
         if (messagesContainer.value) {
           messagesContainer.value.scrollTop = messagesContainer.value.scrollHeight;
@@ -221,6 +298,38 @@ const ChatComponent = {
       });
     };
 
+    // Streamed responses: each delta extends one draft message until the final 'message' event completes it
+    const handleMessageDelta = (data) => {
+      let message = streamingMessages[data.id];
+      if (!message) {
+        removeTypingIndicator();
+        message = addMessage(data.role || 'assistant', '', false, data.style);
+        streamingMessages[data.id] = message;
+      }
+      message.content += data.delta;
+      messages.value = [...ChatStore.messages];
+      scrollToBottom();
+    };
+
+    const completeStreamingMessage = (data) => {
+      const message = streamingMessages[data.id];
+      delete streamingMessages[data.id];
+      message.content = data.msg;
+      ChatStore.saveToStorage();
+      messages.value = [...ChatStore.messages];
+      scrollToBottom();
+    };
+
+    const discardStreamingMessage = (messageId) => {
+      const message = messageId && streamingMessages[messageId];
+      if (!message) return;
+      delete streamingMessages[messageId];
+      const index = ChatStore.messages.indexOf(message);
+      if (index !== -1) ChatStore.messages.splice(index, 1);
+      ChatStore.saveToStorage();
+      messages.value = [...ChatStore.messages];
+    };
+
     const showTypingIndicator = () => {
       console.log('Showing typing indicator...');
       addMessage('assistant', '...', true);
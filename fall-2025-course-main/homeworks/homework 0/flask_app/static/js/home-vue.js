@@ -10,7 +10,7 @@ const HomeComponent = {
       <div class="bg-white rounded-lg shadow-lg overflow-hidden mb-12">
         <div class="flex">
           <div class="w-1/3 p-8 flex items-center justify-center bg-gray-200">
-            <img src="/static/images/headshot.png" alt="Prof. Ghassemi" class="w-64 h-64 rounded-full object-cover shadow-lg">
+            <img :src="staticUrl('images/headshot.png')" alt="Prof. Ghassemi" class="w-64 h-64 rounded-full object-cover shadow-lg">
           </div>
           <div class="w-2/3 p-8">
             <h2 class="text-3xl font-bold text-gray-900 mb-6">About me:</h2>
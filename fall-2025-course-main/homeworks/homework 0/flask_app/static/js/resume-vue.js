@@ -156,8 +156,29 @@ const ResumeComponent = {
       }
     };
 
+    // Hydrate from the snapshot rendered into the page; fetch only when it is missing
+    const loadSnapshot = () => {
+      const element = document.getElementById('resume-snapshot');
+      if (!element) {
+        return false;
+      }
+      try {
+        const result = JSON.parse(element.textContent);
+        if (!result.success) {
+          return false;
+        }
+        resumeData.value = result.data;
+        loading.value    = false;
+        return true;
+      } catch (e) {
+        return false;
+      }
+    };
+
     Vue.onMounted(() => {
-      loadResumeData();
+      if (!loadSnapshot()) {
+        loadResumeData();
+      }
     });
 
     return {
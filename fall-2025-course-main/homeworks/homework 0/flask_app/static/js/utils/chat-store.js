@@ -9,6 +9,7 @@ const ChatStore = {
   messages: [],
   aiMessageCount: 0,
   isConnected: false,
+  lastSeen: { epoch: null, seq: 0 },   // Last room message received from the server, sent back when rejoining
   
   // Initialize store
   init() {
@@ -54,6 +55,14 @@ const ChatStore = {
     this.saveToStorage();
   },
   
+  // Remember the newest room message received so a rejoin only replays what was missed
+  markSeen(epoch, seq) {
+    if (!epoch || !seq) return;
+    if (epoch !== this.lastSeen.epoch || seq > this.lastSeen.seq) {
+      this.lastSeen = { epoch, seq };
+    }
+  },
+  
   // Set connection status
   setConnectionStatus(status) {
     this.isConnected = status;
@@ -73,7 +82,8 @@ const ChatStore = {
       localStorage.setItem('chat-store', JSON.stringify({
         messages: this.messages,
         aiMessageCount: this.aiMessageCount,
-        isConnected: this.isConnected
+        isConnected: this.isConnected,
+        lastSeen: this.lastSeen
       }));
     } catch (error) {
       console.warn('Failed to save chat state to localStorage:', error);
@@ -89,6 +99,7 @@ const ChatStore = {
         this.messages = data.messages || [];
         this.aiMessageCount = data.aiMessageCount || 0;
         this.isConnected = data.isConnected || false;
+        this.lastSeen = data.lastSeen || { epoch: null, seq: 0 };
       }
     } catch (error) {
       console.warn('Failed to load chat state from localStorage:', error);
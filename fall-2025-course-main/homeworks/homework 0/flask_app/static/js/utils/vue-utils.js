@@ -3,6 +3,11 @@
  * Shared utilities for Vue component initialization and mounting
  */
 
+// Fingerprinted URL of a file under /static (see window.STATIC_URLS in layout.html)
+function staticUrl(path) {
+  return (window.STATIC_URLS || {})[path] || `/static/${path}`;
+}
+
 // Vue App Factory - creates and mounts Vue apps with common patterns
 const VueAppFactory = {
   /**
@@ -15,6 +20,7 @@ const VueAppFactory = {
     const createAppFunction = () => {
       const { createApp } = Vue;
       const app = createApp(component);
+      app.config.globalProperties.staticUrl = staticUrl;
       
       // Mount to the specified container
       const container = document.getElementById(containerId);
@@ -0,0 +1,185 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import current_app, request, redirect, send_from_directory, url_for, Response, g
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:     # Brotli variants are skipped when the package is not installed
+    brotli = None
+
+# Extensions worth precompressing; images such as PNG are already compressed
+COMPRESSIBLE = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map', '.ico')
+
+# The fingerprint inserted before the extension: js/chat-vue.<12 hex digits>.js
+FINGERPRINT  = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{12}(?P<ext>\.[^./]+)$')
+
+class AssetManifest:
+    """
+    Content-hashed names and precompressed variants of the files in a static folder.
+
+    `js/chat-vue.js` is published as `js/chat-vue.<hash>.js`. Because the name
+    changes whenever the content does, hashed URLs can be cached by browsers
+    for a year without revalidation. Text assets are gzip (and, when available,
+    brotli) compressed once and kept in memory.
+    """
+
+    def __init__(self, folder, watch=False, min_compress_size=512):
+        """
+        Initialize the manifest and fingerprint every file in `folder`.
+
+        Args:
+            folder (str): Static folder to serve
+            watch (bool): Re-fingerprint files whose mtime changed (development)
+            min_compress_size (int): Files smaller than this many bytes are not compressed
+        """
+        self.folder            = folder
+        self.watch             = watch
+        self.min_compress_size = min_compress_size
+        self._assets           = {}     # path -> entry
+        self._by_hash          = {}     # hashed path -> path
+        self._lock             = threading.Lock()
+        for root, _, files in os.walk(folder):
+            for name in files:
+                self._load(os.path.relpath(os.path.join(root, name), folder).replace(os.sep, '/'))
+
+    def _load(self, path):
+        full = safe_join(self.folder, path)
+        if full is None or not os.path.isfile(full):
+            return None
+        mtime = os.stat(full).st_mtime
+        with open(full, 'rb') as f:
+            data = f.read()
+
+        digest    = hashlib.sha256(data).hexdigest()[:12]
+        stem, ext = os.path.splitext(path)
+        variants  = {}
+        if ext.lower() in COMPRESSIBLE and len(data) >= self.min_compress_size:
+            compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed['br'] = brotli.compress(data, quality=11)
+            variants = {encoding: body for encoding, body in compressed.items() if len(body) < len(data)}
+
+        entry = {'path': path, 'hashed': f"{stem}.{digest}{ext}", 'digest': digest,
+                 'mtime': mtime, 'size': len(data), 'variants': variants}
+        with self._lock:
+            previous = self._assets.get(path)
+            if previous is not None:
+                self._by_hash.pop(previous['hashed'], None)
+            self._assets[path] = entry
+            self._by_hash[entry['hashed']] = path
+        return entry
+
+    def lookup(self, path):
+        """Entry for an unhashed path such as 'js/chat-vue.js', or None if it does not exist."""
+        entry = self._assets.get(path)
+        if self.watch:
+            full = safe_join(self.folder, path)
+            if full is None or not os.path.isfile(full):
+                return None
+            if entry is None or entry['mtime'] != os.stat(full).st_mtime:
+                entry = self._load(path)
+        return entry
+
+    def hashed(self, path):
+        """The fingerprinted name for `path`, or `path` itself if it is not a known asset."""
+        entry = self.lookup(path)
+        return entry['hashed'] if entry else path
+
+    def resolve(self, hashed):
+        """Entry for a fingerprinted name, or None if the name is not current."""
+        path = self._by_hash.get(hashed)
+        return self._assets.get(path) if path else None
+
+    def unhashed(self, hashed):
+        """Entry currently published for a fingerprinted name whose content has since changed, or None."""
+        match = FINGERPRINT.match(hashed)
+        return self.lookup(match['stem'] + match['ext']) if match else None
+
+    def paths(self, prefix=''):
+        """Unhashed paths of the known assets starting with `prefix`."""
+        with self._lock:
+            return sorted(path for path in self._assets if path.startswith(prefix))
+
+    def stats(self):
+        """Number of assets and their raw and compressed sizes."""
+        with self._lock:
+            assets = list(self._assets.values())
+        return {
+            'assets': len(assets),
+            'bytes': sum(entry['size'] for entry in assets),
+            'compressed': {encoding: sum(len(entry['variants'][encoding]) for entry in assets if encoding in entry['variants'])
+                           for encoding in ('gzip', 'br')},
+        }
+
+#--------------------------------------------------
+# SERVING
+#--------------------------------------------------
+def send_asset(manifest, filename, max_age):
+    """
+    Serve a file from the static folder.
+
+    Fingerprinted names are served as immutable for `max_age` seconds, using the
+    best precompressed variant the client accepts. An outdated fingerprint, e.g.
+    from a page rendered before a deploy, redirects to the current one. Any
+    other name is served with `no-cache`, so the browser revalidates it with
+    its ETag.
+
+    Args:
+        manifest (AssetManifest): Manifest of the static folder
+        filename (str): Requested path below /static/
+        max_age (int): Cache lifetime of fingerprinted assets, in seconds
+
+    Returns:
+        Response: The asset
+    """
+    g.cache_managed = True      # Skip the app-wide no-store headers
+    entry = manifest.resolve(filename)
+    if entry is None and not os.path.isfile(safe_join(manifest.folder, filename) or ''):
+        current = manifest.unhashed(filename)
+        if current is not None:
+            response = redirect(url_for('static', filename=current['path']))
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+    if entry is None:
+        response = send_from_directory(manifest.folder, filename, max_age=0)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    encoding = next((encoding for encoding in ('br', 'gzip')
+                     if encoding in entry['variants'] and request.accept_encodings[encoding] > 0), None)
+    if encoding is None:
+        response = send_from_directory(manifest.folder, entry['path'], max_age=max_age, etag=entry['digest'])
+    else:
+        mimetype = mimetypes.guess_type(entry['path'])[0] or 'application/octet-stream'
+        response = Response(entry['variants'][encoding], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{entry['digest']}-{encoding}")
+        response.make_conditional(request)
+
+    response.headers['Cache-Control'] = f"public, max-age={max_age}, immutable"
+    if entry['variants']:
+        response.vary.add('Accept-Encoding')
+    return response
+
+#--------------------------------------------------
+# SHARED MANIFEST
+#--------------------------------------------------
+_manifest      = None
+_manifest_lock = threading.Lock()
+
+def get_asset_manifest():
+    """Return the process-wide manifest of flask_app/static, building it on first use."""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = AssetManifest(os.path.join(current_app.root_path, 'static'),
+                                          watch=current_app.debug)
+    return _manifest
@@ -0,0 +1,204 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+import time
+from collections import OrderedDict
+
+class VersionedCache:
+    """
+    In-process cache whose entries are tied to a data version.
+
+    Writers call invalidate() to bump the version. A value built while the
+    version changed underneath it is returned to its caller but never stored,
+    so a stale build cannot outlive the write that made it stale.
+    """
+
+    def __init__(self, name='cache'):
+        """
+        Initialize an empty cache.
+
+        Args:
+            name (str): Label used when reporting statistics
+        """
+        self.name           = name
+        self._version       = 0
+        self._entries       = {}
+        self._lock          = threading.Lock()
+        self.hits           = 0
+        self.misses         = 0
+        self.invalidations  = 0
+
+    @property
+    def version(self):
+        """Current data version."""
+        return self._version
+
+    def get_or_build(self, key, builder):
+        """
+        Return the cached value for `key`, calling `builder()` on a miss.
+
+        Args:
+            key: Cache key
+            builder (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly built value
+        """
+        with self._lock:
+            version = self._version
+            entry   = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = builder()
+
+        with self._lock:
+            if self._version == version:
+                self._entries[key] = (version, value)
+        return value
+
+    def invalidate(self):
+        """Drop every entry and advance the data version."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Snapshot of cache effectiveness.
+
+        Returns:
+            dict: Version, entry count, hit/miss/invalidation counters and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'version': self._version,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with optional per-entry TTL.
+
+    Entries are evicted oldest-use first once either `max_entries` or
+    `max_bytes` (the sum of the sizes given to put()) is exceeded.
+    """
+
+    def __init__(self, name='lru', max_entries=1024, max_bytes=None, ttl=None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            name (str): Label used when reporting statistics
+            max_entries (int): Maximum number of entries kept
+            max_bytes (int, optional): Maximum total size of the entries kept
+            ttl (float, optional): Seconds an entry stays valid after being stored
+        """
+        self.name        = name
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.ttl         = ttl
+        self._entries    = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes      = 0
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Return the value stored under `key`, or `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=0):
+        """
+        Store `value` under `key`, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size (int): Size charged against `max_bytes`
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, key):
+        """Remove `key` if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > time.monotonic())
+
+    def values(self):
+        """Snapshot of the stored values, including expired ones not yet looked up."""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Snapshot of cache effectiveness.
+
+        Returns:
+            dict: Entry count, size, hit/miss/eviction/expiration counters and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+#--------------------------------------------------
+# SHARED CACHES
+#--------------------------------------------------
+resume_cache   = VersionedCache('resume')
+identity_cache = LRUCache('identity', max_entries=4096, ttl=300)
@@ -0,0 +1,149 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+from flask import current_app
+from .cache import LRUCache
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+class CompletionCache:
+    """
+    Two-tier cache of LLM completions keyed by a fingerprint of the request.
+
+    The first tier is an in-process LRU with TTL and size-based eviction. The
+    optional second tier is the `llm_cache` table, shared by every worker and
+    surviving restarts; hits there are promoted into memory.
+    """
+
+    def __init__(self, memory: LRUCache, db=None, ttl: Optional[float] = None, all_temperatures: bool = False):
+        """Initialize the cache
+
+        Args:
+            memory: In-process tier
+            db: database instance backing the shared tier (optional)
+            ttl: Seconds a completion stays valid in the shared tier (optional)
+            all_temperatures: Also cache requests with a non-zero temperature
+        """
+        self.memory           = memory
+        self.db               = db
+        self.ttl              = ttl
+        self.all_temperatures = all_temperatures
+        self._lock            = threading.Lock()
+        self.db_hits          = 0
+        self.saved_seconds    = 0.0
+
+    @staticmethod
+    def fingerprint(payload: Dict) -> str:
+        """Hash a chat completions request body (model, temperature, prompts, history, message)"""
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        """Deterministic (temperature 0) requests are always cacheable; others only when configured"""
+        return not temperature or self.all_temperatures
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached completion for `key`, checking memory first and then the database
+
+        Returns:
+            Dictionary with response, usage, model and latency, or None on a miss
+        """
+        entry = self.memory.get(key)
+        if entry is None and self.db is not None:
+            entry = self._db_get(key)
+            if entry is not None:
+                with self._lock:
+                    self.db_hits += 1
+                self.memory.put(key, entry, size=len(entry['response']))
+
+        if entry is not None:
+            with self._lock:
+                self.saved_seconds += entry['latency']
+        return entry
+
+    def put(self, key: str, result: Dict, latency: float):
+        """Store a successful completion in every tier
+
+        Args:
+            key: Request fingerprint
+            result: Result dictionary returned by the LLM client
+            latency: Seconds the upstream call took, credited on later hits
+        """
+        entry = {
+            'response': result['response'],
+            'usage': result.get('usage', {}),
+            'model': result.get('model'),
+            'latency': latency
+        }
+        self.memory.put(key, entry, size=len(entry['response']))
+        if self.db is not None:
+            self._db_put(key, entry)
+
+    def _db_get(self, key: str) -> Optional[Dict]:
+        try:
+            row = self.db.fetch_one("""SELECT model, response, usage, latency_ms FROM llm_cache
+                                       WHERE fingerprint = %s AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)""",
+                                    [key, self.ttl or 10 ** 9])
+        except Exception as e:
+            logger.warning(f"Completion cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        return {
+            'response': row['response'],
+            'usage': json.loads(row['usage'] or '{}'),
+            'model': row['model'],
+            'latency': row['latency_ms'] / 1000
+        }
+
+    def _db_put(self, key: str, entry: Dict):
+        try:
+            self.db.execute("""INSERT INTO llm_cache (fingerprint, model, response, usage, latency_ms) VALUES (%s, %s, %s, %s, %s)
+                               ON CONFLICT (fingerprint) DO UPDATE SET response = EXCLUDED.response, usage = EXCLUDED.usage,
+                                                                       latency_ms = EXCLUDED.latency_ms, created_at = CURRENT_TIMESTAMP""",
+                            [key, entry['model'], entry['response'], json.dumps(entry['usage']), int(entry['latency'] * 1000)])
+        except Exception as e:
+            logger.warning(f"Completion cache store failed: {e}")
+
+    def stats(self) -> Dict:
+        """Hit ratio across both tiers and the upstream latency saved by hits"""
+        stats = self.memory.stats()
+        with self._lock:
+            lookups = stats['hits'] + stats['misses']
+            hits    = stats['hits'] + self.db_hits
+            stats.update({
+                'db_hits': self.db_hits,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+                'saved_seconds': round(self.saved_seconds, 3)
+            })
+        return stats
+
+#--------------------------------------------------
+# SHARED CACHE
+#--------------------------------------------------
+_completion_cache      = None
+_completion_cache_lock = threading.Lock()
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Return the process-wide completion cache, or None when caching is disabled"""
+    global _completion_cache
+    if not current_app.config.get('OPENAI_CACHE_ENABLED'):
+        return None
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                db = None
+                if current_app.config.get('OPENAI_CACHE_DATABASE'):
+                    from .database import get_database
+                    db = get_database()
+                ttl    = current_app.config.get('OPENAI_CACHE_TTL')
+                memory = LRUCache('completions',
+                                  max_entries=current_app.config.get('OPENAI_CACHE_MAX_ENTRIES', 1024),
+                                  max_bytes=current_app.config.get('OPENAI_CACHE_MAX_BYTES'),
+                                  ttl=ttl)
+                _completion_cache = CompletionCache(memory, db=db, ttl=ttl,
+                                                    all_temperatures=current_app.config.get('OPENAI_CACHE_ALL_TEMPERATURES', False))
+    return _completion_cache
@@ -0,0 +1,164 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import math
+import re
+from collections import Counter
+
+#--------------------------------------------------
+# TOKENIZATION
+#--------------------------------------------------
+WORD      = re.compile(r"\w+", re.UNICODE)
+SENTENCE  = re.compile(r"(?<=[.!?])\s+")
+
+def count_tokens(text):
+    """
+    Estimate the number of model tokens in `text`.
+
+    Uses the ~4 characters per token rule of thumb for English text with
+    OpenAI tokenizers, which is close enough for budgeting without shipping
+    a tokenizer.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+def terms(text):
+    """Lower-cased word terms used for ranking."""
+    return WORD.findall(text.lower())
+
+def split_chunks(text, chunk_tokens=200):
+    """
+    Split text into chunks of roughly `chunk_tokens` tokens on sentence boundaries.
+
+    Sentences longer than a chunk are split on word boundaries.
+
+    Args:
+        text (str): Cleaned page text
+        chunk_tokens (int): Target chunk size in tokens
+
+    Returns:
+        list: Chunk strings, in document order
+    """
+    chunks, current, size = [], [], 0
+    for sentence in SENTENCE.split(text):
+        pieces = [sentence]
+        if count_tokens(sentence) > chunk_tokens:
+            words  = sentence.split()
+            step   = max(1, len(words) * chunk_tokens // count_tokens(sentence))
+            pieces = [' '.join(words[i:i + step]) for i in range(0, len(words), step)]
+        for piece in pieces:
+            piece_size = count_tokens(piece)
+            if current and size + piece_size > chunk_tokens:
+                chunks.append(' '.join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += piece_size
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+#--------------------------------------------------
+# RANKING
+#--------------------------------------------------
+class BM25Index:
+    """
+    Okapi BM25 index over the chunks of a single page.
+
+    Small and dependency-free: built in one pass over the chunks and queried
+    with the user's message.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        """
+        Index `chunks`.
+
+        Args:
+            chunks (list): Chunk strings
+            k1 (float): Term frequency saturation
+            b (float): Length normalization strength
+        """
+        self.chunks  = chunks
+        self.k1      = k1
+        self.b       = b
+        self.tokens  = [count_tokens(chunk) for chunk in chunks]
+        self.freqs   = [Counter(terms(chunk)) for chunk in chunks]
+        self.lengths = [sum(freq.values()) for freq in self.freqs]
+        self.avg_len = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+
+        doc_freq = Counter(term for freq in self.freqs for term in freq)
+        n        = len(chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query):
+        """
+        Score every chunk against `query`.
+
+        Returns:
+            list: One BM25 score per chunk, in document order
+        """
+        query_terms = set(terms(query))
+        scores = []
+        for freq, length in zip(self.freqs, self.lengths):
+            score = 0.0
+            for term in query_terms:
+                tf = freq.get(term)
+                if tf:
+                    norm   = tf + self.k1 * (1 - self.b + self.b * length / (self.avg_len or 1))
+                    score += self.idf[term] * tf * (self.k1 + 1) / norm
+            scores.append(score)
+        return scores
+
+#--------------------------------------------------
+# CONTEXT ASSEMBLY
+#--------------------------------------------------
+def build_context(index, query, budget_tokens):
+    """
+    Select the page chunks most relevant to `query` that fit in `budget_tokens`.
+
+    Chunks are taken best-score first (earlier chunks win ties, so a query
+    with no matching terms keeps the top of the page) and then re-joined in
+    document order so the excerpt reads naturally.
+
+    Args:
+        index (BM25Index): Index over the page chunks
+        query (str): The user's message
+        budget_tokens (int): Maximum tokens of page content to include
+
+    Returns:
+        tuple: (context text, stats dict with page/context token counts,
+               chunks used and the truncation ratio)
+    """
+    page_tokens = sum(index.tokens)
+    if page_tokens <= budget_tokens:
+        selected = list(range(len(index.chunks)))
+    else:
+        scores   = index.scores(query)
+        ranked   = sorted(range(len(index.chunks)), key=lambda i: (-scores[i], i))
+        selected, used = [], 0
+        for i in ranked:
+            if used + index.tokens[i] <= budget_tokens:
+                selected.append(i)
+                used += index.tokens[i]
+        selected.sort()
+
+    # Mark gaps between non-adjacent chunks so the model knows text was omitted
+    parts, previous = [], None
+    for i in selected:
+        if previous is not None and i != previous + 1:
+            parts.append('...')
+        parts.append(index.chunks[i])
+        previous = i
+
+    context_tokens = sum(index.tokens[i] for i in selected)
+    stats = {
+        'page_tokens': page_tokens,
+        'context_tokens': context_tokens,
+        'chunks_total': len(index.chunks),
+        'chunks_used': len(selected),
+        'truncation_ratio': round(1 - context_tokens / page_tokens, 4) if page_tokens else 0.0,
+    }
+    return ' '.join(parts), stats
@@ -0,0 +1,137 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+import uuid
+from typing import Dict, List, Optional
+from flask import current_app, session
+from .cache import LRUCache
+
+class ConversationStore:
+    """
+    Chat histories kept in Postgres, with the recent tail of each one cached.
+
+    The session cookie carries only a conversation id. The last `window`
+    messages of active conversations are kept in an in-process LRU so
+    building a prompt normally needs no query; older messages are read a
+    page at a time. Appends drop the cached tail rather than extend it, and
+    a tail read from the database while an append landed is not stored, so
+    a stale tail cannot outlive the write that made it stale.
+    """
+
+    def __init__(self, db, cache: LRUCache, window: int = 10):
+        """Initialize the store
+
+        Args:
+            db: database instance holding the conversations tables
+            cache: Hot cache of recent messages, keyed by conversation id
+            window: Messages kept per conversation in the hot cache
+        """
+        self.db       = db
+        self.cache    = cache
+        self.window   = window
+        self._version = 0                   # bumped by every append, to any conversation
+        self._lock    = threading.Lock()    # guards _version only; never held across a query
+
+    @staticmethod
+    def new_id() -> str:
+        """A fresh conversation id; the conversation row is created with its first message"""
+        return uuid.uuid4().hex
+
+    def recent(self, conversation_id: str, limit: int) -> List[Dict]:
+        """Return the last `limit` messages of a conversation as chat completion messages, oldest first"""
+        if limit <= 0:
+            return []
+        messages = self.cache.get(conversation_id) if limit <= self.window else None
+        if messages is None:
+            version = self._version
+            rows = self.db.fetch_all("""SELECT role, content FROM conversation_messages WHERE conversation_id = %s
+                                    ORDER BY message_id DESC LIMIT %s""",
+                                     [conversation_id, max(limit, self.window)])
+            messages = [{"role": row['role'], "content": row['content']} for row in reversed(rows)]
+            with self._lock:
+                if limit <= self.window and self._version == version:
+                    self.cache.put(conversation_id, messages, size=len(messages))
+        return messages[-limit:]
+
+    def append(self, conversation_id: str, messages: List[Dict], email: Optional[str] = None):
+        """Add messages to a conversation, creating it if needed
+
+        Args:
+            conversation_id: Conversation to extend
+            messages: Chat completion messages ({"role", "content"}) to add, in order
+            email: Owner recorded when the conversation is created (optional)
+        """
+        with self.db.transaction() as tx:
+            tx.execute("""INSERT INTO conversations (conversation_id, email) VALUES (%s, %s)
+                          ON CONFLICT (conversation_id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP""",
+                       [conversation_id, email])
+            tx.execute_many("INSERT INTO conversation_messages (conversation_id, role, content) VALUES (%s, %s, %s)",
+                            [[conversation_id, message['role'], message['content']] for message in messages])
+
+        # The tail is reloaded on its next read; extending it here could race another append or a reload
+        with self._lock:
+            self._version += 1
+            self.cache.discard(conversation_id)
+
+    def page(self, conversation_id: str, before: Optional[int] = None, limit: int = 50) -> Dict:
+        """Return one page of a conversation, newest page first
+
+        Args:
+            conversation_id: Conversation to read
+            before: Only return messages with an id below this cursor (optional)
+            limit: Maximum number of messages
+
+        Returns:
+            Dictionary with the messages (oldest first) and the cursor for the previous page, or None at the start
+        """
+        rows = self.db.fetch_all("""SELECT message_id, role, content, created_at FROM conversation_messages
+                                WHERE conversation_id = %s AND message_id < %s
+                                ORDER BY message_id DESC LIMIT %s""",
+                                 [conversation_id, before or 2 ** 31 - 1, limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        messages = [{"id": row['message_id'], "role": row['role'], "content": row['content'],
+                     "created_at": row['created_at'].isoformat()} for row in reversed(rows)]
+        return {"messages": messages, "before": messages[0]["id"] if more else None}
+
+#--------------------------------------------------
+# SHARED STORE
+#--------------------------------------------------
+_conversation_store      = None
+_conversation_store_lock = threading.Lock()
+
+def get_conversation_store() -> ConversationStore:
+    """Return the process-wide conversation store, creating it from the app config on first use"""
+    global _conversation_store
+    if _conversation_store is None:
+        with _conversation_store_lock:
+            if _conversation_store is None:
+                from .database import get_database
+                window = current_app.config.get('OPENAI_MAX_CONVERSATION_HISTORY', 10)
+                cache  = LRUCache('conversations',
+                                  max_entries=current_app.config.get('CONVERSATION_CACHE_MAX_ENTRIES', 1024),
+                                  ttl=current_app.config.get('CONVERSATION_CACHE_TTL', 30))
+                _conversation_store = ConversationStore(get_database(), cache, window=window)
+    return _conversation_store
+
+#--------------------------------------------------
+# SESSION HELPERS
+#--------------------------------------------------
+def session_conversation(store: ConversationStore) -> str:
+    """Return the current session's conversation id, starting a conversation on first use
+
+    History left in the cookie by earlier versions is moved into the new conversation.
+    """
+    conversation_id = session.get('conversation_id')
+    if conversation_id is None:
+        conversation_id = store.new_id()
+        session['conversation_id'] = conversation_id
+        legacy = session.pop('chat_history', None)
+        if legacy:
+            store.append(conversation_id, legacy, email=session_email(store))
+    return conversation_id
+
+def session_email(store: ConversationStore) -> Optional[str]:
+    """Email of the logged-in user, or None for guests"""
+    email = store.db.get_user_email()
+    return None if email == 'Unknown' else email
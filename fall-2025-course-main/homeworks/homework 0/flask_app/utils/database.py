@@ -2,6 +2,8 @@
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.errors
+import psycopg2.extensions
 import glob
 import json
 import csv
@@ -9,10 +11,187 @@ from io import StringIO
 import itertools
 import hashlib
 import os
-import cryptography
-from cryptography.fernet import Fernet
+import re
+import threading
+import uuid
+import logging
+from contextlib import contextmanager
 from math import pow
-from flask import current_app
+from flask import current_app, g, has_app_context
+from .pool import ConnectionPool, blocking
+from .cache import resume_cache, identity_cache
+from .passwords import get_password_hasher
+from .metrics import db_query_seconds, statement_type
+from .logs import get_logger, log
+
+# Key for the advisory lock held while migrations run
+SCHEMA_LOCK_ID = 477001
+
+logger = get_logger(__name__)
+
+class CsvStream:
+    """
+    Read-only file-like view over an iterator of CSV rows.
+
+    Rows are serialized on demand as psycopg2 asks for more data, which lets
+    COPY FROM STDIN consume a transformed file without buffering all of it.
+    """
+
+    def __init__(self, rows):
+        self._rows    = iter(rows)
+        self._pending = ''
+
+    def read(self, size=-1):
+        out    = StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        while size < 0 or len(self._pending) + out.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            writer.writerow(row)
+
+        data = self._pending + out.getvalue()
+        if size < 0:
+            self._pending = ''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+class Statement:
+    """
+    A fixed query that is prepared once per connection and then executed by name.
+
+    Written with %s placeholders like any other query; the server-side
+    PREPARE uses the same text with $1, $2, ... in their place.
+    """
+
+    def __init__(self, name, sql):
+        """
+        Initialize the statement.
+
+        Args:
+            name (str): Prepared statement name, unique per connection
+            sql (str): Query with %s placeholders
+        """
+        self.name    = name
+        self.sql     = sql
+        counter      = itertools.count(1)
+        self.prepare = f"PREPARE {name} AS " + re.sub(r'%s', lambda _: f"${next(counter)}", sql)
+
+    def __str__(self):
+        return self.sql
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which Statements have been prepared on it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()     # PREPARE outlives a rollback, so this is only reset with the connection
+
+class Transaction:
+    """
+    Statements run on one connection and committed together.
+
+    Obtained from database.transaction(). Every method accepts either a SQL
+    string or a Statement, and returns rows as dictionaries.
+    """
+
+    def __init__(self, cnx):
+        self.cnx = cnx
+
+    def _execute(self, cur, sql, parameters):
+        with db_query_seconds.time(statement=statement_type(str(sql))):
+            prepared = getattr(self.cnx, 'prepared', None)
+            if isinstance(sql, Statement) and prepared is not None:
+                if sql.name not in prepared:
+                    cur.execute(sql.prepare)
+                    prepared.add(sql.name)
+                arguments = f"({','.join(['%s'] * len(parameters))})" if parameters else ''
+                cur.execute(f"EXECUTE {sql.name}{arguments}", parameters or None)
+            else:
+                cur.execute(str(sql), parameters)
+
+    def fetch_one(self, sql, parameters=None):
+        """Run a query and return its first row, or None."""
+        with self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            self._execute(cur, sql, parameters)
+            return cur.fetchone()
+
+    def fetch_all(self, sql, parameters=None):
+        """Run a query and return all of its rows."""
+        with self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            self._execute(cur, sql, parameters)
+            return cur.fetchall()
+
+    def execute(self, sql, parameters=None):
+        """Run a statement that returns no rows, e.g. an UPDATE; returns the affected row count."""
+        with self.cnx.cursor() as cur:
+            self._execute(cur, sql, parameters)
+            return cur.rowcount
+
+    def execute_many(self, sql, rows, page_size=100):
+        """
+        Run a statement once per parameter set, sending `page_size` of them per round trip.
+
+        Args:
+            sql (str or Statement): Statement with %s placeholders
+            rows (iterable): Parameter sets
+            page_size (int): Parameter sets per round trip
+
+        Returns:
+            int: Number of parameter sets executed
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self.cnx.cursor() as cur, db_query_seconds.time(statement=statement_type(str(sql))):
+            if isinstance(sql, Statement) and getattr(self.cnx, 'prepared', None) is not None:
+                if sql.name not in self.cnx.prepared:
+                    cur.execute(sql.prepare)
+                    self.cnx.prepared.add(sql.name)
+                sql = f"EXECUTE {sql.name}({','.join(['%s'] * len(rows[0]))})"
+            psycopg2.extras.execute_batch(cur, str(sql), rows, page_size=page_size)
+        return len(rows)
+
+    def stream(self, sql, parameters=None, batch_size=1000):
+        """
+        Iterate over a query's rows through a server-side cursor, `batch_size` rows per round trip.
+
+        Only one batch is held in memory at a time. The cursor lives inside this
+        transaction, so consume the rows before the transaction block exits.
+        """
+        with self.cnx.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.itersize = batch_size
+            with db_query_seconds.time(statement=statement_type(str(sql))):
+                cur.execute(str(sql), parameters)
+            yield from cur
+
+    def query(self, sql, parameters=None):
+        """Run any statement (or script) and return its rows if it produced a result set."""
+        with self.cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            self._execute(cur, sql, parameters)
+            return cur.fetchall() if cur.description is not None else []
+
+    def set_timeout(self, seconds):
+        """Cancel any later statement in this transaction that runs longer than `seconds` (0 for no limit)."""
+        with self.cnx.cursor() as cur:
+            cur.execute("SELECT set_config('statement_timeout', %s, true)", [str(int(seconds * 1000))])
+
+#--------------------------------------------------
+# FIXED QUERIES (prepared once per connection)
+#--------------------------------------------------
+USER_LOGIN          = Statement('user_login', "SELECT user_id, password FROM users WHERE email = %s")
+USER_ROLE           = Statement('user_role', "SELECT role FROM users WHERE email = %s")
+USER_SET_PASSWORD   = Statement('user_set_password', "UPDATE users SET password = %s WHERE user_id = %s")
+RESUME_INSTITUTIONS = Statement('resume_institutions', """SELECT inst_id, type, name, department, address, city, state, zip
+                                                          FROM institutions""")
+RESUME_POSITIONS    = Statement('resume_positions', """SELECT position_id, inst_id, title, responsibilities, start_date, end_date
+                                                       FROM positions ORDER BY start_date DESC""")
+RESUME_EXPERIENCES  = Statement('resume_experiences', """SELECT experience_id, position_id, name, description, hyperlink, start_date, end_date
+                                                         FROM experiences ORDER BY start_date DESC""")
+RESUME_SKILLS       = Statement('resume_skills', """SELECT skill_id, experience_id, name, skill_level
+                                                    FROM skills ORDER BY skill_id""")
+
 class database:
     """
     Database management class for PostgreSQL operations.
@@ -21,6 +200,10 @@ class database:
     and user authentication with encryption support.
     """
 
+    # Connection pools are shared by every instance that targets the same server
+    _pools      = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, purge=False):
         """
         Initialize database connection and configuration.
@@ -34,9 +217,23 @@ class database:
         self.user       = current_app.config.get('DATABASE_USER')
         self.port       = current_app.config.get('DATABASE_PORT')
         self.password   = current_app.config.get('DATABASE_PASSWORD')
+
+        # Server-side limit on every statement, so a runaway query cannot hold a connection indefinitely
+        self.statement_timeout = current_app.config.get('DATABASE_STATEMENT_TIMEOUT', 30)
+
+        # Connection pool configuration
+        self.pool_config = {
+            'minconn':    current_app.config.get('DATABASE_POOL_MIN', 1),
+            'maxconn':    current_app.config.get('DATABASE_POOL_MAX', 10),
+            'timeout':    current_app.config.get('DATABASE_POOL_TIMEOUT', 10),
+            'ping_after': current_app.config.get('DATABASE_POOL_PING_AFTER', 30),
+        }
         
         # Tables must be created in order due to foreign key constraints
-        self.tables = ['institutions', 'positions', 'experiences', 'skills', 'users']
+        self.tables = ['institutions', 'positions', 'experiences', 'skills', 'users', 'llm_cache', 'conversations', 'conversation_messages']
+
+        # Tables read by getResumeData; writing to any of them invalidates the resume cache
+        self.resume_tables = ['institutions', 'positions', 'experiences', 'skills']
 
         # Encryption configuration
         self.encryption = {
@@ -48,13 +245,152 @@ class database:
             },
             'reversible': { 'key': current_app.config.get('ENCRYPTION_REVERSIBLE_KEY')}
         }
+        self._fernet = None
 
     #--------------------------------------------------
-    # DATABASE QUERY FUNCTION
+    # CONNECTION POOL
     #--------------------------------------------------
+    @property
+    def pool(self):
+        """The connection pool shared by all instances pointing at this database."""
+        key = (self.host, self.port, self.user, self.database)
+        with database._pools_lock:
+            if key not in database._pools:
+                database._pools[key] = ConnectionPool(host=self.host,
+                                                      user=self.user,
+                                                      password=self.password,
+                                                      port=self.port,
+                                                      database=self.database,
+                                                      connection_factory=PreparedConnection,
+                                                      options=f"-c statement_timeout={int(self.statement_timeout * 1000)}",
+                                                      **self.pool_config)
+            return database._pools[key]
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a pooled connection.
+
+        Inside an app context (an HTTP request or a Socket.IO event) the same
+        connection is reused for the rest of that context and returned to the
+        pool by release_connection(). Outside of one, the connection is
+        returned as soon as the block exits.
+
+        Yields:
+            connection: An open psycopg2 connection
+        """
+        if has_app_context():
+            cnx = g.get('_db_connection')
+            if cnx is None or cnx.closed:
+                cnx = self.pool.getconn()
+                g._db_connection = cnx
+                g._db_pool       = self.pool
+            yield cnx
+        else:
+            cnx = self.pool.getconn()
+            try:
+                yield cnx
+            finally:
+                self.pool.putconn(cnx)
+
+    @staticmethod
+    def release_connection(exception=None):
+        """Return the current app context's connection to its pool (teardown_appcontext hook)."""
+        cnx  = g.pop('_db_connection', None)
+        pool = g.pop('_db_pool', None)
+        if cnx is not None and pool is not None:
+            pool.putconn(cnx, close=exception is not None)
+
+    def pool_stats(self):
+        """Return in-use, idle, waiting and checkout latency figures for the pool."""
+        return self.pool.stats()
+
+    #--------------------------------------------------
+    # DATABASE QUERY FUNCTIONS
+    #--------------------------------------------------
+    @contextmanager
+    def transaction(self, timeout=None):
+        """
+        Run several statements on one connection and commit them together.
+
+        The block's statements are rolled back if it raises. Inside an app
+        context a nested transaction() joins the enclosing one, so helpers
+        that open their own transaction compose; outside of one, use the
+        yielded Transaction's methods rather than the database's.
+
+        Args:
+            timeout (float, optional): Seconds each statement may run before it is cancelled
+                (0 for no limit), in place of DATABASE_STATEMENT_TIMEOUT for the rest of the transaction
+
+        Yields:
+            Transaction: Statement runner bound to the connection
+        """
+        with self.connection() as cnx:
+            active = g.get('_db_transaction') if has_app_context() else None
+            if active is not None and active.cnx is cnx:
+                if timeout is not None:
+                    active.set_timeout(timeout)
+                yield active
+                return
+
+            tx = Transaction(cnx)
+            if has_app_context():
+                g._db_transaction = tx
+            try:
+                if timeout is not None:
+                    tx.set_timeout(timeout)
+                yield tx
+                cnx.commit()
+            except BaseException:
+                # Also covers a stream() abandoned part-way; leave the pooled connection clean
+                if not cnx.closed:
+                    cnx.rollback()
+                raise
+            finally:
+                if has_app_context():
+                    g.pop('_db_transaction', None)
+
+    def fetch_one(self, sql, parameters=None):
+        """Run a query and return its first row as a dictionary, or None."""
+        with self.transaction() as tx:
+            return tx.fetch_one(sql, parameters)
+
+    def fetch_all(self, sql, parameters=None):
+        """Run a query and return all of its rows as dictionaries."""
+        with self.transaction() as tx:
+            return tx.fetch_all(sql, parameters)
+
+    def execute(self, sql, parameters=None):
+        """Run a statement that returns no rows and return the affected row count."""
+        with self.transaction() as tx:
+            return tx.execute(sql, parameters)
+
+    def execute_many(self, sql, rows, page_size=100):
+        """Run a statement once per parameter set, batching the round trips; see Transaction.execute_many."""
+        with self.transaction() as tx:
+            return tx.execute_many(sql, rows, page_size)
+
+    def stream(self, sql, parameters=None, batch_size=1000):
+        """
+        Iterate over a large result through a server-side cursor.
+
+        Args:
+            sql (str): Query to run
+            parameters (list, optional): Query parameters
+            batch_size (int): Rows fetched per round trip
+
+        Yields:
+            dict: One row at a time
+        """
+        with self.transaction() as tx:
+            yield from tx.stream(sql, parameters, batch_size)
+
     def query(self, query="SELECT * FROM users", parameters=None):
         """
-        Execute a database query with optional parameters.
+        Execute a statement with optional parameters and commit it.
+
+        Rows are returned whenever the statement produces them (SELECT, CTEs,
+        INSERT ... RETURNING); new code should prefer fetch_one/fetch_all/execute.
         
         Args:
             query (str): SQL query to execute
@@ -63,75 +399,64 @@ class database:
         Returns:
             list: Query results as list of dictionaries
         """
-        # Establish database connection
-        cnx = psycopg2.connect(
-            host=self.host,
-            user=self.user,
-            password=self.password,
-            port=self.port,
-            database=self.database
-        )
-
-        # Execute query with or without parameters
-        if parameters is not None:
-            cur = cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            cur.execute(query, parameters)
-        else:
-            cur = cnx.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            cur.execute(query)
-
-        # Only fetch results for SELECT queries, not for CREATE/DROP/INSERT
-        row = []
-        if query.strip().upper().startswith(('SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN')):
-            row = cur.fetchall()
-        
-        # Commit transaction and close connections
-        cnx.commit()
-        cur.close()
-        cnx.close()
-        
-        return row
+        with self.transaction() as tx:
+            return tx.query(query, parameters)
 
     #--------------------------------------------------
     # RESUME DATA FUNCTIONS
     #--------------------------------------------------
     def getResumeData(self):
-        data = {}
+        """
+        Build the nested institution -> position -> experience -> skill tree.
 
-        # For each institution
-        institutions = self.query("SELECT * FROM institutions")
-        for i in institutions:
-            institution_id = i['inst_id']
-            data[institution_id] = i
-            data[institution_id].pop('inst_id')
+        Each level is loaded with a single query and attached to its parent by
+        id, so the number of round trips stays at four however large the
+        resume grows.
 
-            # For each position
-            positions = self.query(f"""SELECT * FROM positions WHERE inst_id = {institution_id} ORDER BY start_date DESC""")
+        Returns:
+            dict: Institutions keyed by inst_id, with nested positions,
+                  experiences and skills keyed by their own ids
+        """
+        data        = {}
+        positions   = {}
+        experiences = {}
+
+        with self.transaction() as tx:
+            institution_rows = tx.fetch_all(RESUME_INSTITUTIONS)
+            position_rows    = tx.fetch_all(RESUME_POSITIONS)
+            experience_rows  = tx.fetch_all(RESUME_EXPERIENCES)
+            skill_rows       = tx.fetch_all(RESUME_SKILLS)
+
+        # Institutions
+        for i in institution_rows:
+            institution_id = i.pop('inst_id')
+            data[institution_id] = i
             data[institution_id]['positions'] = {}
-            for p in positions:
-                position_id = p['position_id']
+
+        # Positions, attached to their institution
+        for p in position_rows:
+            position_id    = p.pop('position_id')
+            institution_id = p.pop('inst_id')
+            if institution_id in data:
+                p['experiences'] = {}
                 data[institution_id]['positions'][position_id] = p
-                data[institution_id]['positions'][position_id].pop('position_id')
-                data[institution_id]['positions'][position_id].pop('inst_id')
-
-                # For each experience
-                experiences = self.query(f"""SELECT * FROM experiences WHERE position_id = {position_id} ORDER BY start_date DESC""")
-                data[institution_id]['positions'][position_id]['experiences'] = {}
-                for e in experiences:
-                    experience_id = e['experience_id']
-                    data[institution_id]['positions'][position_id]['experiences'][experience_id] = e
-                    data[institution_id]['positions'][position_id]['experiences'][experience_id].pop('experience_id')
-                    data[institution_id]['positions'][position_id]['experiences'][experience_id].pop('position_id')
-
-                    # For each skill
-                    skills = self.query(f"""SELECT * FROM skills WHERE experience_id = {experience_id}""")
-                    data[institution_id]['positions'][position_id]['experiences'][experience_id]['skills'] = {}
-                    for s in skills:
-                        skill_id = s['skill_id']
-                        data[institution_id]['positions'][position_id]['experiences'][experience_id]['skills'][skill_id] = s
-                        data[institution_id]['positions'][position_id]['experiences'][experience_id]['skills'][skill_id].pop('experience_id')
-                        data[institution_id]['positions'][position_id]['experiences'][experience_id]['skills'][skill_id].pop('skill_id')
+                positions[position_id] = p
+
+        # Experiences, attached to their position
+        for e in experience_rows:
+            experience_id = e.pop('experience_id')
+            position_id   = e.pop('position_id')
+            if position_id in positions:
+                e['skills'] = {}
+                positions[position_id]['experiences'][experience_id] = e
+                experiences[experience_id] = e
 
+        # Skills, attached to their experience
+        for s in skill_rows:
+            skill_id      = s.pop('skill_id')
+            experience_id = s.pop('experience_id')
+            if experience_id in experiences:
+                experiences[experience_id]['skills'][skill_id] = s
 
         # Convert dates to simple strings before returning
         for inst in data.values():
@@ -153,14 +478,178 @@ class database:
         
         return data
 
+    def getResumePage(self, institutions=None, inst_type=None, start=None, end=None, min_skill=None,
+                      limit=20, after=None, experience_limit=20):
+        """
+        Build one page of the resume tree, newest positions first.
+
+        Positions are paged with a keyset cursor on (start_date, position_id)
+        and each carries at most `experience_limit` experiences plus a cursor
+        for the rest (see getExperiencePage), so every query is an index range
+        scan bounded by the page size, however large the tables grow.
+
+        Args:
+            institutions (list, optional): Only positions at these inst_ids
+            inst_type (str, optional): Only positions at institutions of this type, e.g. 'Academia'
+            start (date, optional): Only positions and experiences that end on or after this date
+            end (date, optional): Only positions and experiences that start on or before this date
+            min_skill (int, optional): Only skills at or above this level
+            limit (int): Positions per page
+            after (list, optional): Cursor from the previous page
+            experience_limit (int): Experiences per position
+
+        Returns:
+            tuple: (institutions keyed by inst_id, in the getResumeData shape; cursor for the next page or None)
+        """
+        clauses, parameters = [], []
+        if institutions:
+            clauses.append("p.inst_id = ANY(%s)")
+            parameters.append(list(institutions))
+        if inst_type:
+            clauses.append("i.type = %s")
+            parameters.append(inst_type)
+        if end:
+            clauses.append("p.start_date <= %s")
+            parameters.append(end)
+        if start:
+            clauses.append("(p.end_date IS NULL OR p.end_date >= %s)")
+            parameters.append(start)
+        if after:
+            clauses.append("(p.start_date, p.position_id) < (%s::date, %s)")
+            parameters.extend(after)
+
+        data = {}
+        with self.transaction() as tx:
+            rows = tx.fetch_all(f"""SELECT p.position_id, p.inst_id, p.title, p.responsibilities, p.start_date, p.end_date,
+                                           i.type, i.name, i.department, i.address, i.city, i.state, i.zip
+                                    FROM positions p JOIN institutions i ON i.inst_id = p.inst_id
+                                    WHERE {' AND '.join(clauses) or 'TRUE'}
+                                    ORDER BY p.start_date DESC, p.position_id DESC LIMIT %s""",
+                                parameters + [limit + 1])
+            cursor = [str(rows[limit - 1]['start_date']), rows[limit - 1]['position_id']] if len(rows) > limit else None
+            rows   = rows[:limit]
+
+            # Up to experience_limit (+1, to detect more) experiences per position in one query
+            experience_where, experience_parameters = self._experienceFilters(start, end)
+            experience_rows = tx.fetch_all(f"""SELECT e.* FROM unnest(%s::int[]) AS page(position_id)
+                                               CROSS JOIN LATERAL (
+                                                   SELECT experience_id, position_id, name, description, hyperlink, start_date, end_date
+                                                   FROM experiences
+                                                   WHERE position_id = page.position_id AND {experience_where}
+                                                   ORDER BY COALESCE(start_date, '-infinity'::date) DESC, experience_id DESC
+                                                   LIMIT %s) e""",
+                                           [[row['position_id'] for row in rows]] + experience_parameters + [experience_limit + 1]) if rows else []
+            skills = self._skillsFor(tx, experience_rows, min_skill)
+
+        # Institutions and their positions, in page order
+        positions = {}
+        for row in rows:
+            institution = data.setdefault(row['inst_id'], {key: row[key] for key in
+                                                           ('type', 'name', 'department', 'address', 'city', 'state', 'zip')})
+            institution.setdefault('positions', {})
+            position = {key: row[key] for key in ('title', 'responsibilities', 'start_date', 'end_date')}
+            position['experiences'], position['experiences_next'] = {}, None
+            self._monthStrings(position, open_end='Present')
+            institution['positions'][row['position_id']] = position
+            positions[row['position_id']] = position
+
+        # Experiences, keeping experience_limit per position and a cursor when there are more
+        for row in experience_rows:
+            position = positions[row['position_id']]
+            if len(position['experiences']) == experience_limit:
+                last = position['last_experience']
+                position['experiences_next'] = [str(last['start_date']) if last['start_date'] else '-infinity', last['experience_id']]
+                continue
+            position['last_experience'] = row
+            position['experiences'][row['experience_id']] = self._experience(row, skills)
+        for position in positions.values():
+            position.pop('last_experience', None)
+
+        return data, cursor
+
+    def getExperiencePage(self, position_id, start=None, end=None, min_skill=None, limit=20, after=None):
+        """
+        Build one page of a position's experiences, newest first.
+
+        Args:
+            position_id (int): Position whose experiences to list
+            start (date, optional): Only experiences that end on or after this date
+            end (date, optional): Only experiences that start on or before this date
+            min_skill (int, optional): Only skills at or above this level
+            limit (int): Experiences per page
+            after (list, optional): Cursor from the previous page (or a position's experiences_next)
+
+        Returns:
+            tuple: (experiences keyed by experience_id, with their skills; cursor for the next page or None)
+        """
+        where, parameters = self._experienceFilters(start, end)
+        if after:
+            where += " AND (COALESCE(start_date, '-infinity'::date), experience_id) < (%s::date, %s)"
+            parameters.extend(after)
+
+        with self.transaction() as tx:
+            rows = tx.fetch_all(f"""SELECT experience_id, position_id, name, description, hyperlink, start_date, end_date
+                                    FROM experiences WHERE position_id = %s AND {where}
+                                    ORDER BY COALESCE(start_date, '-infinity'::date) DESC, experience_id DESC LIMIT %s""",
+                                [position_id] + parameters + [limit + 1])
+            cursor = None
+            if len(rows) > limit:
+                last   = rows[limit - 1]
+                cursor = [str(last['start_date']) if last['start_date'] else '-infinity', last['experience_id']]
+            rows   = rows[:limit]
+            skills = self._skillsFor(tx, rows, min_skill)
+
+        return {row['experience_id']: self._experience(row, skills) for row in rows}, cursor
+
+    @staticmethod
+    def _experienceFilters(start=None, end=None):
+        """WHERE clause and parameters restricting experiences to a date range; undated experiences always match."""
+        clauses, parameters = ['TRUE'], []
+        if end:
+            clauses.append("(start_date IS NULL OR start_date <= %s)")
+            parameters.append(end)
+        if start:
+            clauses.append("(end_date IS NULL OR end_date >= %s)")
+            parameters.append(start)
+        return ' AND '.join(clauses), parameters
+
+    @staticmethod
+    def _skillsFor(tx, experience_rows, min_skill=None):
+        """Skills of the given experiences, grouped by experience_id."""
+        skills = {}
+        if not experience_rows:
+            return skills
+        where, parameters = "experience_id = ANY(%s)", [[row['experience_id'] for row in experience_rows]]
+        if min_skill is not None:
+            where += " AND skill_level >= %s"
+            parameters.append(min_skill)
+        for row in tx.fetch_all(f"SELECT skill_id, experience_id, name, skill_level FROM skills WHERE {where} ORDER BY skill_id", parameters):
+            skills.setdefault(row.pop('experience_id'), {})[row.pop('skill_id')] = row
+        return skills
+
+    @classmethod
+    def _experience(cls, row, skills):
+        """An experience row in the getResumeData shape."""
+        experience = {key: row[key] for key in ('name', 'description', 'hyperlink', 'start_date', 'end_date')}
+        experience['skills'] = skills.get(row['experience_id'], {})
+        return cls._monthStrings(experience, open_end='')
+
+    @staticmethod
+    def _monthStrings(item, open_end):
+        """Render start/end dates as "YYYY-MM", using `open_end` when there is no end date."""
+        if item['start_date']:
+            item['start_date'] = str(item['start_date'])[:7]
+        item['end_date'] = str(item['end_date'])[:7] if item['end_date'] else open_end
+        return item
+
     #--------------------------------------------------
     # TABLE CREATION
     #--------------------------------------------------
-    def createTables(self, purge=False, data_path = 'flask_app/database/'):
+    def createTables(self, purge=False, data_path = 'flask_app/database/', seed=True):
       
         if purge:
             for table in self.tables[::-1]:
-                self.query(f"""DROP TABLE IF EXISTS {table}""")
+                self.execute(f"""DROP TABLE IF EXISTS {table}""")
             
         # Execute all SQL queries in the /database/create_tables directory.
         for table in self.tables:
@@ -168,42 +657,202 @@ class database:
             #Create each table using the .sql file in /database/create_tables directory.
             with open(data_path + f"create_tables/{table}.sql") as read_file:
                 create_statement = read_file.read()
-            self.query(create_statement)
+            self.execute(create_statement)
+
+        if seed:
+            self.seedTables(data_path=data_path)
+
+        # Tables were (re)created, so any cached resume payload or identity is stale
+        self.invalidateCaches()
 
-            # Import the initial data
+    def seedTables(self, data_path = 'flask_app/database/'):
+        """Load every /database/initial_data CSV into its table."""
+        for table in self.tables:
+
+            # Bulk-load the initial data, hashing passwords on the way in for users
             try:
-                params = []
-                with open(data_path + f"initial_data/{table}.csv") as read_file:
-                    scsv = read_file.read()            
-                for row in csv.reader(StringIO(scsv), delimiter=',', quotechar='"'):
-                    # Remove quotes from values if they exist and convert "NULL" to None
-                    cleaned_row = []
-                    for value in row:
-                        if value and value.startswith('"') and value.endswith('"'):
-                            value = value.strip('"')
-                        if value == "NULL":
-                            value = None
-                        cleaned_row.append(value)
-                    params.append(cleaned_row)
-            
-                # Insert the data
-                cols = params[0]; params = params[1:] 
-                
-                # Special handling for users table - encrypt passwords
-                if table == 'users':
-                    # Find the password column index
-                    password_col_idx = cols.index('password')
-                    # Encrypt all passwords in the data
-                    for row in params:
-                        if row[password_col_idx]:  # Only encrypt if password exists
-                            row[password_col_idx] = self.onewayEncrypt(row[password_col_idx])
-                
-                self.insertRows(table = table,  columns = cols, parameters = params)
-                print(f"* Imported data for {table}")
+                transforms = {'password': get_password_hasher().hash_inline} if table == 'users' else None
+                with open(data_path + f"initial_data/{table}.csv", newline='') as read_file:
+                    count = self.copyRows(table=table, read_file=read_file, transforms=transforms)
+                logger.info(f"* Imported {count} rows for {table}")
             except FileNotFoundError:
-                print(f"* No CSV file found for {table}")
+                logger.info(f"* No CSV file found for {table}")
             except Exception as e:
-                print(f"* Error importing data for {table}: {e}")
+                logger.error(f"* Error importing data for {table}: {e}")
+
+    def copyRows(self, table='table', read_file=None, transforms=None):
+        """
+        Stream a CSV file into a table with COPY FROM STDIN.
+
+        The first line of the file names the columns. Values equal to NULL,
+        quoted or not, are loaded as NULL, matching the rule used by insertRows
+        callers. Without transforms the file is handed to PostgreSQL as-is;
+        with transforms each row is rewritten while it streams, so the file
+        is never held in memory either way.
+
+        Args:
+            table (str): Destination table
+            read_file: Open text file positioned at the CSV header
+            transforms (dict, optional): Column name -> callable applied to every non-NULL value
+
+        Returns:
+            int: Number of rows loaded
+        """
+        columns = next(csv.reader([read_file.readline()], delimiter=',', quotechar='"'))
+        keys    = ','.join(columns)
+        copy_statement = f"""COPY {table} ({keys}) FROM STDIN WITH (FORMAT csv, NULL 'NULL', FORCE_NULL ({keys}))"""
+
+        source = read_file
+        if transforms:
+            source = CsvStream(self._transformRows(csv.reader(read_file, delimiter=',', quotechar='"'), columns, transforms))
+
+        with self.connection() as cnx:
+            cur = cnx.cursor()
+            try:
+                # Green (eventlet) connections do not support COPY
+                with blocking():
+                    cur.copy_expert(copy_statement, source)
+                count = cur.rowcount
+                cnx.commit()
+            except Exception:
+                if not cnx.closed:
+                    cnx.rollback()
+                raise
+            finally:
+                cur.close()
+
+        self.invalidateCaches(table)
+        return count
+
+    @staticmethod
+    def _transformRows(rows, columns, transforms):
+        """Apply per-column transforms to CSV rows, leaving NULL and empty values untouched."""
+        indexes = [(columns.index(column), fn) for column, fn in transforms.items()]
+        for row in rows:
+            for idx, fn in indexes:
+                if row[idx] and row[idx] != 'NULL':
+                    row[idx] = fn(row[idx])
+            yield row
+
+    #--------------------------------------------------
+    # SCHEMA VERSIONING
+    #--------------------------------------------------
+    def migrations(self, data_path = 'flask_app/database/'):
+        """
+        List the migration scripts in /database/migrations.
+
+        Files are named NNNN_description.sql and are applied in version order.
+
+        Returns:
+            list: (version, name, path) tuples, oldest first
+        """
+        found = []
+        for path in glob.glob(data_path + "migrations/*.sql"):
+            name = os.path.basename(path)[:-len('.sql')]
+            found.append((int(name.split('_', 1)[0]), name, path))
+        return sorted(found)
+
+    def schemaVersion(self):
+        """Return the applied schema version, or None if the database has never been versioned."""
+        try:
+            return self.fetch_one("SELECT MAX(version) AS version FROM schema_version")['version']
+        except psycopg2.errors.UndefinedTable:
+            return None
+
+    def migrate(self, data_path = 'flask_app/database/', seed=True):
+        """
+        Bring the schema up to the latest migration.
+
+        When the database is already current this costs a single query. An
+        empty database is built from /database/create_tables (and seeded if
+        `seed` is set) and stamped with the latest version; a database that
+        predates versioning is treated as being at version 1.
+
+        Args:
+            data_path (str): Location of create_tables/, initial_data/ and migrations/
+            seed (bool): Seed a freshly created database from /database/initial_data
+
+        Returns:
+            int: Number of migrations applied or stamped (0 if already current)
+        """
+        migrations = self.migrations(data_path)
+        latest     = migrations[-1][0] if migrations else 0
+        if self.schemaVersion() == latest:
+            return 0
+
+        # Serialize concurrent workers; re-check once we hold the lock, however long another worker keeps it
+        with self.advisoryLock(SCHEMA_LOCK_ID):
+            current = self.schemaVersion()
+            if current == latest:
+                return 0
+
+            with open(data_path + "create_tables/schema_version.sql") as read_file:
+                self.execute(read_file.read())
+
+            if current is None:
+                existing = self.fetch_one("SELECT to_regclass(%s) AS found", [self.tables[0]])['found']
+                if existing is None:
+                    # Fresh database: create_tables/ already reflects every migration
+                    logger.info("* Creating schema from create_tables")
+                    self.createTables(data_path=data_path, seed=seed)
+                    for version, name, path in migrations:
+                        self.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", [version, name])
+                    return len(migrations)
+                current = 1
+                self.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", [1, migrations[0][1]])
+
+            applied = 0
+            for version, name, path in migrations:
+                if version > current:
+                    self.applyMigration(version, name, path)
+                    applied += 1
+            return applied
+
+    @contextmanager
+    def advisoryLock(self, key):
+        """
+        Hold a session-level PostgreSQL advisory lock for the duration of the block.
+
+        The lock is taken and released on a connection checked out for that
+        purpose alone, so it is released on the session that holds it however
+        the block's own statements are spread over the pool. If the block
+        raises, the connection is closed, which also ends the lock.
+
+        Args:
+            key (int): Advisory lock id
+        """
+        cnx   = self.pool.getconn()
+        close = True
+        try:
+            tx = Transaction(cnx)
+            tx.set_timeout(0)       # wait as long as the current holder needs
+            tx.fetch_one("SELECT pg_advisory_lock(%s)", [key])
+            cnx.commit()
+            yield
+            tx.fetch_one("SELECT pg_advisory_unlock(%s)", [key])
+            cnx.commit()
+            close = False
+        finally:
+            self.pool.putconn(cnx, close=close)
+
+    def applyMigration(self, version, name, path):
+        """Run one migration script and record it, atomically."""
+        with open(path) as read_file:
+            statements = read_file.read()
+
+        # Migrations may rewrite or index large tables, so they run without a statement timeout
+        with self.transaction(timeout=0) as tx:
+            tx.execute(statements)
+            tx.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", [version, name])
+
+        logger.info(f"* Applied migration {name}")
+        self.invalidateCaches()
+
+    def resetDatabase(self, data_path = 'flask_app/database/', seed=True):
+        """Drop every table, including the version table, then rebuild and optionally reseed the schema."""
+        for table in self.tables[::-1] + ['schema_version']:
+            self.execute(f"""DROP TABLE IF EXISTS {table}""")
+        return self.migrate(data_path=data_path, seed=seed)
 
     def insertRows(self, table='table', columns=['x','y'], parameters=[['v11','v12'],['v21','v22']]):
         
@@ -238,52 +887,105 @@ class database:
         # Add RETURNING clause for PostgreSQL to get the inserted ID
         query += " RETURNING *"
 
-        print("Executing query:", query)
-        print("With parameters:", query_params)
+        log(logger, logging.DEBUG, "Inserting rows", sampled=True, table=table, rows=len(parameters) if has_multiple_rows else 1)
         
-        result = self.query(query, query_params if query_params else None)
+        result = self.fetch_all(query, query_params if query_params else None)
         if result and len(result) > 0:
             # Get the first inserted row's ID - try common ID patterns
             insert_id = result[0].get('id') or result[0].get(f'{table[:-1]}_id') or result[0].get(f'{table}_id')
         else:
             insert_id = None         
+
+        self.invalidateCaches(table)
         return insert_id
 
+    def invalidateCaches(self, table=None):
+        """
+        Drop cached data derived from `table`, or from every table when it is None.
+
+        Writes made through insertRows/copyRows call this automatically; call it
+        after changing users (e.g. a role) or resume rows with execute() or query().
+        """
+        if table is None or table in self.resume_tables:
+            resume_cache.invalidate()
+        if table is None or table == 'users':
+            identity_cache.clear()
+
     #--------------------------------------------------
     # AUTHENTICATION FUNCTIONS
     #--------------------------------------------------
     def authenticate(self, email='me@email.com', password='password'):
         ''' A function that checks if a given username and password combination exist in the database '''
 
-        # 1. Write a query that checks if a given username and password combination match an entry in the database.
-        check = self.query(query      = """SELECT COUNT(*) as success FROM users WHERE email=%s AND password=%s""",
-                           parameters = [email, self.onewayEncrypt(password)])[0]
-        
-        # 2. The function should return a dict that indicates if the authentication check was a success or not, e.g. {'success': 1} or {'success': 0}
-        return check 
+        # 1. Look up the user's stored hash; hashing runs in a worker process so the event loop stays free
+        hasher = get_password_hasher()
+        user   = self.fetch_one(USER_LOGIN, [email])
+        if user is None:
+            hasher.hash(password)   # same work as a real check, so unknown emails are not revealed by timing
+            return {'success': 0}
+        matches, needs_upgrade = hasher.verify(password, user['password'])
 
-    def get_user_email(self, session_data=None):
-        """Get the current user's email from session data."""
+        # 2. Re-hash legacy (global salt) or outdated-cost hashes with a per-user salt while the password is at hand
+        if needs_upgrade:
+            self.execute(USER_SET_PASSWORD, [hasher.hash(password), user['user_id']])
+
+        # 3. The function should return a dict that indicates if the authentication check was a success or not, e.g. {'success': 1} or {'success': 0}
+        return {'success': int(matches)}
+
+    def get_identity(self, session_data=None):
+        """
+        Resolve the current user's email and role.
+
+        The result is kept on `g` for the rest of the request (or Socket.IO
+        event) and in the process-wide identity cache, keyed by the encrypted
+        session token, so repeat lookups cost no decryption and no query.
+
+        Args:
+            session_data (dict, optional): Session to read; defaults to the Flask session
+
+        Returns:
+            dict: {'email': ..., 'role': ...}; 'Unknown' and 'guest' when nobody is logged in
+        """
         if session_data is None:
             from flask import session
             session_data = session
-        if 'email' in session_data:
-            return self.reversibleEncrypt('decrypt', session_data['email'])
-        return 'Unknown'
+        token = session_data.get('email')
+        if token is None:
+            return {'email': 'Unknown', 'role': 'guest'}
 
-    def get_user_role(self, session_data=None):
-        """Get the current user's role from session data."""
+        cached = g.get('_identity') if has_app_context() else None
+        if cached is not None and cached[0] == token:
+            return cached[1]
+
+        identity = identity_cache.get(token)
+        if identity is None:
+            email    = self.reversibleEncrypt('decrypt', token)
+            result   = self.fetch_one(USER_ROLE, [email])
+            identity = {'email': email, 'role': result['role'] if result else 'guest'}
+            identity_cache.put(token, identity)
+
+        if has_app_context():
+            g._identity = (token, identity)
+        return identity
+
+    def forget_identity(self, session_data=None):
+        """Drop the cached identity of a session, e.g. on logout."""
         if session_data is None:
             from flask import session
             session_data = session
-        if 'email' in session_data:
-            email = self.reversibleEncrypt('decrypt', session_data['email'])
-            if email != 'Unknown':
-                result = self.query("SELECT role FROM users WHERE email=%s", [email])
-                if result:
-                    role = result[0]['role']
-                    return role
-        return 'guest'
+        token = session_data.get('email')
+        if token is not None:
+            identity_cache.discard(token)
+        if has_app_context():
+            g.pop('_identity', None)
+
+    def get_user_email(self, session_data=None):
+        """Get the current user's email from session data."""
+        return self.get_identity(session_data)['email']
+
+    def get_user_role(self, session_data=None):
+        """Get the current user's role from session data."""
+        return self.get_identity(session_data)['role']
 
     #--------------------------------------------------
     # ENCRYPTION FUNCTIONS
@@ -297,8 +999,16 @@ class database:
                                           ).hex()
         return encrypted_string
 
+    @property
+    def fernet(self):
+        """Cipher for reversibleEncrypt, built once per instance."""
+        if self._fernet is None:
+            from cryptography.fernet import Fernet      # deferred: only needed once someone logs in
+            self._fernet = Fernet(self.encryption['reversible']['key'])
+        return self._fernet
+
     def reversibleEncrypt(self, type, message):
-        fernet = Fernet(self.encryption['reversible']['key'])
+        fernet = self.fernet
         if type == 'encrypt':
             message = fernet.encrypt(message.encode())
         elif type == 'decrypt':
@@ -307,7 +1017,12 @@ class database:
         return message
 
 
-
-
-
-
+#--------------------------------------------------
+# SHARED INSTANCE
+#--------------------------------------------------
+def get_database():
+    """Return the current app's database instance, creating it on first use"""
+    db = current_app.extensions.get('database')
+    if db is None:
+        db = current_app.extensions.setdefault('database', database())
+    return db
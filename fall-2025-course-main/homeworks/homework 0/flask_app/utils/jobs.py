@@ -0,0 +1,180 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from flask import current_app
+from .cache import LRUCache
+from .logs import get_logger, log
+
+logger = get_logger(__name__)
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled or has timed out."""
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    def __init__(self, fn, owner=None, timeout=None, meta=None):
+        """
+        Initialize a queued job.
+
+        Args:
+            fn (callable): Work to run; called with the job so it can poll `job.check()`
+            owner (str, optional): Socket.IO session id of the client that asked for it
+            timeout (float, optional): Seconds from submission after which the job is abandoned
+            meta (dict, optional): Extra fields exposed by to_dict()
+        """
+        self.id          = uuid.uuid4().hex
+        self.fn          = fn
+        self.owner       = owner
+        self.meta        = meta or {}
+        self.status      = 'queued'
+        self.result      = None
+        self.error       = None
+        self.created_at  = time.time()
+        self.started_at  = None
+        self.finished_at = None
+        self.deadline    = time.monotonic() + timeout if timeout else None
+        self._cancelled  = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop; a queued job never starts, a running one stops at its next check()."""
+        self._cancelled.set()
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled or has run past its deadline."""
+        if self._cancelled.is_set():
+            raise JobCancelled('cancelled')
+        if self.expired():
+            raise JobCancelled('timeout')
+
+    def to_dict(self):
+        """JSON-ready view of the job for the poll endpoint."""
+        return dict(self.meta, **{
+            'id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        })
+
+class JobQueue:
+    """
+    Bounded queue drained by a fixed pool of background workers.
+
+    Workers are started with `spawn` (socketio.start_background_task), so they
+    are green threads under eventlet and OS threads otherwise. The queue they
+    wait on must come from the same async model: an idle worker blocked in a
+    stdlib Queue.get() would stall an eventlet hub that is not monkey-patched.
+    Finished jobs stay visible to `get()` for `result_ttl` seconds.
+    """
+
+    def __init__(self, spawn, workers=4, depth=32, timeout=60, result_ttl=300, queue_factory=queue.Queue):
+        """
+        Initialize the queue and start its workers.
+
+        Args:
+            spawn (callable): Starts a background task, e.g. socketio.start_background_task
+            workers (int): Number of jobs run concurrently
+            depth (int): Maximum number of jobs waiting to run
+            timeout (float): Default per-job timeout in seconds
+            result_ttl (float): Seconds a job stays retrievable after submission
+            queue_factory (callable): Builds the job queue from `maxsize`, e.g. socketio.server.eio.create_queue
+        """
+        self.timeout  = timeout
+        self._queue   = queue_factory(maxsize=depth)
+        self._jobs    = LRUCache('jobs', max_entries=max(1000, depth * 10), ttl=result_ttl)
+        self._lock    = threading.Lock()
+        self._running = 0
+        for _ in range(workers):
+            spawn(self._worker)
+
+    def submit(self, fn, owner=None, timeout=None, meta=None):
+        """
+        Queue `fn` to run in the background.
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFull: If `depth` jobs are already waiting
+        """
+        job = Job(fn, owner=owner, timeout=timeout or self.timeout, meta=meta)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} jobs already waiting")
+        self._jobs.put(job.id, job)
+        return job
+
+    def get(self, job_id):
+        """Return the job with `job_id`, or None if it is unknown or has expired."""
+        return self._jobs.get(job_id)
+
+    def cancel_owned_by(self, owner):
+        """Cancel every unfinished job submitted by `owner` (e.g. when its socket disconnects)."""
+        for job in self._jobs.values():
+            if job.owner == owner and job.status in ('queued', 'running'):
+                job.cancel()
+
+    def stats(self):
+        """Queue depth and worker utilization."""
+        with self._lock:
+            return {'queued': self._queue.qsize(), 'running': self._running, 'depth': self._queue.maxsize}
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.check()
+            except JobCancelled as e:
+                job.status, job.finished_at = ('cancelled' if str(e) == 'cancelled' else 'timeout'), time.time()
+                continue
+
+            with self._lock:
+                self._running += 1
+            job.status, job.started_at = 'running', time.time()
+            try:
+                job.result = job.fn(job)
+                job.status = 'done'
+            except JobCancelled as e:
+                job.status = 'cancelled' if str(e) == 'cancelled' else 'timeout'
+            except Exception as e:
+                job.status, job.error = 'failed', str(e)
+                log(logger, logging.ERROR, f"Background job failed: {e}", job_id=job.id)
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._running -= 1
+
+#--------------------------------------------------
+# SHARED QUEUE
+#--------------------------------------------------
+_job_queue      = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Return the process-wide chat job queue, starting its workers from the app config on first use."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                from flask_app import socketio
+                _job_queue = JobQueue(socketio.start_background_task,
+                                      workers=current_app.config.get('CHAT_JOB_WORKERS', 4),
+                                      depth=current_app.config.get('CHAT_JOB_QUEUE_DEPTH', 32),
+                                      timeout=current_app.config.get('CHAT_JOB_TIMEOUT', 60),
+                                      result_ttl=current_app.config.get('CHAT_JOB_RESULT_TTL', 300),
+                                      queue_factory=socketio.server.eio.create_queue)
+    return _job_queue
@@ -1,12 +1,29 @@
 # Author: Prof. MM Ghassemi <ghassem3@msu.edu>
 
 import os
+import json
+import uuid
+import random
+import threading
 import requests
 import time
-from typing import Dict, List, Optional
-from flask import current_app, session, jsonify
+import logging
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Optional
+from flask import current_app, jsonify
 from flask_app import socketio
-from .socket_events import process_and_emit_message
+from .socket_events import process_and_emit_message, emit_message_delta, emit_chat_error
+from .jobs import get_job_queue, QueueFull
+from .completion_cache import get_completion_cache, CompletionCache
+from .conversations import get_conversation_store, session_conversation, session_email
+from .singleflight import get_llm_flights
+from .metrics import llm_request_seconds, llm_tokens, llm_cache_hits, llm_shared_calls
+from .logs import get_logger, log
+
+logger = get_logger(__name__)
+
+# Upstream statuses that are worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 class ChatGPTClient:
     """Client for interacting with OpenAI's ChatGPT API"""
@@ -20,11 +37,11 @@ class ChatGPTClient:
             max_tokens: Maximum tokens in response. If not provided, will use config default
             temperature: Response randomness (0.0-1.0). If not provided, will use config default
         """
-        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.api_key = api_key or current_app.config.get('OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
         
-        self.base_url = "https://api.openai.com/v1/chat/completions"
+        self.base_url = current_app.config.get('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/') + "/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -33,7 +50,55 @@ class ChatGPTClient:
         # Get configuration values
         self.model       = model       or current_app.config.get('OPENAI_MODEL')
         self.max_tokens  = max_tokens  or current_app.config.get('OPENAI_MAX_TOKENS')
-        self.temperature = temperature or current_app.config.get('OPENAI_TEMPERATURE')
+        self.temperature = temperature if temperature is not None else current_app.config.get('OPENAI_TEMPERATURE')
+
+        # HTTP settings: split timeouts, bounded retries with jittered exponential backoff
+        self.timeout       = (current_app.config.get('OPENAI_CONNECT_TIMEOUT', 5), current_app.config.get('OPENAI_READ_TIMEOUT', 30))
+        self.max_retries   = current_app.config.get('OPENAI_MAX_RETRIES', 2)
+        self.retry_backoff = current_app.config.get('OPENAI_RETRY_BACKOFF', 0.5)
+
+        # Keep-alive session so consecutive requests reuse pooled TLS connections
+        pool_size    = current_app.config.get('OPENAI_POOL_SIZE', 10)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('http://',  HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def post(self, payload: Dict, stream: bool = False) -> requests.Response:
+        """POST a request body to the chat completions endpoint, retrying transient failures
+        
+        Connection failures and 429/5xx responses are retried up to `max_retries`
+        times, honoring Retry-After when the server sends one. Read timeouts are
+        not retried, since the upstream may already be generating (and billing).
+        Backoff waits with socketio.sleep, so other green threads keep running.
+        
+        Args:
+            payload: JSON request body
+            stream: Whether to stream the response body
+            
+        Returns:
+            The final response, which may still carry an error status
+        """
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self.session.post(self.base_url, json=payload, timeout=self.timeout, stream=stream)
+            except requests.exceptions.ConnectionError:
+                if last_attempt:
+                    raise
+                socketio.sleep(self.backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+
+            retry_after = response.headers.get('Retry-After', '')
+            response.close()
+            socketio.sleep(float(retry_after) if retry_after.isdigit() else self.backoff(attempt))
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay, in seconds, before retry `attempt + 1`"""
+        return random.uniform(0, self.retry_backoff * (2 ** attempt))
     
     def send_message(self, message: str, conversation_history: Optional[List[Dict]] = None, system_prompt: Optional[str] = None) -> Dict:
         """Send a message to ChatGPT and get a response
@@ -46,36 +111,10 @@ class ChatGPTClient:
         Returns:
             Dictionary containing the response and metadata
         """
-        if conversation_history is None:
-            conversation_history = []
-        
-        # Prepare the messages for the API
-        messages = []
-        
-        # Add system prompt if provided
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        # Add conversation history
-        messages.extend(conversation_history)
-        
-        # Add current user message
-        messages.append({"role": "user", "content": message})
-        
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "max_tokens": self.max_tokens,
-            "temperature": self.temperature
-        }
+        payload = self.build_payload(message, conversation_history, system_prompt)
         
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
+            response = self.post(payload)
             response.raise_for_status()
             
             result = response.json()
@@ -97,8 +136,224 @@ class ChatGPTClient:
                 "response": "I'm sorry, I'm having trouble right now. Please try again later."
             }
 
+    def stream_message(self, message: str, conversation_history: Optional[List[Dict]] = None, system_prompt: Optional[str] = None, on_delta: Optional[Callable[[str], None]] = None) -> Dict:
+        """Send a message to ChatGPT and consume the response as it is generated
+        
+        Args:
+            message: The user's message
+            conversation_history: List of previous messages in the conversation
+            system_prompt: Custom system prompt to define AI behavior (optional)
+            on_delta: Called with each chunk of response text as it arrives (optional)
+            
+        Returns:
+            Dictionary containing the full response and metadata, as send_message does;
+            on_delta is not called when the server answers without streaming
+        """
+        payload = self.build_payload(message, conversation_history, system_prompt)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+
+        chunks = []
+        usage  = {}
+        try:
+            with self.post(payload, stream=True) as response:
+                response.raise_for_status()
+
+                # A server that ignores `stream` answers with one complete JSON body
+                if not response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                    result = response.json()
+                    return {
+                        "success": True,
+                        "response": result['choices'][0]['message']['content'],
+                        "usage": result.get('usage', {}),
+                        "model": self.model
+                    }
+
+                # Server-sent events: one `data: {...}` line per chunk, terminated by `data: [DONE]`
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+
+                    chunk = json.loads(data)
+                    usage = chunk.get('usage') or usage
+                    if not chunk.get('choices'):
+                        continue
+                    delta = chunk['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        chunks.append(delta)
+                        if on_delta:
+                            on_delta(delta)
+
+            return {
+                "success": True,
+                "response": ''.join(chunks),
+                "usage": usage,
+                "model": self.model
+            }
 
-def handle_ai_chat_request(llm_client: ChatGPTClient, message: str, system_prompt: str = None, room: str = 'main', page_content: dict = None):
+        except (requests.exceptions.RequestException, ValueError, KeyError, IndexError) as e:
+            return {
+                "success": False,
+                "error": f"Request or response error: {str(e)}",
+                "response": "I'm sorry, I'm having trouble right now. Please try again later."
+            }
+
+    def fingerprint(self, message: str, conversation_history: Optional[List[Dict]] = None, system_prompt: Optional[str] = None) -> str:
+        """Cache key for a request: a hash of the model, sampling settings, prompts, history and message"""
+        return CompletionCache.fingerprint(self.build_payload(message, conversation_history, system_prompt))
+
+    def build_payload(self, message: str, conversation_history: Optional[List[Dict]] = None, system_prompt: Optional[str] = None) -> Dict:
+        """Assemble the chat completions request body
+        
+        Args:
+            message: The user's message
+            conversation_history: List of previous messages in the conversation
+            system_prompt: Custom system prompt to define AI behavior (optional)
+            
+        Returns:
+            Dictionary ready to be sent as the JSON request body
+        """
+        if conversation_history is None:
+            conversation_history = []
+        
+        # Prepare the messages for the API
+        messages = []
+        
+        # Add system prompt if provided
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        # Add conversation history
+        messages.extend(conversation_history)
+        
+        # Add current user message
+        messages.append({"role": "user", "content": message})
+        
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+
+
+#--------------------------------------------------
+# SHARED CLIENT
+#--------------------------------------------------
+_chat_client      = None
+_chat_client_lock = threading.Lock()
+
+def get_chat_client() -> ChatGPTClient:
+    """Return the process-wide ChatGPT client, creating it from the app config on first use
+    
+    Returns:
+        ChatGPTClient whose pooled session is reused by every request in this process
+    """
+    global _chat_client
+    if _chat_client is None:
+        with _chat_client_lock:
+            if _chat_client is None:
+                _chat_client = ChatGPTClient()
+    return _chat_client
+
+
+def generate_ai_response(llm_client: ChatGPTClient, message: str, conversation_history: List[Dict], system_prompt: str,
+                         room: str = 'main', use_cache: bool = True, message_id: Optional[str] = None, stream: bool = False,
+                         should_stop: Optional[Callable[[], None]] = None) -> Dict:
+    """Answer one chat message and broadcast the answer to a room
+    
+    Args:
+        llm_client: Pre-configured LLM client instance
+        message: The user's message to send to the LLM
+        conversation_history: Previous messages in the conversation
+        system_prompt: System prompt defining AI behavior
+        room: Chat room to emit the AI response to
+        use_cache: Allow answering from the completion cache
+        message_id: Id attached to the emitted response (and its deltas when streaming)
+        stream: Emit partial responses to the room as they are generated
+        should_stop: Called between chunks and before the final emit; raises to abandon the response
+        
+    Returns:
+        Dictionary with success status, response text, usage info and message_id
+    """
+    # Answer identical requests from the completion cache when allowed
+    cache     = get_completion_cache() if use_cache else None
+    flights   = get_llm_flights() if use_cache else None
+    cacheable = cache is not None and cache.cacheable(llm_client.temperature)
+    key       = llm_client.fingerprint(message, conversation_history, system_prompt) if cacheable or flights is not None else None
+    cached    = cache.get(key) if cacheable else None
+
+    if cached is not None:
+        result = {"success": True, "response": cached["response"], "usage": cached["usage"], "model": cached["model"], "cached": True}
+        llm_cache_hits.inc()
+        log(logger, logging.DEBUG, "Completion cache hit", sampled=True, **cache.stats())
+
+    # Stream partial responses to the room as they arrive, or wait for the full completion
+    else:
+        def on_delta(delta):
+            if should_stop:
+                should_stop()
+            emit_message_delta(socketio, delta, message_id, 'ai', room)
+
+        def call(flight=None):
+            started = time.monotonic()
+            if stream:
+                def publish(delta):
+                    if should_stop:
+                        should_stop()
+                    flight.publish(delta)
+                result = llm_client.stream_message(message, conversation_history, system_prompt=system_prompt,
+                                                   on_delta=publish if flight else on_delta)
+            else:
+                result = llm_client.send_message(message, conversation_history, system_prompt=system_prompt)
+            latency = time.monotonic() - started
+            record_llm_call(llm_client.model, result, latency)
+            if cacheable and result["success"]:
+                cache.put(key, result, latency=latency)
+            return result
+
+        # Join an identical request already in flight instead of calling upstream again;
+        # every caller still emits (and streams) its own message to its own room
+        if flights is None:
+            result = call()
+        else:
+            result, shared = flights.do(key, call, listener=on_delta if stream else None)
+            result = dict(result)
+            if shared:
+                result["shared"] = True
+                llm_shared_calls.inc()
+                log(logger, logging.DEBUG, "Joined in-flight LLM call", sampled=True, **flights.stats())
+    result["message_id"] = message_id
+
+    if should_stop:
+        should_stop()
+
+    # Use centralized message processing for AI responses (marks a streamed response complete)
+    if result["success"]:
+        process_and_emit_message(socketio, result["response"], 'ai', room, message_id=message_id)
+    return result
+
+
+def record_llm_call(model: str, result: Dict, latency: float):
+    """Record the latency and token usage of one upstream LLM call"""
+    llm_request_seconds.observe(latency, model=model, outcome='ok' if result["success"] else 'error')
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        tokens = (result.get("usage") or {}).get(kind)
+        if tokens:
+            llm_tokens.inc(tokens, model=model, kind=kind[:-len('_tokens')])
+    if not result["success"]:
+        log(logger, logging.WARNING, "LLM call failed", model=model, error=result.get("error"), seconds=round(latency, 3))
+
+
+def exchange(message: str, response: str) -> List[Dict]:
+    """One user message and the assistant's answer, as stored in a conversation"""
+    return [{"role": "user", "content": message}, {"role": "assistant", "content": response}]
+
+
+def handle_ai_chat_request(llm_client: ChatGPTClient, message: str, system_prompt: str = None, room: str = 'main', page_content: dict = None, use_cache: bool = True):
     """
     Handle AI chat requests with LLM and broadcast responses via SocketIO.
     
@@ -108,38 +363,81 @@ def handle_ai_chat_request(llm_client: ChatGPTClient, message: str, system_promp
         system_prompt: Custom system prompt to define AI behavior (optional)
         room: Chat room to emit the AI response to (default: 'main')
         page_content: Dictionary containing page content information (optional)
+        use_cache: Allow answering from the completion cache (default: True)
         
     Returns:
         Response: JSON response with LLM reply or error message
     """
     try:
-        # Get conversation history from session if available
-        conversation_history = session.get('chat_history', [])
+        # Get conversation history from the server-side store; the session only holds its id
+        store                = get_conversation_store()
+        conversation_id      = session_conversation(store)
+        conversation_history = store.recent(conversation_id, current_app.config.get('OPENAI_MAX_CONVERSATION_HISTORY'))
         system_prompt = system_prompt or current_app.config.get('OPENAI_SYSTEM_PROMPT')
-  
-        result = llm_client.send_message(message, conversation_history, system_prompt=system_prompt)
-        
-        if result["success"]:
 
-            # update conversation history
-            conversation_history.append({"role": "user", "content": message})
-            conversation_history.append({"role": "assistant", "content": result["response"]})
-            max_history = current_app.config.get('OPENAI_MAX_CONVERSATION_HISTORY')
-            if len(conversation_history) > max_history:
-                conversation_history = conversation_history[-max_history:]
-            session['chat_history'] = conversation_history
-        
-            # Use centralized message processing for AI responses
-            process_and_emit_message(socketio, result["response"], 'ai', room)
+        stream = bool(current_app.config.get('OPENAI_STREAM'))
+        result = generate_ai_response(llm_client, message, conversation_history, system_prompt, room=room, use_cache=use_cache,
+                                      message_id=uuid.uuid4().hex if stream else None, stream=stream)
+
+        # update conversation history
+        if result["success"]:
+            store.append(conversation_id, exchange(message, result["response"]), email=session_email(store))
 
         return jsonify(result)
         
     except Exception as e:
-        print(f"Error in handle_ai_chat_request: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log(logger, logging.ERROR, f"Error in handle_ai_chat_request: {str(e)}", exc_info=True)
         return jsonify({
             "success": False,
             "response": f"An error occurred: {str(e)}"
         }), 500
 
+
+def enqueue_ai_chat_request(llm_client: ChatGPTClient, message: str, system_prompt: str = None, room: str = 'main', owner: str = None, use_cache: bool = True):
+    """
+    Queue an AI chat request and return at once; the answer is delivered to the room via SocketIO.
+    
+    Args:
+        llm_client: Pre-configured LLM client instance
+        message: The user's message to send to the LLM
+        system_prompt: Custom system prompt to define AI behavior (optional)
+        room: Chat room to emit the AI response to (default: 'main')
+        owner: Socket.IO session id of the requesting client; errors go to it and its disconnect cancels the job (optional)
+        use_cache: Allow answering from the completion cache (default: True)
+        
+    Returns:
+        Response: 202 with the job and message ids, or 503 when the queue is full
+    """
+    store                = get_conversation_store()
+    conversation_id      = session_conversation(store)
+    conversation_history = store.recent(conversation_id, current_app.config.get('OPENAI_MAX_CONVERSATION_HISTORY'))
+    email         = session_email(store)
+    system_prompt = system_prompt or current_app.config.get('OPENAI_SYSTEM_PROMPT')
+    stream        = bool(current_app.config.get('OPENAI_STREAM'))
+    message_id    = uuid.uuid4().hex
+    app           = current_app._get_current_object()
+
+    def run(job):
+        with app.app_context():
+            try:
+                result = generate_ai_response(llm_client, message, conversation_history, system_prompt, room=room, use_cache=use_cache,
+                                              message_id=message_id, stream=stream, should_stop=job.check)
+                # The client already has its 202, so a failed call must be reported over the socket too
+                if result["success"]:
+                    store.append(conversation_id, exchange(message, result["response"]), email=email)
+                else:
+                    emit_chat_error(socketio, job.id, message_id, result.get("error", "LLM call failed"), room=owner or room)
+                return result
+            except Exception as e:
+                emit_chat_error(socketio, job.id, message_id, str(e), room=owner or room)
+                raise
+
+    try:
+        job = get_job_queue().submit(run, owner=owner, meta={'message_id': message_id})
+    except QueueFull as e:
+        log(logger, logging.WARNING, f"Chat job rejected: {e}")
+        response = jsonify({"success": False, "busy": True, "response": "The AI assistant is busy. Please try again shortly."})
+        return response, 503, {'Retry-After': '5'}
+
+    return jsonify({"success": True, "queued": True, "job_id": job.id, "message_id": message_id}), 202
+
@@ -0,0 +1,70 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+import logging
+import random
+import sys
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any structured fields."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SampleFilter(logging.Filter):
+    """Keep only a fraction of records marked `sampled`; warnings and errors always pass."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if getattr(record, 'sampled', False) and record.levelno < logging.WARNING:
+            return random.random() < self.rate
+        return True
+
+def configure_logging(level='INFO', sample_rate=1.0, json_format=True):
+    """
+    Route the application's `flask_app.*` loggers to stderr.
+
+    Args:
+        level (str): Minimum level logged
+        sample_rate (float): Fraction of hot-path (sampled) records kept
+        json_format (bool): Emit JSON lines instead of plain text
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handler.addFilter(SampleFilter(sample_rate))
+
+    logger = logging.getLogger('flask_app')
+    logger.handlers  = [handler]
+    logger.propagate = False
+    logger.setLevel(level.upper())
+
+def get_logger(name):
+    """Return the logger for a module, e.g. get_logger(__name__)."""
+    return logging.getLogger(name)
+
+def log(logger, level, msg, sampled=False, exc_info=False, **fields):
+    """
+    Log `msg` with structured fields.
+
+    Args:
+        logger: Logger from get_logger()
+        level (int): logging level, e.g. logging.INFO
+        msg (str): Human-readable message
+        sampled (bool): Subject the record to LOG_SAMPLE_RATE (use on per-request/per-message paths)
+        exc_info (bool): Attach the current exception's traceback
+        **fields: Structured fields added to the record
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, msg, exc_info=exc_info, extra={'fields': fields, 'sampled': sampled})
@@ -0,0 +1,190 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from sub-millisecond queries to slow LLM completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def format_labels(labelnames, values, extra=None):
+    """Render a Prometheus label set, e.g. {method="GET",status="200"}."""
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Counter:
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        """
+        Initialize the counter.
+
+        Args:
+            name (str): Metric name
+            help (str): Description shown on /metrics
+            labelnames (tuple): Names of the labels passed to inc()
+        """
+        self.name       = name
+        self.help       = help
+        self.labelnames = tuple(labelnames)
+        self._values    = {}
+        self._lock      = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            return [f"{self.name}{format_labels(self.labelnames, key)} {value}" for key, value in self._values.items()]
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, one series per label combination."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Metric name
+            help (str): Description shown on /metrics
+            labelnames (tuple): Names of the labels passed to observe()
+            buckets (tuple): Upper bounds of the buckets, ascending
+        """
+        self.name       = name
+        self.help       = help
+        self.labelnames = tuple(labelnames)
+        self.buckets    = tuple(buckets)
+        self._series    = {}                 # labels -> [bucket counts..., sum, count]
+        self._lock      = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+class Gauge:
+    """Value read from a callback when /metrics is scraped, e.g. connection pool occupancy."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, collect, labelnames=()):
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): Metric name
+            help (str): Description shown on /metrics
+            collect (callable): Returns a number, or a dict of label value tuples to numbers
+            labelnames (tuple): Names of the labels in the keys returned by `collect`
+        """
+        self.name       = name
+        self.help       = help
+        self.collect    = collect
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        try:
+            values = self.collect()
+        except Exception:
+            return []
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{format_labels(self.labelnames, key)} {value}" for key, value in values.items()]
+
+class Registry:
+    """The set of metrics exposed on /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock    = threading.Lock()
+
+    def register(self, metric):
+        """Add `metric`, or return the one already registered under its name."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, collect, labelnames=()):
+        return self.register(Gauge(name, help, collect, labelnames))
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Body for the /metrics endpoint
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+#--------------------------------------------------
+# SHARED METRICS
+#--------------------------------------------------
+registry = Registry()
+
+http_request_seconds = registry.histogram('http_request_duration_seconds', 'HTTP request latency by route',
+                                          ('method', 'route', 'status'))
+db_query_seconds     = registry.histogram('db_query_duration_seconds', 'Database query latency by statement type',
+                                          ('statement',))
+llm_request_seconds  = registry.histogram('llm_request_duration_seconds', 'Upstream LLM call latency',
+                                          ('model', 'outcome'))
+llm_tokens           = registry.counter('llm_tokens_total', 'LLM tokens used, from the completion usage',
+                                        ('model', 'kind'))
+llm_cache_hits       = registry.counter('llm_cache_hits_total', 'Chat requests answered from the completion cache')
+llm_shared_calls     = registry.counter('llm_shared_calls_total', 'Chat requests answered by joining an identical in-flight LLM call')
+socketio_emits       = registry.counter('socketio_emits_total', 'Socket.IO frames emitted by event',
+                                        ('event',))
+
+def statement_type(query):
+    """First keyword of a SQL statement (SELECT, INSERT, ...), used as a low-cardinality label."""
+    words = query.split(None, 1)
+    return words[0].upper() if words else 'EMPTY'
@@ -0,0 +1,25 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+def blocking_wait(future):
+    """Block the calling thread until `future` finishes; returns its result or raises its exception."""
+    return future.result()
+
+def cooperative_wait(socketio):
+    """
+    Return the function used to wait for work handed to a process pool.
+
+    Under eventlet the wait runs on one of eventlet's native threads (tpool),
+    so the calling green thread sleeps until the result is ready and the hub
+    wakes it once, instead of polling `future.done()`. Other async modes use
+    real threads, which can simply block.
+
+    Args:
+        socketio: The app's SocketIO instance; before init_app() it has no async mode and nothing runs green
+
+    Returns:
+        callable: Takes a concurrent.futures.Future and returns its result
+    """
+    if getattr(socketio, 'async_mode', None) == 'eventlet':
+        from eventlet import tpool
+        return lambda future: tpool.execute(future.result)
+    return blocking_wait
@@ -0,0 +1,162 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from flask import current_app
+from flask_app import socketio
+from .cache import LRUCache
+from .context_builder import BM25Index, split_chunks
+from .logs import get_logger
+from .offload import blocking_wait, cooperative_wait
+
+logger = get_logger(__name__)
+
+def clean_html_content(html_content):
+    """
+    Clean HTML content by removing tags and extracting clean text.
+
+    Args:
+        html_content (str): Raw HTML content
+
+    Returns:
+        str: Clean text content without HTML tags
+    """
+    if not html_content:
+        return ""
+
+    try:
+        # Parse HTML with Beautiful Soup (imported here: it is slow to import and only needed once a page is chatted about)
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        # Remove script, style, and other non-content elements
+        for element in soup(["script", "style", "nav", "footer", "header", "aside"]):
+            element.decompose()
+
+        # Get text and clean it up
+        text = soup.get_text()
+
+        # Clean up whitespace and normalize
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        text = ' '.join(chunk for chunk in chunks if chunk)
+
+        # Remove excessive whitespace
+        text = ' '.join(text.split())
+
+        return text
+    except Exception as e:
+        logger.warning(f"Error cleaning HTML content: {e}")
+        # Fallback: return original content if cleaning fails
+        return html_content
+
+class PageSnapshotCache:
+    """
+    Content-addressed store of cleaned page text.
+
+    Pages are keyed by the SHA-256 of their HTML, so a client that already
+    sent a page can refer to it by hash alone. Large pages are cleaned in a
+    worker process while the calling greenlet yields, keeping the event loop
+    free for other clients.
+    """
+
+    def __init__(self, cache, workers=2, offload_bytes=65536, wait=blocking_wait, chunk_tokens=200):
+        """
+        Initialize the snapshot cache.
+
+        Args:
+            cache (LRUCache): Size-bounded store of cleaned text, keyed by hash
+            workers (int): Worker processes for cleaning; 0 cleans inline
+            offload_bytes (int): Pages at least this large are cleaned in a worker
+            wait (callable): Waits for a worker's future and returns its result, e.g. cooperative_wait(socketio)
+            chunk_tokens (int): Target chunk size when indexing a page for retrieval
+        """
+        self.cache         = cache
+        self.workers       = workers
+        self.offload_bytes = offload_bytes
+        self.wait          = wait
+        self.chunk_tokens  = chunk_tokens
+        self.indexes       = LRUCache('page_indexes', max_entries=cache.max_entries)
+        self._executor     = None
+        self._lock         = threading.Lock()
+
+    @staticmethod
+    def content_hash(html):
+        """SHA-256 of the page HTML, matching the hash computed by chat-vue.js."""
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+    def resolve(self, page_content):
+        """
+        Return the cleaned text for a `pageContent` payload.
+
+        The payload carries either the page HTML in `content` (optionally with
+        its `hash`) or only the `hash` of a page sent earlier.
+
+        Args:
+            page_content (dict): Page payload from the chat client
+
+        Returns:
+            tuple: (cleaned text, hash). The text is None when only a hash was
+                   sent and it is not cached; (None, None) when there is no page.
+        """
+        html = page_content.get('content')
+        if html:
+            page_hash = self.content_hash(html)
+            text      = self.cache.get(page_hash)
+            if text is None:
+                text = self.clean(html)
+                self.cache.put(page_hash, text, size=len(text))
+            return text, page_hash
+
+        page_hash = page_content.get('hash')
+        if page_hash:
+            return self.cache.get(page_hash), page_hash
+        return None, None
+
+    def index(self, page_hash, text):
+        """Return the retrieval index for a page, building it once per distinct page."""
+        index = self.indexes.get(page_hash)
+        if index is None:
+            index = BM25Index(split_chunks(text, self.chunk_tokens))
+            self.indexes.put(page_hash, index)
+        return index
+
+    def clean(self, html):
+        """Clean `html`, in a worker process if it is large enough to stall the event loop."""
+        if not self.workers or len(html) < self.offload_bytes:
+            return clean_html_content(html)
+
+        return self.wait(self.executor().submit(clean_html_content, html))
+
+    def executor(self):
+        # Fork where available: spawned workers would re-import the entry point (app.py), which builds the app
+        with self._lock:
+            if self._executor is None:
+                method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+#--------------------------------------------------
+# SHARED CACHE
+#--------------------------------------------------
+_page_snapshots      = None
+_page_snapshots_lock = threading.Lock()
+
+def get_page_snapshots():
+    """Return the process-wide page snapshot cache, creating it from the app config on first use."""
+    global _page_snapshots
+    if _page_snapshots is None:
+        with _page_snapshots_lock:
+            if _page_snapshots is None:
+                cache = LRUCache('pages',
+                                 max_entries=current_app.config.get('PAGE_CACHE_MAX_ENTRIES', 256),
+                                 max_bytes=current_app.config.get('PAGE_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+                _page_snapshots = PageSnapshotCache(cache,
+                                                    workers=current_app.config.get('PAGE_CLEAN_WORKERS', 2),
+                                                    offload_bytes=current_app.config.get('PAGE_CLEAN_OFFLOAD_BYTES', 65536),
+                                                    wait=cooperative_wait(socketio),
+                                                    chunk_tokens=current_app.config.get('OPENAI_CONTEXT_CHUNK_TOKENS', 200))
+    return _page_snapshots
@@ -0,0 +1,155 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from .offload import blocking_wait, cooperative_wait
+
+# Stored format of salted hashes: scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+PREFIX = 'scrypt'
+
+class HasherBusy(Exception):
+    """Raised when a hash is requested while `max_pending` hashes are already waiting."""
+
+def scrypt_hex(password, salt, n, r, p):
+    """
+    Hash `password` with scrypt.
+
+    Args:
+        password (str): Plain text password
+        salt (bytes): Salt
+        n, r, p (int): scrypt cost parameters
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p).hex()
+
+class PasswordHasher:
+    """
+    Salted scrypt hashing that runs outside the event loop.
+
+    Each hash gets its own random salt and records its cost parameters, so
+    the cost can be raised without invalidating existing passwords. Hashes
+    made with the old global salt (bare hex digests) are still accepted and
+    reported as needing an upgrade.
+    """
+
+    def __init__(self, n=32, r=9, p=1, legacy=None, workers=2, max_pending=64, wait=blocking_wait):
+        """
+        Initialize the hasher.
+
+        Args:
+            n, r, p (int): scrypt cost parameters for new hashes
+            legacy (tuple, optional): (salt, n, r, p) of hashes made before per-user salts
+            workers (int): Worker processes for hashing; 0 hashes inline
+            max_pending (int): Hashes allowed to wait for a worker before HasherBusy is raised
+            wait (callable): Waits for a worker's future and returns its result, e.g. cooperative_wait(socketio)
+        """
+        self.n           = n
+        self.r           = r
+        self.p           = p
+        self.legacy      = legacy
+        self.workers     = workers
+        self.max_pending = max_pending
+        self.wait        = wait
+        self.pending     = 0
+        self._executor   = None
+        self._lock       = threading.Lock()
+
+    def hash(self, password, salt=None):
+        """
+        Hash `password` with the current parameters and a fresh (or given) salt.
+
+        Returns:
+            str: Hash in the stored format
+        """
+        salt = salt or os.urandom(16)
+        return self.format(salt, self.run(scrypt_hex, password, salt, self.n, self.r, self.p))
+
+    def verify(self, password, stored):
+        """
+        Check `password` against a stored hash.
+
+        Returns:
+            tuple: (matches, needs_upgrade). needs_upgrade is True for a matching
+                   legacy hash or one made with different cost parameters.
+        """
+        if not stored:
+            return False, False
+
+        parts = stored.split('$')
+        if len(parts) == 6 and parts[0] == PREFIX:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            digest  = self.run(scrypt_hex, password, bytes.fromhex(parts[4]), n, r, p)
+            matches = hmac.compare_digest(digest, parts[5])
+            return matches, matches and (n, r, p) != (self.n, self.r, self.p)
+
+        if self.legacy is None:
+            return False, False
+        digest  = self.run(scrypt_hex, password, *self.legacy)
+        matches = hmac.compare_digest(digest, stored)
+        return matches, matches
+
+    def hash_inline(self, password):
+        """Hash without offloading, for bulk work such as seeding where there is no event loop to protect."""
+        salt = os.urandom(16)
+        return self.format(salt, scrypt_hex(password, salt, self.n, self.r, self.p))
+
+    def format(self, salt, digest):
+        return f"{PREFIX}${self.n}${self.r}${self.p}${salt.hex()}${digest}"
+
+    def run(self, fn, *args):
+        """Run `fn(*args)` in a worker process while the calling greenlet yields."""
+        if not self.workers:
+            return fn(*args)
+
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HasherBusy(f"{self.pending} password hashes already pending")
+            self.pending += 1
+        try:
+            return self.wait(self.executor().submit(fn, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def executor(self):
+        # Same start method as the page cleaning pool: forked workers skip re-importing app.py
+        with self._lock:
+            if self._executor is None:
+                method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+#--------------------------------------------------
+# SHARED HASHER
+#--------------------------------------------------
+_password_hasher      = None
+_password_hasher_lock = threading.Lock()
+
+def get_password_hasher():
+    """Return the process-wide password hasher, creating it from the app config on first use."""
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                from flask_app import socketio
+                legacy_salt = current_app.config.get('ENCRYPTION_ONEWAY_SALT')
+                legacy      = (legacy_salt.encode(),
+                               current_app.config.get('ENCRYPTION_ONEWAY_LEGACY_N'),
+                               current_app.config.get('ENCRYPTION_ONEWAY_LEGACY_R'),
+                               current_app.config.get('ENCRYPTION_ONEWAY_LEGACY_P')) if legacy_salt else None
+                _password_hasher = PasswordHasher(n=current_app.config.get('ENCRYPTION_ONEWAY_N'),
+                                                  r=current_app.config.get('ENCRYPTION_ONEWAY_R'),
+                                                  p=current_app.config.get('ENCRYPTION_ONEWAY_P'),
+                                                  legacy=legacy,
+                                                  workers=current_app.config.get('PASSWORD_HASH_WORKERS', 2),
+                                                  max_pending=current_app.config.get('PASSWORD_HASH_MAX_PENDING', 64),
+                                                  wait=cooperative_wait(socketio))
+    return _password_hasher
@@ -0,0 +1,285 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.extensions
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable PostgreSQL connections.
+
+    Connections are opened lazily up to `maxconn`, trimmed back to `minconn`
+    once they sit idle for `max_idle` seconds, and validated on checkout so
+    that a connection dropped by the server is replaced instead of handed out.
+    """
+
+    # Builds the lock waiters park on; make_cooperative() swaps in a green one for an unpatched eventlet hub
+    condition_factory = threading.Condition
+
+    def __init__(self, minconn=1, maxconn=10, timeout=10, ping_after=30, max_idle=300, **connect_kwargs):
+        """
+        Initialize the pool.
+
+        Args:
+            minconn (int): Number of idle connections to keep open
+            maxconn (int): Hard upper bound on open connections
+            timeout (float): Seconds to wait for a free connection before raising PoolTimeout
+            ping_after (float): Idle seconds after which a connection is pinged on checkout
+            max_idle (float): Idle seconds after which connections above `minconn` are closed
+            **connect_kwargs: Arguments forwarded to psycopg2.connect
+        """
+        self.minconn        = minconn
+        self.maxconn        = maxconn
+        self.timeout        = timeout
+        self.ping_after     = ping_after
+        self.max_idle       = max_idle
+        self.connect_kwargs = connect_kwargs
+
+        self._idle      = []          # list of (connection, returned_at)
+        self._in_use    = set()
+        self._opening   = 0
+        self._cond      = self.condition_factory()
+
+        # Metrics
+        self._waiting          = 0
+        self._checkouts        = 0
+        self._discarded        = 0
+        self._timeouts         = 0
+        self._checkout_seconds = 0.0
+        self._checkout_max     = 0.0
+
+    #--------------------------------------------------
+    # CONNECTION LIFECYCLE
+    #--------------------------------------------------
+    def _connect(self):
+        return psycopg2.connect(**self.connect_kwargs)
+
+    def _is_healthy(self, cnx, idle_for):
+        """Return True if an idle connection can safely be handed out."""
+        if cnx.closed:
+            return False
+        if cnx.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if idle_for >= self.ping_after:
+            try:
+                cur = cnx.cursor()
+                cur.execute("SELECT 1")
+                cur.close()
+                cnx.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _discard(self, cnx):
+        self._discarded += 1
+        try:
+            cnx.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self):
+        """
+        Check out a healthy connection, opening a new one if the pool has room.
+
+        Returns:
+            connection: An open psycopg2 connection
+
+        Raises:
+            PoolTimeout: If the pool stays exhausted for longer than `timeout`
+        """
+        started  = time.monotonic()
+        deadline = started + self.timeout
+
+        with self._cond:
+            while True:
+                # Reuse the most recently returned idle connection first
+                while self._idle:
+                    cnx, returned_at = self._idle.pop()
+                    if self._is_healthy(cnx, time.monotonic() - returned_at):
+                        return self._checked_out(cnx, started)
+                    self._discard(cnx)
+
+                # Open a new connection if we are below the bound (outside the lock)
+                if len(self._in_use) + self._opening < self.maxconn:
+                    self._opening += 1
+                    break
+
+                # Otherwise wait for a connection to be returned
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s "
+                                      f"({len(self._in_use)}/{self.maxconn} in use)")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            cnx = self._connect()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            return self._checked_out(cnx, started)
+
+    def _checked_out(self, cnx, started):
+        elapsed = time.monotonic() - started
+        self._in_use.add(cnx)
+        self._checkouts        += 1
+        self._checkout_seconds += elapsed
+        self._checkout_max      = max(self._checkout_max, elapsed)
+        return cnx
+
+    def putconn(self, cnx, close=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            cnx: Connection previously obtained from getconn()
+            close (bool): Close the connection instead of keeping it idle
+        """
+        with self._cond:
+            self._in_use.discard(cnx)
+
+            # Never keep a connection with an open or failed transaction
+            if not close and not cnx.closed:
+                try:
+                    if cnx.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                        cnx.rollback()
+                except psycopg2.Error:
+                    close = True
+
+            if close or cnx.closed or len(self._idle) >= self.maxconn:
+                self._discard(cnx)
+            else:
+                self._idle.append((cnx, time.monotonic()))
+
+            # Close connections above the configured minimum that have sat idle too long
+            now = time.monotonic()
+            while len(self._idle) > self.minconn and now - self._idle[0][1] > self.max_idle:
+                old, _ = self._idle.pop(0)
+                self._discard(old)
+
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection. Checked-out connections are closed when returned."""
+        with self._cond:
+            while self._idle:
+                cnx, _ = self._idle.pop()
+                self._discard(cnx)
+
+    #--------------------------------------------------
+    # METRICS
+    #--------------------------------------------------
+    def stats(self):
+        """
+        Snapshot of pool usage.
+
+        Returns:
+            dict: Current sizes, waiters and checkout latency figures
+        """
+        with self._cond:
+            return {
+                'min': self.minconn,
+                'max': self.maxconn,
+                'in_use': len(self._in_use) + self._opening,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'discarded': self._discarded,
+                'timeouts': self._timeouts,
+                'checkout_avg_ms': round(1000 * self._checkout_seconds / self._checkouts, 3) if self._checkouts else 0.0,
+                'checkout_max_ms': round(1000 * self._checkout_max, 3),
+            }
+
+#--------------------------------------------------
+# GREEN THREAD SUPPORT
+#--------------------------------------------------
+def eventlet_wait_callback(cnx):
+    """
+    psycopg2 wait callback that parks the calling green thread until libpq's socket is ready.
+
+    If the green thread is interrupted while waiting (an eventlet.Timeout,
+    GreenletExit or KeyboardInterrupt), the running query is cancelled on the
+    server and its outcome read, so the connection is left usable; then the
+    interruption propagates to the caller.
+    """
+    from eventlet.hubs import trampoline
+    while True:
+        state = cnx.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        try:
+            trampoline(cnx.fileno(), **poll_wait(state))
+        except BaseException:
+            cnx.cancel()
+            drain(cnx)
+            raise
+
+def poll_wait(state):
+    """trampoline() arguments for a psycopg2 poll() state other than POLL_OK."""
+    if state == psycopg2.extensions.POLL_READ:
+        return {'read': True}
+    if state == psycopg2.extensions.POLL_WRITE:
+        return {'write': True}
+    raise psycopg2.OperationalError(f"Bad result from poll: {state}")
+
+def drain(cnx):
+    """Wait for a cancelled query to finish; its QueryCanceled error is expected and dropped."""
+    from eventlet.hubs import trampoline
+    while True:
+        try:
+            state = cnx.poll()
+        except psycopg2.Error:
+            return
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        trampoline(cnx.fileno(), **poll_wait(state))
+
+def make_cooperative():
+    """
+    Make every psycopg2 connection yield to the eventlet hub while it waits on the server.
+
+    When threading is not monkey-patched (`python app.py`), pools created from
+    now on also wait for a free connection on a green condition, since a
+    stdlib one would block the hub while another green thread holds it.
+    Replaces the callback eventlet's own monkey_patch() installs, which leaves
+    an interrupted query running.
+
+    Returns:
+        bool: Whether the wait callback was installed
+    """
+    try:
+        from eventlet import patcher
+        from eventlet.green import threading as green_threading
+    except ImportError:
+        return False
+    if not patcher.is_monkey_patched('thread'):
+        ConnectionPool.condition_factory = green_threading.Condition
+    psycopg2.extensions.set_wait_callback(eventlet_wait_callback)
+    return True
+
+@contextmanager
+def blocking():
+    """
+    Run the block with psycopg2's wait callback removed, for COPY, which green connections refuse.
+
+    The block holds the whole process, so keep it to bulk loads run at setup time.
+    """
+    callback = psycopg2.extensions.get_wait_callback()
+    psycopg2.extensions.set_wait_callback(None)
+    try:
+        yield
+    finally:
+        psycopg2.extensions.set_wait_callback(callback)
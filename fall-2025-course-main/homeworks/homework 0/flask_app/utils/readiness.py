@@ -0,0 +1,63 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from flask import current_app
+
+class Readiness:
+    """
+    Startup state of one app process, reported by /healthz and /readyz.
+
+    The server starts accepting connections as soon as the app is created.
+    The database bootstrap (connect, migrate, seed) runs in the background
+    and marks the process ready when it succeeds, or failed once it gives up.
+    """
+
+    def __init__(self, event_factory: Callable[[], Any] = threading.Event):
+        """Initialize the startup state
+
+        Args:
+            event_factory: Builds the event wait() blocks on, e.g. socketio.server.eio.create_event,
+                           so a waiter under eventlet lets the bootstrap green thread run
+        """
+        self.started_at = time.monotonic()
+        self.ready_at   = None
+        self.attempts   = 0
+        self.error      = None
+        self._done      = event_factory()
+
+    def mark_ready(self):
+        self.ready_at = time.monotonic()
+        self.error    = None
+        self._done.set()
+
+    def mark_failed(self, error: str):
+        self.error = error
+        self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    @property
+    def failed(self) -> bool:
+        return self._done.is_set() and not self.ready
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the bootstrap finishes (or `timeout` seconds pass); returns whether the process is ready"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def stats(self) -> Dict:
+        """Phase, bootstrap attempts and seconds from app creation to ready"""
+        return {
+            'status': 'ready' if self.ready else 'failed' if self.failed else 'starting',
+            'attempts': self.attempts,
+            'startup_seconds': round(self.ready_at - self.started_at, 3) if self.ready else None,
+            'error': self.error,
+        }
+
+def get_readiness() -> Readiness:
+    """Return the current app's startup state"""
+    return current_app.extensions['readiness']
@@ -0,0 +1,274 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from flask import current_app
+from .metrics import socketio_emits
+
+# Room names come from clients; anything else is refused so names stay short and printable
+ROOM_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def valid_room(room):
+    """Whether `room` is an acceptable chat room name."""
+    return isinstance(room, str) and ROOM_NAME.match(room) is not None
+
+#--------------------------------------------------
+# ROOM HISTORY
+#--------------------------------------------------
+class MemoryHistory:
+    """
+    Sequence numbers and replay buffers of the rooms, kept in this process.
+
+    Only correct with a single worker. At most `max_rooms` rooms are kept;
+    the least recently used one is forgotten to make room for a new one,
+    and comes back with a new epoch so clients do not skip its messages.
+    """
+
+    def __init__(self, size=50, max_rooms=100):
+        """
+        Initialize the history.
+
+        Args:
+            size (int): Messages kept per room for replay; 0 keeps none
+            max_rooms (int): Rooms tracked at once
+        """
+        self.size      = size
+        self.max_rooms = max_rooms
+        self._rooms    = OrderedDict()     # room -> {'epoch', 'seq', 'messages'}, least recently used first
+        self._lock     = threading.Lock()
+
+    def append(self, room, payload):
+        """Number `payload` as the room's next message, remember it, and return the numbered copy."""
+        with self._lock:
+            state = self._rooms.get(room)
+            if state is None:
+                state = self._rooms[room] = {'epoch': uuid.uuid4().hex[:8], 'seq': 0, 'messages': deque(maxlen=self.size or None)}
+                while len(self._rooms) > self.max_rooms:
+                    self._rooms.popitem(last=False)
+            self._rooms.move_to_end(room)
+            state['seq'] += 1
+            payload = dict(payload, seq=state['seq'], epoch=state['epoch'], timestamp=time.time())
+            if self.size:
+                state['messages'].append(payload)
+            return payload
+
+    def since(self, room, seq=None, epoch=None):
+        """The room's epoch and the messages after `seq`; `seq` counts only when `epoch` is the room's."""
+        with self._lock:
+            state = self._rooms.get(room)
+            if state is None:
+                return None, []
+            seq = seq if epoch == state['epoch'] else 0
+            return state['epoch'], [payload for payload in state['messages'] if payload['seq'] > (seq or 0)]
+
+    def sizes(self):
+        """Messages buffered per room."""
+        with self._lock:
+            return {room: len(state['messages']) for room, state in self._rooms.items()}
+
+class RedisHistory:
+    """
+    Sequence numbers and replay buffers of the rooms, shared by every worker through Redis.
+
+    Numbers come from one counter per room, so a client sees the same
+    sequence whichever worker its connection lands on. Rooms are tracked
+    by last use in a sorted set, capped at `max_rooms` like MemoryHistory.
+    """
+
+    def __init__(self, client, size=50, max_rooms=100, prefix='chat'):
+        """
+        Initialize the history.
+
+        Args:
+            client: redis.Redis connection
+            size (int): Messages kept per room for replay; 0 keeps none
+            max_rooms (int): Rooms tracked at once
+            prefix (str): Prefix of the Redis keys
+        """
+        self.client    = client
+        self.size      = size
+        self.max_rooms = max_rooms
+        self.prefix    = prefix
+
+    def _keys(self, room):
+        return f'{self.prefix}:room:{room}', f'{self.prefix}:history:{room}'
+
+    def append(self, room, payload):
+        """Number `payload` as the room's next message, remember it, and return the numbered copy."""
+        state, history = self._keys(room)
+        rooms          = f'{self.prefix}:rooms'
+        pipe = self.client.pipeline()
+        pipe.hsetnx(state, 'epoch', uuid.uuid4().hex[:8])
+        pipe.hincrby(state, 'seq', 1)
+        pipe.hget(state, 'epoch')
+        pipe.zadd(rooms, {room: time.time()})
+        _, seq, epoch, _ = pipe.execute()
+        payload = dict(payload, seq=seq, epoch=epoch.decode(), timestamp=time.time())
+
+        pipe = self.client.pipeline()
+        if self.size:
+            pipe.rpush(history, json.dumps(payload))
+            pipe.ltrim(history, -self.size, -1)
+        pipe.zrange(rooms, 0, -self.max_rooms - 1)
+        stale = pipe.execute()[-1]
+        if stale:
+            self.client.zrem(rooms, *stale)
+            self.client.delete(*(key for name in stale for key in self._keys(name.decode())))
+        return payload
+
+    def since(self, room, seq=None, epoch=None):
+        """The room's epoch and the messages after `seq`; `seq` counts only when `epoch` is the room's."""
+        state, history = self._keys(room)
+        pipe = self.client.pipeline()
+        pipe.hget(state, 'epoch')
+        pipe.lrange(history, 0, -1)
+        current, messages = pipe.execute()
+        if current is None:
+            return None, []
+        current  = current.decode()
+        seq      = seq if epoch == current else 0
+        messages = sorted((json.loads(message) for message in messages), key=lambda payload: payload['seq'])
+        return current, [payload for payload in messages if payload['seq'] > (seq or 0)]
+
+    def sizes(self):
+        """Messages buffered per room."""
+        rooms = [room.decode() for room in self.client.zrange(f'{self.prefix}:rooms', 0, -1)]
+        pipe  = self.client.pipeline()
+        for room in rooms:
+            pipe.llen(self._keys(room)[1])
+        return dict(zip(rooms, pipe.execute()))
+
+#--------------------------------------------------
+# BROADCASTER
+#--------------------------------------------------
+class RoomBroadcaster:
+    """
+    Delivers chat messages to rooms and remembers the most recent ones.
+
+    Every message gets a per-room sequence number and is kept in a bounded
+    ring buffer, so a client joining a room can be sent what it missed in a
+    single frame. With a flush interval, messages published to a room within
+    one interval are coalesced into a single `messages` frame.
+    """
+
+    def __init__(self, socketio, history=None, flush_interval=0, namespace='/chat'):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            socketio: SocketIO instance used to emit
+            history: MemoryHistory or RedisHistory holding sequence numbers and replay buffers
+            flush_interval (float): Seconds to coalesce messages for; 0 emits each one immediately
+            namespace (str): Socket.IO namespace to emit on
+        """
+        self.socketio       = socketio
+        self.history        = history or MemoryHistory()
+        self.flush_interval = flush_interval
+        self.namespace      = namespace
+        self._pending       = {}                     # room -> payloads waiting for the next flush
+        self._lock          = threading.Lock()
+        self.frames         = 0
+        self.messages       = 0
+
+    def publish(self, payload, room='main'):
+        """
+        Record `payload` in the room's history and send it to the room.
+
+        Args:
+            payload (dict): Message as emitted on the `message` event
+            room (str): Chat room to emit to
+        """
+        payload = self.history.append(room, payload)
+        with self._lock:
+            self.messages += 1
+            if not self.flush_interval:
+                self.frames += 1
+                schedule = None
+            else:
+                pending  = self._pending.setdefault(room, [])
+                pending.append(payload)
+                schedule = len(pending) == 1
+
+        if schedule is None:
+            self.socketio.emit('message', payload, room=room, namespace=self.namespace)
+            socketio_emits.inc(event='message')
+        elif schedule:
+            self.socketio.start_background_task(self._flush, room)
+
+    def backlog(self, room='main', since=None):
+        """
+        Messages a client joining `room` has not seen yet.
+
+        Args:
+            room (str): Chat room
+            since (dict, optional): {'epoch': ..., 'seq': ...} of the last message the client has;
+                                    ignored when the room has been restarted since
+
+        Returns:
+            dict: Frame for the `history` event with the room, epoch and messages
+        """
+        since           = since if isinstance(since, dict) else {}
+        seq             = since.get('seq') if isinstance(since.get('seq'), int) else 0
+        epoch, messages = self.history.since(room, seq, since.get('epoch'))
+        return {'room': room, 'epoch': epoch, 'messages': messages}
+
+    def stats(self):
+        """Messages published, frames sent and messages buffered per room."""
+        with self._lock:
+            stats = {
+                'messages': self.messages,
+                'frames': self.frames,
+            }
+        stats['rooms'] = self.history.sizes()
+        return stats
+
+    def _flush(self, room):
+        self.socketio.sleep(self.flush_interval)
+        with self._lock:
+            batch = self._pending.pop(room, [])
+            self.frames += 1
+        if len(batch) == 1:
+            self.socketio.emit('message', batch[0], room=room, namespace=self.namespace)
+            socketio_emits.inc(event='message')
+        elif batch:
+            self.socketio.emit('messages', {'messages': batch}, room=room, namespace=self.namespace)
+            socketio_emits.inc(event='messages')
+
+#--------------------------------------------------
+# SHARED BROADCASTER
+#--------------------------------------------------
+_broadcaster      = None
+_broadcaster_lock = threading.Lock()
+
+def room_history(config):
+    """
+    Room history for the app: in Redis when Socket.IO relays through Redis (several workers), else in memory.
+
+    Args:
+        config: Application config
+
+    Returns:
+        RedisHistory or MemoryHistory
+    """
+    size      = config.get('CHAT_HISTORY_SIZE', 50)
+    max_rooms = config.get('CHAT_MAX_ROOMS', 100)
+    url       = config.get('SOCKETIO_MESSAGE_QUEUE') or ''
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+        return RedisHistory(redis.Redis.from_url(url), size=size, max_rooms=max_rooms)
+    return MemoryHistory(size=size, max_rooms=max_rooms)
+
+def get_room_broadcaster():
+    """Return the process-wide room broadcaster, creating it from the app config on first use."""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                from flask_app import socketio
+                _broadcaster = RoomBroadcaster(socketio, history=room_history(current_app.config),
+                                               flush_interval=current_app.config.get('CHAT_FLUSH_INTERVAL', 0))
+    return _broadcaster
@@ -0,0 +1,140 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from flask import current_app
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+class Flight:
+    """One call in progress, shared by its leader and every caller that joined it."""
+
+    def __init__(self, event_factory: Callable[[], Any] = threading.Event):
+        self.done       = event_factory()
+        self.result     = None
+        self.error      = None
+        self.followers  = 0
+        self._deltas    = []                 # partial output so far, replayed to late joiners
+        self._listeners = []
+        self._lock      = threading.Lock()
+
+    def subscribe(self, listener: Callable[[Any], None]):
+        """Send every partial output to `listener`, starting with the ones already published"""
+        with self._lock:
+            backlog = list(self._deltas)
+            self._listeners.append(listener)
+        for delta in backlog:
+            if not self._deliver(listener, delta):
+                return
+
+    def publish(self, delta: Any):
+        """Pass one partial output from the leader to every subscriber"""
+        with self._lock:
+            self._deltas.append(delta)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            self._deliver(listener, delta)
+
+    def _deliver(self, listener, delta) -> bool:
+        # A failing subscriber (e.g. a cancelled caller) is dropped without disturbing the others
+        try:
+            listener(delta)
+            return True
+        except Exception:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+            return False
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for it and receive the same result. Nothing is
+    remembered once the call returns, so this only deduplicates overlapping
+    calls and complements a cache rather than replacing one. If the leader
+    raises, its waiting followers retry, one of them becoming the new leader.
+    """
+
+    def __init__(self, name: str, event_factory: Callable[[], Any] = threading.Event):
+        """Initialize the group
+
+        Args:
+            name: Label used in stats()
+            event_factory: Builds the event followers wait on, e.g. socketio.server.eio.create_event;
+                           a threading.Event would block an unpatched eventlet hub
+        """
+        self.name          = name
+        self.event_factory = event_factory
+        self._flights      = {}
+        self._lock         = threading.Lock()
+        self.leaders       = 0
+        self.shared        = 0
+
+    def do(self, key: str, fn: Callable[[Flight], Any], listener: Optional[Callable[[Any], None]] = None) -> Tuple[Any, bool]:
+        """Run `fn` for `key`, or wait for the identical call already in flight
+
+        Args:
+            key: Identity of the call; equal keys must mean interchangeable results
+            fn: The call; receives the Flight so it can publish partial output
+            listener: Receives the partial output of whichever call answers (optional)
+
+        Returns:
+            Tuple of the result and whether it came from another caller's call
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = Flight(self.event_factory)
+                    self.leaders += 1
+                else:
+                    flight.followers += 1
+
+            if listener is not None:
+                flight.subscribe(listener)
+
+            if leader:
+                try:
+                    flight.result = fn(flight)
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                    flight.done.set()
+                return flight.result, False
+
+            flight.done.wait()
+            if flight.error is None:
+                with self._lock:
+                    self.shared += 1
+                return flight.result, True
+            logger.debug(f"In-flight call for {key[:12]} failed ({flight.error!r}); retrying")
+
+    def stats(self) -> Dict:
+        """Calls in flight now, calls run, and calls saved by joining one in flight"""
+        with self._lock:
+            return {'name': self.name, 'in_flight': len(self._flights), 'leaders': self.leaders, 'shared': self.shared}
+
+#--------------------------------------------------
+# SHARED GROUP
+#--------------------------------------------------
+_llm_flights      = None
+_llm_flights_lock = threading.Lock()
+
+def get_llm_flights() -> Optional[SingleFlight]:
+    """Return the process-wide group of in-flight LLM calls, or None when coalescing is disabled"""
+    global _llm_flights
+    if not current_app.config.get('OPENAI_SINGLE_FLIGHT'):
+        return None
+    if _llm_flights is None:
+        with _llm_flights_lock:
+            if _llm_flights is None:
+                from flask_app import socketio
+                _llm_flights = SingleFlight('llm', event_factory=socketio.server.eio.create_event)
+    return _llm_flights
@@ -1,6 +1,14 @@
 # Author: Prof. MM Ghassemi <ghassem3@msu.edu>
 import time
+import logging
+from flask import current_app, request
 from flask_socketio import emit, join_room, leave_room
+from .jobs import get_job_queue
+from .rooms import get_room_broadcaster, valid_room
+from .metrics import socketio_emits
+from .logs import get_logger, log
+
+logger = get_logger(__name__)
 
 def get_chat_style(role='owner'):
     """Get styling for chat messages based on role."""
@@ -11,7 +19,7 @@ def get_chat_style(role='owner'):
     else:  # guest or any other role
         return 'width: 100%;color:green;text-align: right'
 
-def process_and_emit_message(socketio, message, user_role='guest', room='main'):
+def process_and_emit_message(socketio, message, user_role='guest', room='main', message_id=None):
     """
     Centralized function to process and emit all chat messages.
     This ensures consistent logging and processing for all message types.
@@ -21,22 +29,77 @@ def process_and_emit_message(socketio, message, user_role='guest', room='main'):
         message: The message content
         user_role: User role for styling and frontend type ('ai', 'owner', 'guest', etc.)
         room: Chat room to emit to
+        message_id: Id of a streamed response this message completes (optional)
     """
     try:
-        print(f"""message: from {user_role} to `{room}` room 
-        message: {message}""")
+        log(logger, logging.DEBUG, "Chat message", sampled=True, role=user_role, room=room, chars=len(message))
         
         # Emit to frontend with both role and style for clarity
-        socketio.emit('message', {
+        payload = {
             'msg': message,
             'role': user_role,
             'style': get_chat_style(user_role)
-        }, room=room, namespace='/chat')
+        }
+        if message_id:
+            payload['id'] = message_id
+            payload['complete'] = True
+
+        # Sequence, remember for late joiners, and emit (coalesced with other messages when configured)
+        get_room_broadcaster().publish(payload, room)
         
     except Exception as e:
-        print(f"Error in process_and_emit_message: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log(logger, logging.ERROR, f"Error in process_and_emit_message: {str(e)}", exc_info=True, room=room)
+
+def emit_message_delta(socketio, delta, message_id, user_role='ai', room='main'):
+    """
+    Emit one chunk of a response that is still being generated.
+
+    Clients append deltas sharing a `message_id` to a single message; the
+    final `message` event with the same id carries the complete text.
+    
+    Args:
+        socketio: SocketIO instance
+        delta: The newly generated text
+        message_id: Id shared by every chunk of this response
+        user_role: User role for styling ('ai' for model output)
+        room: Chat room to emit to
+    """
+    try:
+        socketio.emit('message_delta', {
+            'id': message_id,
+            'delta': delta,
+            'role': user_role,
+            'style': get_chat_style(user_role)
+        }, room=room, namespace='/chat')
+        socketio_emits.inc(event='message_delta')
+
+        # Yield so the frame is flushed before the next chunk is read
+        socketio.sleep(0)
+
+    except Exception as e:
+        log(logger, logging.ERROR, f"Error in emit_message_delta: {str(e)}", room=room)
+
+def emit_chat_error(socketio, job_id, message_id, error, room='main'):
+    """
+    Tell a client that its queued AI request failed.
+    
+    Args:
+        socketio: SocketIO instance
+        job_id: Id of the failed background job
+        message_id: Id the response would have been emitted with
+        error: Description of the failure
+        room: Chat room (or Socket.IO session id) to emit to
+    """
+    try:
+        socketio.emit('chat_error', {
+            'job_id': job_id,
+            'id': message_id,
+            'error': error
+        }, room=room, namespace='/chat')
+        socketio_emits.inc(event='chat_error')
+
+    except Exception as e:
+        log(logger, logging.ERROR, f"Error in emit_chat_error: {str(e)}", job_id=job_id)
 
 def register_socket_events(socketio, db):
     """Register SocketIO event handlers and AI broadcasting."""
@@ -49,20 +112,36 @@ def register_socket_events(socketio, db):
     def joined(message={'room': 'main'}):
         """Handle user joining chat room."""
         room = message.get('room', 'main')
+        if not valid_room(room):
+            log(logger, logging.WARNING, "Refused to join invalid room", sampled=True, chars=len(str(room)))
+            return
         join_room(room)
 
+        # Replay what the client missed in one frame
+        emit('history', get_room_broadcaster().backlog(room, message.get('since')))
+        socketio_emits.inc(event='history')
+
+        # Resolve the sender's identity once so text events are served from the cache
+        db.get_identity()
+
+    @socketio.on('disconnect', namespace='/chat')
+    def disconnect():
+        """Cancel the AI requests a client queued once it can no longer receive the answer."""
+        if current_app.config.get('CHAT_ASYNC'):
+            get_job_queue().cancel_owned_by(request.sid)
+
     @socketio.on('text', namespace='/chat')
     def text(message={'msg': 'Hello', 'room': 'main'}):
         """Handle user text messages in chat."""
         try:
             room = message.get('room', 'main')
-            user_email = db.get_user_email()
-            user_role = db.get_user_role()
+            if not valid_room(room):
+                log(logger, logging.WARNING, "Dropped message to invalid room", sampled=True, chars=len(str(room)))
+                return
+            user_role = db.get_identity()['role']
             
             # Use centralized message processing
             process_and_emit_message(socketio, message.get('msg', ''), user_role, room)
         
         except Exception as e:
-            print(f"Error in text handler: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log(logger, logging.ERROR, f"Error in text handler: {str(e)}", exc_info=True)
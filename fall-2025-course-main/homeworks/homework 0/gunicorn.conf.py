@@ -0,0 +1,30 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+# Production server settings: `gunicorn -c gunicorn.conf.py app:app`
+import logging
+import os
+from flask_app.config import Config
+
+#--------------------------------------------------
+# WORKERS
+#--------------------------------------------------
+worker_class       = 'eventlet'
+workers            = Config.WEB_WORKERS
+worker_connections = Config.WEB_WORKER_CONNECTIONS
+timeout            = Config.WEB_TIMEOUT
+
+# Without a message queue a worker cannot reach clients connected to the others, so run one
+if workers > 1 and not Config.SOCKETIO_MESSAGE_QUEUE:
+    logging.getLogger('gunicorn.error').warning("SOCKETIO_MESSAGE_QUEUE is not set; running 1 worker instead of %s", workers)
+    workers = 1
+
+#--------------------------------------------------
+# NETWORK
+#--------------------------------------------------
+bind = f"{Config.FLASK_HOST}:{os.environ.get('PORT') or 8080}"
+
+#--------------------------------------------------
+# LOGGING
+#--------------------------------------------------
+accesslog = '-'
+errorlog  = '-'
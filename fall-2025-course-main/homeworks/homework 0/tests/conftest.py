@@ -0,0 +1,202 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#--------------------------------------------------
+# SUBPROCESS SCRIPTS
+#--------------------------------------------------
+def eventlet_importable():
+    """Whether eventlet is installed and imports in this interpreter."""
+    return subprocess.run([sys.executable, '-c', 'import eventlet'], capture_output=True).returncode == 0
+
+requires_eventlet = pytest.mark.skipif(not eventlet_importable(), reason="eventlet does not import in this interpreter")
+
+def run_script(script, env=None, timeout=60):
+    """
+    Run a Python script in a fresh interpreter from the app directory.
+
+    Green-thread tests need their own process, both to choose whether
+    eventlet monkey-patches and because a stalled hub cannot be interrupted
+    from inside; the timeout turns a stall into a test failure.
+
+    Args:
+        script (str): Source to run; its last line of output must be JSON
+        env (dict, optional): Extra environment variables
+        timeout (float): Seconds before the script is killed
+
+    Returns:
+        The decoded JSON printed last by the script
+    """
+    try:
+        completed = subprocess.run([sys.executable, '-c', textwrap.dedent(script)], cwd=APP_DIR, env=dict(os.environ, **(env or {})),
+                                   capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        pytest.fail(f"script did not finish within {timeout}s (stalled event loop?)")
+    assert completed.returncode == 0, completed.stderr[-3000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def wait_for(condition, timeout=5):
+    """Poll `condition` until it is true; fails the test after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail(f"condition not met within {timeout}s")
+        time.sleep(0.005)
+
+#--------------------------------------------------
+# LLM AND SOCKET.IO
+#--------------------------------------------------
+@pytest.fixture
+def fake_openai():
+    """The benchmarks' fake OpenAI-compatible API, answering fast; adjust `fake_openai.config` per test."""
+    from benchmarks.fake_openai import start_fake_openai
+    server = start_fake_openai(latency=0.01, token_latency=0.005, tokens=5)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def llm_app(fake_openai):
+    """A bare Flask app whose LLM client talks to the fake API, with the completion cache and coalescing off."""
+    from flask import Flask
+    from flask_app.config import Config
+
+    app = Flask('tests')
+    app.config.from_object(Config)
+    app.config.update(OPENAI_API_KEY='test', OPENAI_BASE_URL=fake_openai.base_url, OPENAI_CACHE_ENABLED=False,
+                      OPENAI_SINGLE_FLIGHT=False, OPENAI_MAX_RETRIES=0)
+    return app
+
+@pytest.fixture
+def emitted(monkeypatch):
+    """Record Socket.IO emits as (event, data, room) instead of sending them."""
+    from flask_app import socketio
+    events = []
+    monkeypatch.setattr(socketio, 'emit', lambda event, data, room=None, **kwargs: events.append((event, data, room)))
+    monkeypatch.setattr(socketio, 'sleep', lambda seconds=0: time.sleep(seconds))
+    return events
+
+@pytest.fixture
+def redis_url(tmp_path):
+    """
+    URL of a throwaway Redis server, for the multi-worker (message queue) paths.
+
+    Uses `redis-server` from PATH or the `redis-server` pip package; tests
+    that need it are skipped when neither exists.
+    """
+    binary = shutil.which('redis-server')
+    if binary is None:
+        binary = pytest.importorskip('redis_server', reason="needs redis-server or `pip install redis-server`").REDIS_SERVER_PATH
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen([binary, '--port', str(port), '--save', '', '--appendonly', 'no', '--dir', str(tmp_path)],
+                              stdout=subprocess.DEVNULL)
+    url = f'redis://127.0.0.1:{port}/0'
+    try:
+        import redis
+        client = redis.Redis.from_url(url)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                client.ping()
+                break
+            except redis.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        yield url
+    finally:
+        server.terminate()
+        server.wait()
+
+#--------------------------------------------------
+# DATABASE
+#--------------------------------------------------
+def count_statements(monkeypatch):
+    """Count every statement sent through a Transaction from now on."""
+    from flask_app.utils.database import Transaction
+    calls   = []
+    execute = Transaction._execute
+    def counted(self, cur, sql, parameters):
+        calls.append(str(sql))
+        return execute(self, cur, sql, parameters)
+    monkeypatch.setattr(Transaction, '_execute', counted)
+    return calls
+
+@pytest.fixture(scope='session')
+def postgres():
+    """
+    DATABASE_* settings of a throwaway PostgreSQL cluster shared by the whole session.
+
+    Uses the same cluster as the benchmarks (a local PostgreSQL install or the
+    `pgserver` pip package); tests that need it are skipped when neither exists.
+    """
+    from benchmarks.local_postgres import disposable_postgres, find_postgres_bin
+    if find_postgres_bin() is None:
+        pytest.importorskip('pgserver', reason="needs PostgreSQL server binaries or `pip install pgserver`")
+    with disposable_postgres() as settings:
+        yield settings
+
+@pytest.fixture
+def app(postgres, monkeypatch):
+    """
+    A bare Flask app configured for the test cluster, with a freshly migrated and seeded schema.
+
+    Idle pooled connections are closed afterwards, so session state a test
+    leaves behind (e.g. an advisory lock) cannot leak into the next one.
+    """
+    from flask import Flask
+    from flask_app.config import Config
+    from flask_app.utils.database import database
+
+    monkeypatch.chdir(APP_DIR)      # create_tables/, initial_data/ and migrations/ are found relative to it
+    app = Flask('tests')
+    app.config.from_object(Config)
+    app.config.update(postgres, DATABASE_PORT=int(postgres['DATABASE_PORT']), PASSWORD_HASH_WORKERS=0)
+    app.teardown_appcontext(database.release_connection)
+    with app.app_context():
+        database().resetDatabase(seed=True)
+    yield app
+    for pool in database._pools.values():
+        pool.closeall()
+
+@pytest.fixture(scope='session')
+def site(postgres):
+    """
+    The whole application from create_app(), on the test cluster, serving Socket.IO in threading mode.
+
+    Routes register on the first app created, so there is one per session;
+    tests reach it through `client`, which also resets the database.
+    """
+    from flask_app import create_app
+    from flask_app.config import Config
+    from flask_app.utils.readiness import get_readiness
+
+    settings = dict(postgres, DATABASE_PORT=int(postgres['DATABASE_PORT']), PASSWORD_HASH_WORKERS=0,
+                    SOCKETIO_ASYNC_MODE='threading', OPENAI_API_KEY='test', LOG_LEVEL='WARNING')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(APP_DIR)
+        for name, value in settings.items():
+            patch.setattr(Config, name, value, raising=False)
+        app = create_app()
+        app.testing = True
+        with app.app_context():
+            assert get_readiness().wait(60), get_readiness().error
+        yield app
+
+@pytest.fixture
+def client(site, app):
+    """Test client of the whole application, with the database freshly reset by `app`."""
+    return site.test_client()
+
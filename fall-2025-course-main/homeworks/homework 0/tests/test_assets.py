@@ -0,0 +1,52 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import gzip
+import os
+import pytest
+from flask_app.utils import assets
+from flask_app.utils.assets import get_asset_manifest
+from .conftest import APP_DIR
+
+SOURCE = os.path.join(APP_DIR, 'flask_app', 'static', 'js', 'chat-vue.js')
+
+@pytest.fixture
+def hashed(site):
+    with site.app_context():
+        return get_asset_manifest().hashed('js/chat-vue.js')
+
+def source():
+    with open(SOURCE, 'rb') as f:
+        return f.read()
+
+def test_fingerprinted_urls_are_immutable_and_plain_ones_revalidate(client, hashed):
+    assert hashed != 'js/chat-vue.js' and f'/static/{hashed}'.encode() in client.get('/').data
+
+    response = client.get(f'/static/{hashed}')
+    assert response.status_code == 200 and response.data == source()
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    plain = client.get('/static/js/chat-vue.js')
+    assert plain.status_code == 200 and plain.headers['Cache-Control'] == 'no-cache'
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_precompressed_variant_is_served_to_clients_that_accept_it(client, hashed, encoding):
+    if encoding == 'br' and assets.brotli is None:
+        pytest.skip("brotli is not installed")
+    response = client.get(f'/static/{hashed}', headers={'Accept-Encoding': f'{encoding}, deflate'})
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    decompress = assets.brotli.decompress if encoding == 'br' else gzip.decompress
+    assert decompress(response.data) == source()
+
+    identity = client.get(f'/static/{hashed}', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers and identity.data == source()
+    assert 'Accept-Encoding' in identity.headers['Vary']
+
+def test_stale_fingerprint_redirects_to_the_current_one(client, hashed):
+    response = client.get('/static/js/chat-vue.0123456789ab.js')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/static/{hashed}')
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    assert client.get('/static/js/missing.0123456789ab.js').status_code == 404
@@ -0,0 +1,21 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from .conftest import requires_eventlet, run_script
+
+@requires_eventlet
+def test_cli_commands_wait_for_the_bootstrap_without_blocking_eventlet(postgres):
+    # `flask db-migrate` creates the app, whose bootstrap runs as a green thread
+    # in a process that is not monkey-patched
+    result = run_script("""
+        import json
+        from flask_app import create_app
+
+        app    = create_app()
+        runner = app.test_cli_runner()
+        outputs = [runner.invoke(args=[command]) for command in ('db-migrate', 'db-reset', 'db-seed')]
+        print(json.dumps([[result.exit_code, result.output] for result in outputs]))
+    """, env=dict(postgres, PASSWORD_HASH_WORKERS='0'), timeout=60)
+    (migrate, reset, seed) = result
+    assert migrate == [0, "Applied 0 migration(s)\n"]
+    assert reset == [0, "Database reset\n"]
+    assert seed[0] == 0
@@ -0,0 +1,82 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import time
+import pytest
+from flask_app.utils import completion_cache
+from flask_app.utils.cache import LRUCache
+from flask_app.utils.completion_cache import CompletionCache
+from flask_app.utils.database import database
+from flask_app.utils.llm import ChatGPTClient, generate_ai_response
+
+def completion(text):
+    return {'response': text, 'usage': {'total_tokens': 3}, 'model': 'fake'}
+
+def test_hits_and_misses_are_counted_with_the_latency_saved():
+    cache = CompletionCache(LRUCache('completions', max_entries=10))
+    assert cache.get('k') is None
+
+    cache.put('k', completion('answer'), latency=1.5)
+    assert cache.get('k')['response'] == 'answer'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_ratio'], stats['saved_seconds']) == (1, 1, 0.5, 1.5)
+
+def test_entries_expire_after_the_ttl():
+    cache = CompletionCache(LRUCache('completions', ttl=0.05))
+    cache.put('k', completion('answer'), latency=1)
+    time.sleep(0.1)
+    assert cache.get('k') is None
+
+def test_least_recently_used_entries_are_evicted_by_count_and_by_size():
+    by_count = CompletionCache(LRUCache('completions', max_entries=2))
+    for key in ('a', 'b', 'c'):
+        by_count.put(key, completion(key), latency=1)
+    assert by_count.get('a') is None and by_count.get('c') is not None
+
+    by_size = CompletionCache(LRUCache('completions', max_bytes=10))
+    by_size.put('a', completion('x' * 6), latency=1)
+    by_size.put('b', completion('y' * 6), latency=1)
+    assert by_size.get('a') is None and by_size.get('b') is not None
+    by_size.put('c', completion('z' * 11), latency=1)       # larger than the whole cache: never stored
+    assert by_size.get('c') is None and by_size.get('b') is not None
+
+def test_database_tier_is_shared_and_promoted_into_memory(app):
+    with app.app_context():
+        db = database()
+        CompletionCache(LRUCache('worker-1'), db=db, ttl=60).put('f' * 64, completion('shared'), latency=2)
+
+        other = CompletionCache(LRUCache('worker-2'), db=db, ttl=60)
+        assert other.get('f' * 64)['response'] == 'shared'
+        assert other.stats()['db_hits'] == 1
+        assert other.memory.get('f' * 64) is not None
+
+        db.execute("UPDATE llm_cache SET created_at = created_at - interval '2 minutes'")
+        assert CompletionCache(LRUCache('worker-3'), db=db, ttl=60).get('f' * 64) is None
+
+@pytest.fixture
+def cached_app(llm_app, monkeypatch):
+    """llm_app with a fresh process-wide completion cache enabled."""
+    monkeypatch.setattr(completion_cache, '_completion_cache', None)
+    llm_app.config.update(OPENAI_CACHE_ENABLED=True, OPENAI_CACHE_DATABASE=False)
+    return llm_app
+
+def ask_twice(app, temperature):
+    with app.app_context():
+        client = ChatGPTClient(temperature=temperature)
+        return [generate_ai_response(client, 'What did you study?', [], 'Be brief.', room='resume') for _ in range(2)]
+
+def test_deterministic_requests_are_answered_from_the_cache(cached_app, fake_openai, emitted):
+    first, second = ask_twice(cached_app, temperature=0)
+    assert not first.get('cached') and second['cached']
+    assert second['response'] == first['response']
+    assert fake_openai.requests == 1
+
+def test_sampled_requests_bypass_the_cache(cached_app, fake_openai, emitted):
+    results = ask_twice(cached_app, temperature=0.7)
+    assert not any(result.get('cached') for result in results)
+    assert fake_openai.requests == 2
+
+def test_sampled_requests_are_cached_when_configured(cached_app, fake_openai, emitted):
+    cached_app.config['OPENAI_CACHE_ALL_TEMPERATURES'] = True
+    first, second = ask_twice(cached_app, temperature=0.7)
+    assert second['cached']
+    assert fake_openai.requests == 1
@@ -0,0 +1,36 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from flask_app.config import Config
+from flask_app.utils.context_builder import BM25Index, build_context, count_tokens, split_chunks
+
+FILLER   = 'The department hosts weekly seminars on many general topics for students.'
+RELEVANT = 'Mohammad taught the graduate course on reinforcement learning and robotics at Michigan State.'
+
+def page(filler_sentences=400, relevant_at=250):
+    sentences = [FILLER] * filler_sentences
+    sentences.insert(relevant_at, RELEVANT)
+    return ' '.join(sentences)
+
+def test_bm25_ranks_the_chunk_with_the_query_terms_first():
+    index  = BM25Index(split_chunks(page(), chunk_tokens=100))
+    scores = index.scores('Which course on reinforcement learning did he teach?')
+    best   = max(range(len(scores)), key=scores.__getitem__)
+    assert RELEVANT in index.chunks[best]
+    assert sorted(scores, reverse=True)[1] < scores[best]
+
+def test_context_stays_within_the_configured_budget_and_keeps_the_relevant_chunk():
+    budget = Config.OPENAI_CONTEXT_BUDGET
+    index  = BM25Index(split_chunks(page(), chunk_tokens=Config.OPENAI_CONTEXT_CHUNK_TOKENS))
+    assert sum(index.tokens) > budget
+
+    context, stats = build_context(index, 'reinforcement learning robotics', budget)
+    assert stats['context_tokens'] <= budget
+    assert count_tokens(context) <= budget + stats['chunks_used']   # joining spaces and '...' gap markers
+    assert RELEVANT in context
+    assert stats['chunks_used'] < stats['chunks_total'] and stats['truncation_ratio'] > 0
+
+def test_a_page_under_budget_is_kept_whole_in_order():
+    index          = BM25Index(split_chunks(page(filler_sentences=5, relevant_at=2), chunk_tokens=20))
+    context, stats = build_context(index, 'unrelated query', budget_tokens=10000)
+    assert context == ' '.join(index.chunks)
+    assert stats['truncation_ratio'] == 0.0
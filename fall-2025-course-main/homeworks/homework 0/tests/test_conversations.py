@@ -0,0 +1,68 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from flask_app.utils.cache import LRUCache
+from flask_app.utils.conversations import ConversationStore
+from flask_app.utils.database import database
+
+def messages(*texts):
+    return [{'role': 'user' if i % 2 == 0 else 'assistant', 'content': text} for i, text in enumerate(texts)]
+
+def test_append_replaces_the_cached_tail(app):
+    with app.app_context():
+        store = ConversationStore(database(), LRUCache('conversations'), window=3)
+        store.append('c1', messages('one', 'two'))
+        assert [m['content'] for m in store.recent('c1', 3)] == ['one', 'two']
+
+        store.append('c1', messages('three', 'four'))
+        assert [m['content'] for m in store.recent('c1', 3)] == ['two', 'three', 'four']
+
+def test_tail_read_while_an_append_lands_is_not_cached(app, monkeypatch):
+    with app.app_context():
+        db    = database()
+        store = ConversationStore(db, LRUCache('conversations'), window=3)
+        store.append('c1', messages('one'))
+
+        # The read sees the table as it was; an append commits before the read returns
+        fetch_all = db.fetch_all
+        def racing_fetch_all(sql, parameters=None):
+            rows = fetch_all(sql, parameters)
+            monkeypatch.setattr(db, 'fetch_all', fetch_all)
+            store.append('c1', messages('two'))
+            return rows
+        monkeypatch.setattr(db, 'fetch_all', racing_fetch_all)
+
+        assert [m['content'] for m in store.recent('c1', 3)] == ['one']
+        assert 'c1' not in store.cache
+        assert [m['content'] for m in store.recent('c1', 3)] == ['one', 'two']
+
+def test_pages_walk_back_with_the_before_cursor(app):
+    with app.app_context():
+        store = ConversationStore(database(), LRUCache('conversations'))
+        store.append('c1', messages(*(f'm{i}' for i in range(7))))
+
+        pages, before = [], None
+        while True:
+            page = store.page('c1', before=before, limit=3)
+            pages.append([m['content'] for m in page['messages']])
+            before = page['before']
+            if before is None:
+                break
+
+    assert pages == [['m4', 'm5', 'm6'], ['m1', 'm2', 'm3'], ['m0']]
+
+def test_legacy_cookie_history_moves_into_a_conversation(client, app):
+    with client.session_transaction() as session:
+        session['chat_history'] = messages('old question', 'old answer')
+
+    page = client.get('/chat/history?limit=1').get_json()
+    assert [m['content'] for m in page['messages']] == ['old answer']
+    assert page['before'] is not None
+    older = client.get(f"/chat/history?before={page['before']}").get_json()
+    assert [m['content'] for m in older['messages']] == ['old question'] and older['before'] is None
+
+    with client.session_transaction() as session:
+        assert 'chat_history' not in session
+        conversation_id = session['conversation_id']
+    with app.app_context():
+        assert database().fetch_one("SELECT count(*) AS n FROM conversation_messages WHERE conversation_id = %s",
+                                    [conversation_id])['n'] == 2
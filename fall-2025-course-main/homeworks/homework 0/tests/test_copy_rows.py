@@ -0,0 +1,47 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import csv
+import io
+from flask_app.utils.database import database
+
+COLUMNS = ['inst_id', 'type', 'name', 'department', 'address', 'city']
+
+# Values COPY's CSV parsing could get wrong; None is SQL NULL
+AWKWARD = [
+    ['Academia', 'Smith, Jones & Co', 'He said "hi"', 'line one\nline two', ''],
+    ['Industry', 'Back\\slash', None, '', 'NULL in text'],
+    ['Other', ' padded ', '""', ',', None],
+]
+
+def as_csv(rows, first_id):
+    """The rows as a CSV file the way initial_data stores them, NULL spelled out."""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    for offset, row in enumerate(rows):
+        writer.writerow([first_id + offset] + ['NULL' if value is None else value for value in row])
+    out.seek(0)
+    return out
+
+def loaded(db, first_id):
+    rows = db.fetch_all("SELECT * FROM institutions WHERE inst_id >= %s AND inst_id < %s ORDER BY inst_id",
+                        [first_id, first_id + 100])
+    return [[row[column] for column in COLUMNS[1:]] for row in rows]
+
+def test_copy_loads_awkward_values_like_insert_rows(app):
+    with app.app_context():
+        db = database()
+        db.insertRows('institutions', COLUMNS, [[100 + offset] + row for offset, row in enumerate(AWKWARD)])
+        assert db.copyRows('institutions', as_csv(AWKWARD, 200)) == 3
+        assert db.copyRows('institutions', as_csv(AWKWARD, 300), transforms={'city': str.upper}) == 3
+
+        assert loaded(db, 100) == AWKWARD
+        assert loaded(db, 200) == AWKWARD
+        assert loaded(db, 300) == [row[:-1] + [row[-1].upper() if row[-1] else row[-1]] for row in AWKWARD]
+
+def test_quoted_null_is_loaded_as_null(app):
+    with app.app_context():
+        db = database()
+        db.copyRows('institutions', io.StringIO('inst_id,type,name,department,city\n400,Academia,Quoted,"NULL",NULL\n'))
+        row = db.fetch_one("SELECT department, city FROM institutions WHERE inst_id = 400")
+    assert row == {'department': None, 'city': None}
@@ -0,0 +1,32 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+from flask_app.utils.cache import identity_cache
+from .conftest import count_statements
+
+def log_in(client, email='owner@email.com', password='password'):
+    response = client.post('/processlogin', json={'email': email, 'password': password})
+    assert json.loads(response.data)['success'] == 1   # the route returns json.dumps() text
+    with client.session_transaction() as session:
+        return session['email']
+
+def test_repeat_requests_of_a_session_run_no_identity_queries(client, monkeypatch):
+    log_in(client)
+    identity_cache.clear()
+    calls = count_statements(monkeypatch)
+
+    assert b'owner@email.com' in client.get('/').data
+    assert len(calls) == 1          # the role lookup, once for the session
+
+    calls.clear()
+    assert b'owner@email.com' in client.get('/').data
+    assert calls == []
+
+def test_logout_evicts_the_cached_identity(client):
+    token = log_in(client)
+    assert identity_cache.get(token) == {'email': 'owner@email.com', 'role': 'owner'}
+
+    client.get('/logout')
+    assert identity_cache.get(token) is None
+    with client.session_transaction() as session:
+        assert 'email' not in session
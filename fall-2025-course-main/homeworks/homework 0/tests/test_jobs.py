@@ -0,0 +1,61 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+from benchmarks.local_postgres import free_port
+from flask_app.utils import llm
+from flask_app.utils.jobs import JobQueue
+from .conftest import requires_eventlet, run_script, wait_for
+
+@requires_eventlet
+def test_idle_workers_do_not_stall_an_unpatched_eventlet_hub():
+    # `python app.py` serves with eventlet but never monkey-patches
+    result = run_script("""
+        import json, time
+        import eventlet
+        from flask import Flask
+        from flask_socketio import SocketIO
+        from flask_app.utils.jobs import JobQueue
+
+        sio  = SocketIO(Flask('test'), async_mode='eventlet')
+        jobs = JobQueue(sio.start_background_task, workers=2, queue_factory=sio.server.eio.create_queue)
+
+        gaps = []
+        def ticker():
+            last = time.monotonic()
+            for _ in range(20):
+                eventlet.sleep(0.02)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        def submit_later():
+            eventlet.sleep(0.1)
+            return jobs.submit(lambda job: 'answer')
+
+        tick = eventlet.spawn(ticker)
+        job  = eventlet.spawn(submit_later).wait()
+        tick.wait()
+        eventlet.sleep(0.05)
+        print(json.dumps({'status': job.status, 'result': job.result, 'max_gap': max(gaps)}))
+    """, timeout=30)
+    assert result['status'] == 'done' and result['result'] == 'answer'
+    assert result['max_gap'] < 0.2
+
+def test_failed_llm_call_is_reported_to_the_client(app, emitted, monkeypatch):
+    # Nothing listens on the upstream port, so the call fails without raising
+    app.config.update(OPENAI_API_KEY='test', OPENAI_BASE_URL=f"http://127.0.0.1:{free_port()}/v1", OPENAI_MAX_RETRIES=0,
+                      OPENAI_CACHE_ENABLED=False, OPENAI_SINGLE_FLIGHT=False)
+    jobs = JobQueue(lambda fn: threading.Thread(target=fn, daemon=True).start(), workers=1)
+    monkeypatch.setattr(llm, 'get_job_queue', lambda: jobs)
+
+    with app.test_request_context('/chat/ai', method='POST'):
+        response, status = llm.enqueue_ai_chat_request(llm.ChatGPTClient(), 'Hello?', owner='sid-1')
+    queued = response.get_json()
+    assert status == 202
+
+    job = jobs.get(queued['job_id'])
+    wait_for(lambda: job.finished_at is not None)
+    assert job.result['success'] is False
+    (error,) = [data for event, data, room in emitted if event == 'chat_error' and room == 'sid-1']
+    assert error['id'] == queued['message_id'] and error['job_id'] == job.id
+    assert [event for event, _, _ in emitted if event == 'message'] == []
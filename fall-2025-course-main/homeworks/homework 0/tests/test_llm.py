@@ -0,0 +1,56 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import pytest
+from benchmarks.local_postgres import free_port
+from flask_app import socketio
+from flask_app.utils.llm import ChatGPTClient
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays passed to socketio.sleep, recorded instead of slept."""
+    delays = []
+    monkeypatch.setattr(socketio, 'sleep', delays.append)
+    return delays
+
+def ask(app, **config):
+    app.config.update(config)
+    with app.app_context():
+        return ChatGPTClient().send_message('What did you study?')
+
+def test_server_error_is_retried_after_a_backoff(llm_app, fake_openai, sleeps):
+    fake_openai.config['failures'] = [503]
+    result = ask(llm_app, OPENAI_MAX_RETRIES=2, OPENAI_RETRY_BACKOFF=0.5)
+
+    assert result['success'] and result['response'] == 'token0 token1 token2 token3 token4'
+    assert fake_openai.requests == 2
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= 0.5
+
+def test_rate_limit_waits_as_long_as_retry_after_says(llm_app, fake_openai, sleeps):
+    fake_openai.config.update(failures=[429], retry_after=3)
+    result = ask(llm_app, OPENAI_MAX_RETRIES=2)
+
+    assert result['success']
+    assert sleeps == [3.0]
+
+def test_client_error_is_not_retried(llm_app, fake_openai, sleeps):
+    fake_openai.config['failures'] = [400]
+    result = ask(llm_app, OPENAI_MAX_RETRIES=2)
+
+    assert not result['success'] and '400' in result['error']
+    assert fake_openai.requests == 1
+    assert sleeps == []
+
+def test_retries_stop_after_max_retries(llm_app, fake_openai, sleeps):
+    fake_openai.config['failures'] = [503, 503, 503]
+    result = ask(llm_app, OPENAI_MAX_RETRIES=1, OPENAI_RETRY_BACKOFF=0.5)
+
+    assert not result['success'] and '503' in result['error']
+    assert fake_openai.requests == 2
+    assert len(sleeps) == 1
+
+def test_connection_error_is_retried(llm_app, sleeps):
+    result = ask(llm_app, OPENAI_BASE_URL=f"http://127.0.0.1:{free_port()}/v1", OPENAI_MAX_RETRIES=2, OPENAI_RETRY_BACKOFF=0.5)
+
+    assert not result['success']
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
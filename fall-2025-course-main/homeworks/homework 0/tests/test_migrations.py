@@ -0,0 +1,40 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from flask_app.utils.database import SCHEMA_LOCK_ID, database
+
+def schema_locks(db):
+    return db.fetch_one("SELECT COUNT(*) AS held FROM pg_locks WHERE locktype = 'advisory' AND objid = %s",
+                        [SCHEMA_LOCK_ID])['held']
+
+def test_migrate_releases_the_schema_lock_outside_an_app_context(app, monkeypatch):
+    with app.app_context():
+        db = database()
+        db.execute("DELETE FROM schema_version WHERE version = (SELECT MAX(version) FROM schema_version)")
+
+    # Other pool users reorder the idle connections while the migration runs
+    apply = database.applyMigration
+    def with_busy_pool(self, *args):
+        first, second = self.pool.getconn(), self.pool.getconn()
+        self.pool.putconn(first)
+        self.pool.putconn(second)
+        return apply(self, *args)
+    monkeypatch.setattr(database, 'applyMigration', with_busy_pool)
+
+    assert db.migrate() == 1
+    assert schema_locks(db) == 0
+    assert db.migrate() == 0
+
+def test_failed_migration_releases_the_schema_lock(app, monkeypatch):
+    with app.app_context():
+        db = database()
+        db.execute("DELETE FROM schema_version WHERE version = (SELECT MAX(version) FROM schema_version)")
+
+    def broken(self, *args):
+        raise RuntimeError("migration failed")
+    monkeypatch.setattr(database, 'applyMigration', broken)
+
+    try:
+        db.migrate()
+    except RuntimeError:
+        pass
+    assert schema_locks(db) == 0
@@ -0,0 +1,57 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+import re
+import pytest
+from flask_app.config import Config
+from flask_app.utils import database as database_module
+from flask_app.utils.database import database
+from flask_app.utils.passwords import HasherBusy, PasswordHasher, scrypt_hex
+
+SALTED = re.compile(r'scrypt\$(\d+)\$(\d+)\$(\d+)\$([0-9a-f]{32})\$([0-9a-f]+)')
+
+def stored_password(app, email):
+    with app.app_context():
+        return database().fetch_one("SELECT password FROM users WHERE email = %s", [email])['password']
+
+def log_in(client, email='owner@email.com', password='password'):
+    response = client.post('/processlogin', json={'email': email, 'password': password})
+    return response.status_code, json.loads(response.data)
+
+def test_each_user_gets_its_own_salt_and_records_the_cost(app):
+    owner, guest = stored_password(app, 'owner@email.com'), stored_password(app, 'guest@email.com')
+    owner_parts, guest_parts = SALTED.fullmatch(owner).groups(), SALTED.fullmatch(guest).groups()
+
+    cost = tuple(str(value) for value in (Config.ENCRYPTION_ONEWAY_N, Config.ENCRYPTION_ONEWAY_R, Config.ENCRYPTION_ONEWAY_P))
+    assert owner_parts[:3] == guest_parts[:3] == cost
+    assert owner_parts[3] != guest_parts[3]         # same password, different salts...
+    assert owner_parts[4] != guest_parts[4]         # ...so different digests
+
+def test_legacy_global_salt_hash_verifies_and_is_rewritten_on_login(client, app):
+    legacy = scrypt_hex('password', Config.ENCRYPTION_ONEWAY_SALT.encode(), Config.ENCRYPTION_ONEWAY_LEGACY_N,
+                        Config.ENCRYPTION_ONEWAY_LEGACY_R, Config.ENCRYPTION_ONEWAY_LEGACY_P)
+    with app.app_context():
+        database().execute("UPDATE users SET password = %s WHERE email = %s", [legacy, 'owner@email.com'])
+
+    assert log_in(client) == (200, {'success': 1})
+    upgraded = stored_password(app, 'owner@email.com')
+    assert SALTED.fullmatch(upgraded)
+    assert log_in(client) == (200, {'success': 1})
+    assert stored_password(app, 'owner@email.com') == upgraded      # already current: not rewritten again
+
+def test_wrong_password_is_rejected_and_leaves_the_hash_alone(client, app):
+    before = stored_password(app, 'owner@email.com')
+    assert log_in(client, password='not the password') == (200, {'success': 0})
+    assert log_in(client, email='nobody@email.com') == (200, {'success': 0})
+    assert stored_password(app, 'owner@email.com') == before
+
+def test_full_hash_queue_raises_hasher_busy():
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    with pytest.raises(HasherBusy):
+        hasher.hash('password')
+    assert hasher.pending == 0
+
+def test_login_answers_503_while_the_hash_queue_is_full(client, monkeypatch):
+    monkeypatch.setattr(database_module, 'get_password_hasher', lambda: PasswordHasher(workers=1, max_pending=0))
+    status, body = log_in(client)
+    assert status == 503 and body['success'] == 0
@@ -0,0 +1,77 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import json
+from .conftest import requires_eventlet, run_script
+
+# Shared by the scripts below: an unpatched eventlet process (as `python app.py` runs)
+# with a cooperative one-connection pool on the test cluster
+SETUP = """
+    import json, os, time
+    import eventlet
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from flask_app.utils.pool import ConnectionPool, make_cooperative
+
+    settings = json.loads(os.environ['TEST_DATABASE'])
+    app      = Flask('test')
+    sio      = SocketIO(app, async_mode='eventlet')
+    assert make_cooperative()
+    pool     = ConnectionPool(minconn=0, maxconn=1, timeout=10, host=settings['DATABASE_HOST'],
+                              port=int(settings['DATABASE_PORT']), user=settings['DATABASE_USER'],
+                              password=settings['DATABASE_PASSWORD'], database=settings['DATABASE_NAME'])
+
+    def query(sql):
+        cnx = pool.getconn()
+        try:
+            cur = cnx.cursor()
+            cur.execute(sql)
+            return cur.fetchone()[0]
+        finally:
+            pool.putconn(cnx)
+"""
+
+def run(postgres, body):
+    return run_script(SETUP + body, env={'TEST_DATABASE': json.dumps(postgres)}, timeout=60)
+
+@requires_eventlet
+def test_slow_query_does_not_delay_socketio_delivery(postgres):
+    result = run(postgres, """
+    client  = sio.test_client(app)
+    started = time.monotonic()
+
+    def deliver():
+        eventlet.sleep(0.1)
+        sio.emit('message', {'msg': 'hello'})
+        return time.monotonic() - started
+
+    slow      = eventlet.spawn(query, 'SELECT pg_sleep(1)')
+    eventlet.sleep(0.01)
+    queued    = eventlet.spawn(query, 'SELECT 2')            # waits for the only connection
+    delivered = eventlet.spawn(deliver).wait()
+    received  = [event['name'] for event in client.get_received()]
+    slow.wait()
+    print(json.dumps({'delivered': delivered, 'received': received, 'queued': queued.wait(),
+                      'finished': time.monotonic() - started}))
+    """)
+    assert result['received'] == ['message']
+    assert result['delivered'] < 0.5                  # not after the 1s query
+    assert result['queued'] == 2 and result['finished'] < 5
+
+@requires_eventlet
+def test_interrupted_query_is_cancelled_and_the_interruption_propagates(postgres):
+    result = run(postgres, """
+    started = time.monotonic()
+    try:
+        with eventlet.Timeout(0.2):
+            query('SELECT pg_sleep(5)')
+        outcome = 'finished'
+    except eventlet.Timeout:
+        outcome = 'timeout'
+    except Exception as e:
+        outcome = type(e).__name__
+    elapsed = time.monotonic() - started
+    print(json.dumps({'outcome': outcome, 'elapsed': elapsed, 'next': query('SELECT 3')}))
+    """)
+    assert result['outcome'] == 'timeout'
+    assert result['elapsed'] < 2
+    assert result['next'] == 3
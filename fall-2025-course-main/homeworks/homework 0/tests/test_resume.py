@@ -0,0 +1,95 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import io
+from benchmarks.datagen import generate
+from flask_app.utils.database import database, get_database
+from .conftest import count_statements
+
+def test_resume_tree_costs_one_query_per_level_however_large(app, monkeypatch):
+    with app.app_context():
+        db = get_database()
+        generate(db, institutions=6, positions=30, experiences=120, skills=400)
+        calls = count_statements(monkeypatch)
+        data  = db.getResumeData()
+
+    assert len(calls) == 4
+    assert len(data) == 6
+    assert sum(len(institution['positions']) for institution in data.values()) == 30
+    experiences = [e for institution in data.values() for p in institution['positions'].values() for e in p['experiences'].values()]
+    assert len(experiences) == 120
+    assert sum(len(e['skills']) for e in experiences) == 400
+
+def test_matching_etag_is_answered_with_304(client):
+    first = client.get('/api/resume')
+    assert first.status_code == 200 and first.headers['ETag']
+
+    again = client.get('/api/resume', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+def test_inserted_rows_change_the_etag(client, app):
+    etag = client.get('/api/resume').headers['ETag']
+    with app.app_context():
+        database().insertRows('institutions', ['inst_id', 'type', 'name'], [[100, 'Academia', 'Inserted University']])
+
+    response = client.get('/api/resume', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert b'Inserted University' in response.data
+
+def test_copied_rows_change_the_etag(client, app):
+    etag = client.get('/api/resume').headers['ETag']
+    with app.app_context():
+        database().copyRows('institutions', io.StringIO('inst_id,type,name\n101,Academia,Copied College\n'))
+
+    response = client.get('/api/resume', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert b'Copied College' in response.data
+
+def positions(page):
+    return [int(position_id) for institution in page['data'].values() for position_id in institution['positions']]
+
+def test_unrecognised_query_parameters_return_the_whole_tree(client):
+    whole = client.get('/api/resume')
+    busted = client.get('/api/resume?v=123')
+    assert busted.status_code == 200 and busted.headers['ETag'] == whole.headers['ETag']
+    assert busted.data == whole.data
+
+def test_page_filters(client):
+    assert sorted(client.get('/api/resume?type=Academia').get_json()['data']) == ['1']
+    assert sorted(client.get('/api/resume?institution=2&institution=3').get_json()['data']) == ['2', '3']
+    assert sorted(positions(client.get('/api/resume?from=2021-06').get_json())) == [1, 2, 3]
+    assert positions(client.get('/api/resume?to=2018-12').get_json()) == []
+
+    page   = client.get('/api/resume?position=1&min_skill=9').get_json()
+    skills = {skill['name'] for experience in page['data'].values() for skill in experience['skills'].values()}
+    assert skills == {'Python', 'HTML'}
+
+def test_cursor_walks_every_position_once_newest_first(client):
+    seen, cursor = [], None
+    while True:
+        page = client.get('/api/resume', query_string={'limit': 1, **({'cursor': cursor} if cursor else {})}).get_json()
+        seen.extend(positions(page))
+        cursor = page['next']
+        if cursor is None:
+            break
+    assert seen == [3, 4, 2, 1]
+
+def test_position_experiences_continue_from_the_tree_cursor(client):
+    tree     = client.get('/api/resume?institution=1&experiences=1').get_json()
+    position = tree['data']['1']['positions']['1']
+    assert list(position['experiences']) == ['6']
+
+    rest = client.get('/api/resume', query_string={'position': 1, 'cursor': position['experiences_next']}).get_json()
+    assert sorted(rest['data']) == ['1', '2'] and rest['next'] is None
+
+def test_invalid_cursor_is_a_400(client):
+    for cursor in ('not-a-cursor', 'WyJub3QgYSBkYXRlIiwgMV0', 'e30'):     # garbage, ["not a date", 1], {}
+        response = client.get('/api/resume', query_string={'cursor': cursor})
+        assert response.status_code == 400 and response.get_json()['error'] == "Invalid cursor"
+
+def test_page_after_the_last_position_is_empty_with_no_next(client):
+    from flask_app.routes import encode_cursor
+    page = client.get('/api/resume', query_string={'cursor': encode_cursor(['2019-01-01', 1])}).get_json()
+    assert page == {'success': True, 'data': {}, 'next': None}
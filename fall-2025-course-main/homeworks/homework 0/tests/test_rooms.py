@@ -0,0 +1,72 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import pytest
+from flask_app.utils.rooms import MemoryHistory, RedisHistory, RoomBroadcaster, valid_room
+
+class Emits:
+    """Stands in for the SocketIO instance, recording what the broadcaster emits."""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, data, room=None, namespace=None):
+        self.events.append((event, data, room))
+
+@pytest.fixture(params=['memory', 'redis'])
+def make_history(request):
+    """Build room histories of either kind; Redis ones built by one test share a server, like two workers."""
+    if request.param == 'memory':
+        shared = MemoryHistory(size=3, max_rooms=2)
+        return lambda: shared
+    import redis
+    url = request.getfixturevalue('redis_url')
+    return lambda: RedisHistory(redis.Redis.from_url(url), size=3, max_rooms=2)
+
+def test_room_names_are_short_and_printable():
+    assert valid_room('main') and valid_room('team-7_b')
+    assert not valid_room('') and not valid_room('a' * 65)
+    assert not valid_room('main room') and not valid_room('<script>') and not valid_room(['main'])
+
+def test_messages_are_numbered_per_room_and_replayed_after_the_last_seen(make_history):
+    broadcaster = RoomBroadcaster(Emits(), history=make_history())
+    for text in ('a', 'b', 'c', 'd'):
+        broadcaster.publish({'msg': text}, 'main')
+    broadcaster.publish({'msg': 'x'}, 'other')
+
+    frame = broadcaster.backlog('main')
+    assert [m['seq'] for m in frame['messages']] == [2, 3, 4]            # ring buffer of 3
+    since = broadcaster.backlog('main', {'epoch': frame['epoch'], 'seq': 3})
+    assert [m['msg'] for m in since['messages']] == ['d']
+    assert broadcaster.backlog('other')['messages'][0]['seq'] == 1
+
+def test_workers_sharing_a_history_agree_on_sequence_numbers(make_history):
+    first, second = RoomBroadcaster(Emits(), history=make_history()), RoomBroadcaster(Emits(), history=make_history())
+    first.publish({'msg': 'a'}, 'main')
+    second.publish({'msg': 'b'}, 'main')
+    first.publish({'msg': 'c'}, 'main')
+    emitted = [data for emits in (first.socketio, second.socketio) for _, data, _ in emits.events]
+
+    assert sorted(payload['seq'] for payload in emitted) == [1, 2, 3]
+    assert len({payload['epoch'] for payload in emitted}) == 1
+    assert [m['msg'] for m in second.backlog('main')['messages']] == ['a', 'b', 'c']
+
+def test_least_recently_used_room_is_forgotten_and_restarts_with_a_new_epoch(make_history):
+    broadcaster = RoomBroadcaster(Emits(), history=make_history())
+    broadcaster.publish({'msg': 'a'}, 'one')
+    old = broadcaster.backlog('one')['epoch']
+    broadcaster.publish({'msg': 'b'}, 'two')
+    broadcaster.publish({'msg': 'c'}, 'three')
+
+    assert set(broadcaster.stats()['rooms']) == {'two', 'three'}
+    assert broadcaster.backlog('one') == {'room': 'one', 'epoch': None, 'messages': []}
+
+    broadcaster.publish({'msg': 'd'}, 'one')
+    frame = broadcaster.backlog('one', {'epoch': old, 'seq': 1})
+    assert frame['epoch'] != old and [m['msg'] for m in frame['messages']] == ['d']
+
+def test_malformed_since_replays_everything(make_history):
+    broadcaster = RoomBroadcaster(Emits(), history=make_history())
+    broadcaster.publish({'msg': 'a'}, 'main')
+
+    assert len(broadcaster.backlog('main', {'seq': 'x'})['messages']) == 1
+    assert len(broadcaster.backlog('main', ['not', 'a', 'dict'])['messages']) == 1
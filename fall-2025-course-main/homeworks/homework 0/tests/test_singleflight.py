@@ -0,0 +1,33 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from .conftest import requires_eventlet, run_script
+
+@requires_eventlet
+def test_identical_calls_share_one_upstream_call_on_an_unpatched_eventlet_hub():
+    # `python app.py` serves with eventlet but never monkey-patches; a follower
+    # waiting on a threading.Event would block the hub and the leader with it
+    result = run_script("""
+        import json
+        import eventlet
+        from flask import Flask
+        from flask_socketio import SocketIO
+        from flask_app.utils.singleflight import SingleFlight
+
+        sio     = SocketIO(Flask('test'), async_mode='eventlet')
+        flights = SingleFlight('llm', event_factory=sio.server.eio.create_event)
+        calls   = []
+
+        def call(flight):
+            calls.append(1)
+            eventlet.sleep(0.2)             # the upstream request
+            return 'answer'
+
+        first  = eventlet.spawn(flights.do, 'same-prompt', call)
+        eventlet.sleep(0.05)
+        second = eventlet.spawn(flights.do, 'same-prompt', call)
+        results = [first.wait(), second.wait()]
+        print(json.dumps({'results': results, 'calls': len(calls), 'stats': flights.stats()}))
+    """, timeout=30)
+    assert result['results'] == [['answer', False], ['answer', True]]
+    assert result['calls'] == 1
+    assert result['stats']['shared'] == 1 and result['stats']['in_flight'] == 0
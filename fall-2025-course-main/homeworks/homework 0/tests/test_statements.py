@@ -0,0 +1,58 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import pytest
+from flask import g
+from flask_app.utils.database import USER_ROLE, database
+
+def server_prepared(cnx):
+    with cnx.cursor() as cur:
+        cur.execute("SELECT name FROM pg_prepared_statements")
+        names = {row[0] for row in cur.fetchall()}
+    cnx.rollback()
+    return names
+
+def open_cursors(tx):
+    return tx.fetch_one("SELECT count(*) AS n FROM pg_cursors")['n']
+
+def test_prepared_statements_survive_a_return_to_the_pool(app):
+    with app.app_context():
+        db = database()
+    db.pool.closeall()
+
+    assert db.fetch_one(USER_ROLE, ['owner@email.com'])['role'] == 'owner'
+    with db.connection() as cnx:
+        assert cnx.prepared == {'user_role'} and server_prepared(cnx) == {'user_role'}
+
+    # Same pooled connection: executed by name, not prepared again (a second PREPARE would fail)
+    assert db.fetch_one(USER_ROLE, ['guest@email.com'])['role'] == 'guest'
+    with db.connection() as again:
+        assert again is cnx and server_prepared(again) == {'user_role'}
+
+def test_connection_discarded_after_an_error_takes_its_prepared_names_with_it(app):
+    with pytest.raises(RuntimeError):
+        with app.app_context():
+            database().fetch_one(USER_ROLE, ['owner@email.com'])
+            failed = g._db_connection
+            raise RuntimeError("request failed")
+    assert failed.closed
+
+    with app.app_context():
+        assert database().fetch_one(USER_ROLE, ['owner@email.com'])['role'] == 'owner'
+        fresh = g._db_connection
+        assert fresh is not failed and fresh.prepared == {'user_role'} and server_prepared(fresh) == {'user_role'}
+
+def test_stream_closes_its_cursor_when_the_consumer_stops_early(app):
+    with app.app_context():
+        db = database()
+        with db.transaction() as tx:
+            rows = tx.stream("SELECT generate_series(1, 10000) AS n", batch_size=100)
+            assert next(rows)['n'] == 1
+            assert open_cursors(tx) == 1
+            rows.close()
+            assert open_cursors(tx) == 0
+
+        rows = db.stream("SELECT generate_series(1, 10000) AS n", batch_size=100)
+        assert [row['n'] for _, row in zip(range(3), rows)] == [1, 2, 3]
+        rows.close()
+        with db.transaction() as tx:
+            assert open_cursors(tx) == 0
@@ -0,0 +1,58 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+import threading
+from flask_app.utils.jobs import JobQueue
+from flask_app.utils.llm import ChatGPTClient, generate_ai_response
+from .conftest import wait_for
+
+def ask(app, stream=True, **kwargs):
+    with app.app_context():
+        return generate_ai_response(ChatGPTClient(), 'What did you study?', [], 'Be brief.', room='resume', use_cache=False,
+                                    message_id='m1' if stream else None, stream=stream, **kwargs)
+
+def of(emitted, event):
+    return [data for name, data, room in emitted if name == event]
+
+def test_deltas_reach_the_room_before_the_complete_message(llm_app, emitted):
+    result = ask(llm_app)
+
+    assert [name for name, _, _ in emitted] == ['message_delta'] * 5 + ['message']
+    assert all(room == 'resume' for _, _, room in emitted)
+    deltas, (final,) = of(emitted, 'message_delta'), of(emitted, 'message')
+    assert {delta['id'] for delta in deltas} == {'m1'}
+    assert ''.join(delta['delta'] for delta in deltas) == 'token0 token1 token2 token3 token4'
+    assert final['msg'] == result['response'] == 'token0 token1 token2 token3 token4'
+    assert final['id'] == 'm1' and final['complete'] is True
+    assert result['usage']['completion_tokens'] == 5
+
+def test_client_disconnect_stops_the_stream(llm_app, fake_openai, emitted):
+    fake_openai.config.update(tokens=200, token_latency=0.01)
+    jobs = JobQueue(lambda fn: threading.Thread(target=fn, daemon=True).start(), workers=1)
+    job  = jobs.submit(lambda job: ask(llm_app, should_stop=job.check), owner='sid-1')
+
+    wait_for(lambda: len(of(emitted, 'message_delta')) >= 3)
+    jobs.cancel_owned_by('sid-1')
+    wait_for(lambda: job.finished_at is not None)
+
+    assert job.status == 'cancelled'
+    assert of(emitted, 'message') == []
+    assert len(of(emitted, 'message_delta')) < 200
+    assert job.finished_at - job.started_at < 1.0        # the full stream takes 2s
+
+def test_non_streaming_mode_sends_one_complete_message(llm_app, fake_openai, emitted):
+    result = ask(llm_app, stream=False)
+
+    assert of(emitted, 'message_delta') == []
+    (final,) = of(emitted, 'message')
+    assert final['msg'] == result['response'] == 'token0 token1 token2 token3 token4'
+    assert 'id' not in final
+    assert fake_openai.requests == 1
+
+def test_stream_answered_without_streaming_falls_back_to_the_whole_body(llm_app, fake_openai, emitted):
+    fake_openai.config['streaming'] = False
+    result = ask(llm_app)
+
+    assert result['success'] and result['response'] == 'token0 token1 token2 token3 token4'
+    assert of(emitted, 'message_delta') == []
+    (final,) = of(emitted, 'message')
+    assert final['msg'] == result['response'] and final['id'] == 'm1'
@@ -0,0 +1,13 @@
+# Author: Prof. MM Ghassemi <ghassem3@msu.edu>
+
+from flask_app import socketio_transports
+
+def test_single_process_offers_websocket_and_polling():
+    assert socketio_transports({'SOCKETIO_MESSAGE_QUEUE': None}) == ['websocket', 'polling']
+
+def test_several_workers_offer_websocket_only():
+    assert socketio_transports({'SOCKETIO_MESSAGE_QUEUE': 'redis://redis:6379/0'}) == ['websocket']
+
+def test_sticky_deployments_can_allow_polling_again():
+    config = {'SOCKETIO_MESSAGE_QUEUE': 'redis://redis:6379/0', 'SOCKETIO_TRANSPORTS': 'websocket, polling'}
+    assert socketio_transports(config) == ['websocket', 'polling']